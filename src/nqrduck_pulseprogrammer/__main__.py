@@ -0,0 +1,7 @@
+"""Runs the command line tool of the pulse programmer."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
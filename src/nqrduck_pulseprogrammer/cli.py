@@ -0,0 +1,300 @@
+"""Command line tool to validate, convert and summarize pulse sequence files without the GUI.
+
+Example:
+    $ nqrduck-pulseprogrammer validate --max-duration 10000 sequences/
+    $ nqrduck-pulseprogrammer convert --to quackb --output-dir binary sequences/*.quack
+    $ nqrduck-pulseprogrammer summarize --json sequence.quack
+
+Directories are searched recursively for pulse sequence files. Files are processed in parallel in a process pool. Only the Qt-free modules of the pulse programmer are imported.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from quackseq.pulseparameters import TXPulse, RXReadout
+
+from . import sequence_io
+from .validation import validate_sequence
+from .repeat import expand_sequence
+
+logger = logging.getLogger(__name__)
+
+
+def validate_file(path: str, max_duration: float = None) -> dict:
+    """Loads and validates a pulse sequence file.
+
+    Args:
+        path (str): The path to the file.
+        max_duration (float, optional): The maximum duration of the pulse sequence in seconds. Defaults to None.
+
+    Returns:
+        dict: The number of events and the problems that were found.
+    """
+    sequence = sequence_io.load_sequence(path)
+    problems = [message for _, _, message in validate_sequence(sequence, max_duration)]
+    return {"events": len(sequence.events), "problems": problems}
+
+
+def convert_file(path: str, output: str) -> dict:
+    """Converts a pulse sequence file to the format given by the extension of the output path.
+
+    Like saving in the GUI, the pulse sequence is named after the output file.
+
+    Args:
+        path (str): The path to the input file.
+        output (str): The path to the output file.
+
+    Returns:
+        dict: The output path and the number of events.
+    """
+    sequence = sequence_io.load_sequence(path)
+    sequence.name = sequence_io.get_sequence_name(output)
+    sequence_io.save_sequence(sequence, output)
+    return {"output": output, "events": len(sequence.events)}
+
+
+def summarize_file(path: str) -> dict:
+    """Returns an overview of a pulse sequence file.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        dict: The name, version, number of stored and played events, total duration in seconds and the number of TX pulses and RX readouts. Repeat blocks are unrolled for the played events, the duration and the counts.
+    """
+    stored = sequence_io.load_sequence(path)
+    sequence = expand_sequence(stored)
+    tx_pulses = 0
+    rx_readouts = 0
+    for event in sequence.events:
+        for parameter in event.parameters.values():
+            if isinstance(parameter, TXPulse):
+                amplitude = parameter.get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value
+                tx_pulses += amplitude > 0
+            elif isinstance(parameter, RXReadout):
+                rx_readouts += bool(parameter.get_option_by_name(RXReadout.RX).value)
+
+    return {
+        "name": sequence.name,
+        "version": sequence.version,
+        "events": len(stored.events),
+        "played_events": len(sequence.events),
+        "duration": float(sum(event.duration for event in sequence.events)),
+        "tx_pulses": tx_pulses,
+        "rx_readouts": rx_readouts,
+    }
+
+
+def run_task(function, path: str, *args) -> dict:
+    """Runs a task for a single file and measures its run time.
+
+    Exceptions are caught, so that one broken file does not stop the processing of the others.
+
+    Args:
+        function (callable): The task.
+        path (str): The path to the file.
+        *args: Additional arguments of the task.
+
+    Returns:
+        dict: The result of the task with the path, whether it succeeded, the error message and the run time in seconds.
+    """
+    start = time.perf_counter()
+    try:
+        result = function(path, *args)
+        result["ok"] = not result.get("problems")
+        result["error"] = None
+    except Exception as exception:
+        logger.debug("Processing %s failed", path, exc_info=True)
+        result = {"ok": False, "error": f"{type(exception).__name__}: {exception}"}
+    result["path"] = path
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_tasks(function, tasks: list, jobs: int) -> list:
+    """Runs a task for several files, in parallel if more than one job is allowed.
+
+    Args:
+        function (callable): The task.
+        tasks (list): The arguments of the task for every file, starting with the path.
+        jobs (int): The maximum number of worker processes.
+
+    Returns:
+        list: The results in the order of the tasks.
+    """
+    jobs = min(jobs, len(tasks))
+    if jobs <= 1:
+        return [run_task(function, *task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(run_task, function, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+def get_files(paths: list) -> list:
+    """Returns the pulse sequence files for the given paths.
+
+    Files are returned as they are, directories are searched recursively for files with the extensions of both formats.
+
+    Args:
+        paths (list): The paths to files and directories.
+
+    Returns:
+        list: The paths to the files.
+    """
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        files.extend(
+            str(file)
+            for file in sorted(Path(path).rglob("*"))
+            if file.suffix[1:] in (sequence_io.JSON_EXTENSION, sequence_io.BINARY_EXTENSION)
+        )
+    return files
+
+
+def get_output_path(path: str, extension: str, output_dir: str = None) -> str:
+    """Returns the path of a converted file.
+
+    Args:
+        path (str): The path to the input file.
+        extension (str): The extension of the output format.
+        output_dir (str, optional): The directory of the output file. Defaults to the directory of the input file.
+
+    Returns:
+        str: The path to the output file.
+    """
+    output = Path(path).with_suffix(f".{extension}")
+    if output_dir is not None:
+        output = Path(output_dir) / output.name
+    return str(output)
+
+
+def format_result(command: str, result: dict) -> str:
+    """Returns a line of text for the result of a file.
+
+    Args:
+        command (str): The command that was run.
+        result (dict): The result of the file.
+
+    Returns:
+        str: The formatted result.
+    """
+    timing = f"({result['seconds'] * 1e3:.1f} ms)"
+    if result["error"] is not None:
+        return f"{result['path']}: error: {result['error']} {timing}"
+
+    if command == "validate":
+        if result["problems"]:
+            problems = "".join(f"\n  {problem}" for problem in result["problems"])
+            return f"{result['path']}: {len(result['problems'])} problems {timing}{problems}"
+        return f"{result['path']}: ok, {result['events']} events {timing}"
+
+    if command == "convert":
+        return f"{result['path']} -> {result['output']} {timing}"
+
+    return (
+        f"{result['path']}: {result['name']} (version {result['version']}), "
+        f"{result['events']} events ({result['played_events']} played), "
+        f"{result['duration'] * 1e6:.3f} µs, "
+        f"{result['tx_pulses']} TX pulses, {result['rx_readouts']} RX readouts {timing}"
+    )
+
+
+def main(argv: list = None) -> int:
+    """Entry point of the command line tool.
+
+    Args:
+        argv (list, optional): The command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: The exit code, 1 if any file failed.
+    """
+    parser = argparse.ArgumentParser(
+        prog="nqrduck-pulseprogrammer",
+        description="Validate, convert and summarize pulse sequence files.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of files that are processed in parallel",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument("--log-level", default="WARNING", help="Set the log level")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    validate_parser = subparsers.add_parser("validate", help="Check pulse sequence files")
+    validate_parser.add_argument(
+        "--max-duration",
+        type=float,
+        help="The maximum duration of a pulse sequence in µs",
+    )
+    validate_parser.add_argument("files", nargs="+")
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="Convert pulse sequence files to another format"
+    )
+    convert_parser.add_argument(
+        "--to",
+        choices=[sequence_io.JSON_EXTENSION, sequence_io.BINARY_EXTENSION],
+        required=True,
+        help="The format of the converted files",
+    )
+    convert_parser.add_argument(
+        "--output-dir", help="The directory of the converted files"
+    )
+    convert_parser.add_argument("files", nargs="+")
+
+    summarize_parser = subparsers.add_parser(
+        "summarize", help="Print an overview of pulse sequence files"
+    )
+    summarize_parser.add_argument("files", nargs="+")
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level.upper(), logging.WARNING),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    files = get_files(args.files)
+    if args.command == "validate":
+        max_duration = None if args.max_duration is None else args.max_duration * 1e-6
+        results = run_tasks(
+            validate_file, [(path, max_duration) for path in files], args.jobs
+        )
+    elif args.command == "convert":
+        if args.output_dir is not None:
+            os.makedirs(args.output_dir, exist_ok=True)
+        tasks = [
+            (path, get_output_path(path, args.to, args.output_dir))
+            for path in files
+        ]
+        results = run_tasks(convert_file, tasks, args.jobs)
+    else:
+        results = run_tasks(summarize_file, [(path,) for path in files], args.jobs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print(format_result(args.command, result))
+        failed = sum(not result["ok"] for result in results)
+        total = sum(result["seconds"] for result in results)
+        print(f"{len(results)} files, {failed} failed, {total:.3f} s total")
+
+    return 1 if any(not result["ok"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""Cache of compiled pulse sequences.
+
+Spectrometer modules translate the pulse sequence of the pulse programmer into their own representation before every measurement, e.g. sampled TX and RX waveforms. A pulse sequence that is run unchanged for many averages or repeated experiments does not need to be translated again. The compiled artifacts are therefore cached by the content hash of the pulse sequence, see the content_hash module, the name of the spectrometer and a digest of the spectrometer settings the translation depends on, e.g. the clock or the TX and RX settings. Changed settings therefore compile the pulse sequence again instead of using a stale artifact from memory or disk.
+
+The cache has two tiers: a bounded LRU cache in memory and optionally a directory on disk, in which the artifacts are stored as pickle files. The least recently used files are removed once the directory exceeds its size limit. Artifacts that cannot be pickled are only kept in memory.
+
+Example:
+    >>> artifact = compile_cache.get_or_compile(
+    ...     model.pulse_sequence_hash,
+    ...     "LimeNQR",
+    ...     lambda: translate(model.expanded_sequence),
+    ...     settings=spectrometer_model.settings,
+    ... )
+
+This module does not depend on Qt.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def get_settings_digest(settings) -> str:
+    """Returns a digest of spectrometer settings.
+
+    Args:
+        settings (dict): The settings by name, either as values or as objects with a value attribute like the settings of quackseq spectrometers. None for no settings.
+
+    Returns:
+        str: The hex digest of the names and values of the settings.
+    """
+    values = {
+        str(name): getattr(setting, "value", setting)
+        for name, setting in (settings or {}).items()
+    }
+    # Values without a JSON representation, e.g. Decimals, are compared by their string
+    data = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class CompileCache:
+    """Two-tier cache of compiled pulse sequences keyed by content hash, spectrometer and spectrometer settings.
+
+    The cached artifacts are shared between all callers and must be treated as read-only.
+
+    Args:
+        directory (str, optional): The directory of the disk tier or None to only cache in memory. Defaults to None.
+        max_entries (int, optional): The maximum number of artifacts in memory. Defaults to MAX_ENTRIES.
+        max_disk_bytes (int, optional): The maximum size of the disk tier in bytes. Defaults to MAX_DISK_BYTES.
+
+    Attributes:
+        MAX_ENTRIES (int): The default maximum number of artifacts in memory.
+        MAX_DISK_BYTES (int): The default maximum size of the disk tier in bytes.
+        FILE_SUFFIX (str): The suffix of the files of the disk tier.
+        hits (int): The number of artifacts that were found in memory.
+        disk_hits (int): The number of artifacts that were loaded from disk.
+        misses (int): The number of artifacts that had to be compiled.
+    """
+
+    MAX_ENTRIES = 16
+    MAX_DISK_BYTES = 256 * 1024 * 1024
+    FILE_SUFFIX = ".pickle"
+
+    def __init__(
+        self,
+        directory: str = None,
+        max_entries: int = MAX_ENTRIES,
+        max_disk_bytes: int = MAX_DISK_BYTES,
+    ) -> None:
+        """Initializes the compile cache."""
+        self.directory = Path(directory) if directory is not None else None
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(sequence_hash: str, spectrometer: str, settings: dict = None) -> str:
+        """Returns the cache key of a compiled pulse sequence.
+
+        Args:
+            sequence_hash (str): The content hash of the pulse sequence.
+            spectrometer (str): The name of the spectrometer.
+            settings (dict, optional): The spectrometer settings the compiled pulse sequence depends on, see get_settings_digest. Defaults to None.
+
+        Returns:
+            str: The cache key, which is also used as file name of the disk tier.
+        """
+        data = f"{sequence_hash}\0{spectrometer}\0{get_settings_digest(settings)}".encode()
+        return hashlib.sha256(data).hexdigest()
+
+    def get_path(self, key: str) -> Path:
+        """Returns the path of an artifact in the disk tier.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Path: The path of the pickle file.
+        """
+        return self.directory / f"{key}{self.FILE_SUFFIX}"
+
+    def get(self, sequence_hash: str, spectrometer: str, default=None, settings: dict = None):
+        """Returns a compiled pulse sequence from the cache.
+
+        Args:
+            sequence_hash (str): The content hash of the pulse sequence.
+            spectrometer (str): The name of the spectrometer.
+            default (object, optional): The value that is returned if the artifact is not cached. Defaults to None.
+            settings (dict, optional): The spectrometer settings the compiled pulse sequence depends on, see get_settings_digest. Defaults to None.
+
+        Returns:
+            object: The compiled pulse sequence or the default.
+        """
+        key = self.get_key(sequence_hash, spectrometer, settings)
+        with self.lock:
+            if key in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return self.cache[key]
+
+        artifact = self.read(key)
+        if artifact is None:
+            return default
+        with self.lock:
+            self.disk_hits += 1
+            self.remember(key, artifact)
+        return artifact
+
+    def put(self, sequence_hash: str, spectrometer: str, artifact, settings: dict = None) -> None:
+        """Adds a compiled pulse sequence to the cache.
+
+        Args:
+            sequence_hash (str): The content hash of the pulse sequence.
+            spectrometer (str): The name of the spectrometer.
+            artifact (object): The compiled pulse sequence.
+            settings (dict, optional): The spectrometer settings the compiled pulse sequence depends on, see get_settings_digest. Defaults to None.
+        """
+        key = self.get_key(sequence_hash, spectrometer, settings)
+        with self.lock:
+            self.remember(key, artifact)
+        self.write(key, artifact)
+
+    def get_or_compile(self, sequence_hash: str, spectrometer: str, compile, settings: dict = None):
+        """Returns a compiled pulse sequence from the cache or compiles and caches it.
+
+        Args:
+            sequence_hash (str): The content hash of the pulse sequence.
+            spectrometer (str): The name of the spectrometer.
+            compile (callable): Compiles the pulse sequence, called without arguments.
+            settings (dict, optional): The spectrometer settings the compiled pulse sequence depends on, see get_settings_digest. Defaults to None.
+
+        Returns:
+            object: The compiled pulse sequence.
+        """
+        # None is a valid artifact, so a private default marks a miss
+        missing = object()
+        artifact = self.get(sequence_hash, spectrometer, missing, settings)
+        if artifact is not missing:
+            return artifact
+
+        with self.lock:
+            self.misses += 1
+        # The pulse sequence is compiled without holding the lock
+        artifact = compile()
+        self.put(sequence_hash, spectrometer, artifact, settings)
+        return artifact
+
+    def remember(self, key: str, artifact) -> None:
+        """Adds an artifact to the memory tier and evicts the least recently used artifacts. The lock must be held.
+
+        Args:
+            key (str): The cache key.
+            artifact (object): The compiled pulse sequence.
+        """
+        self.cache[key] = artifact
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    def read(self, key: str):
+        """Loads an artifact from the disk tier.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            object: The compiled pulse sequence or None if it is not on disk.
+        """
+        if self.directory is None:
+            return None
+        path = self.get_path(key)
+        try:
+            with open(path, "rb") as file:
+                artifact = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as exception:
+            logger.warning("Removing unreadable compiled pulse sequence %s: %s", path, exception)
+            path.unlink(missing_ok=True)
+            return None
+
+        # The modification time orders the files for the eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return artifact
+
+    def write(self, key: str, artifact) -> None:
+        """Stores an artifact in the disk tier and evicts the least recently used files.
+
+        Args:
+            key (str): The cache key.
+            artifact (object): The compiled pulse sequence.
+        """
+        if self.directory is None:
+            return
+        try:
+            data = pickle.dumps(artifact, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as exception:
+            logger.debug("Compiled pulse sequence is only cached in memory: %s", exception)
+            return
+        if len(data) > self.max_disk_bytes:
+            return
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Other processes never see partially written files
+            file_descriptor, temporary_path = tempfile.mkstemp(
+                prefix=f".{key}.", suffix=".tmp", dir=self.directory
+            )
+        except OSError as exception:
+            logger.warning("Could not store compiled pulse sequence: %s", exception)
+            return
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary_path, self.get_path(key))
+        except OSError as exception:
+            logger.warning("Could not store compiled pulse sequence: %s", exception)
+            Path(temporary_path).unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes the least recently used files until the disk tier fits its size limit."""
+        files = []
+        for path in self.directory.glob(f"*{self.FILE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(file[1] for file in files)
+        for _, file_size, path in sorted(files, key=lambda file: file[0]):
+            if size <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= file_size
+            logger.debug("Evicted compiled pulse sequence %s", path.name)
+
+    def cache_info(self) -> dict:
+        """Returns the statistics of the compile cache.
+
+        Returns:
+            dict: The number of hits in memory and on disk, misses and artifacts in memory.
+        """
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "size": len(self.cache),
+        }
+
+    def clear_cache(self) -> None:
+        """Removes all artifacts from memory and disk and resets the statistics."""
+        with self.lock:
+            self.cache.clear()
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+        if self.directory is not None:
+            for path in self.directory.glob(f"*{self.FILE_SUFFIX}"):
+                path.unlink(missing_ok=True)
+
+
+compile_cache = CompileCache()
@@ -0,0 +1,179 @@
+"""Content hash of pulse sequences.
+
+The content hash identifies what a spectrometer plays: the events with their names, durations and pulse parameter options, the repeat blocks and the pulse sequence version. The name of the pulse sequence is not part of the hash, so saving a pulse sequence under another name does not change it.
+
+SequenceHash keeps a digest of every event and only hashes the events that are affected by a change again. The digests of shared pulse parameter instances, see the interning module, are computed once. The content hash itself is the digest of the event digests and is only computed when it is requested after a change.
+
+This module does not depend on Qt.
+"""
+
+import hashlib
+import json
+import logging
+import weakref
+
+from nqrduck.helpers.serializer import DecimalEncoder
+from quackseq.pulsesequence import PulseSequence
+from quackseq.pulseparameters import PulseParameter
+
+from .repeat import get_repeat_blocks
+
+logger = logging.getLogger(__name__)
+
+# Keys of the serialized options that only change how an option is edited. quackseq does not load them, so a loaded pulse sequence keeps its hash.
+IGNORED_OPTION_KEYS = ("slider",)
+
+
+def get_parameter_digest(parameter: PulseParameter) -> bytes:
+    """Returns the digest of a pulse parameter.
+
+    Args:
+        parameter (PulseParameter): The pulse parameter.
+
+    Returns:
+        bytes: The SHA-256 digest of the class, the name and the options of the pulse parameter without IGNORED_OPTION_KEYS.
+    """
+    options = [option.to_json() for option in parameter.options]
+    for option in options:
+        for key in IGNORED_OPTION_KEYS:
+            option.pop(key, None)
+    options = json.dumps(options, cls=DecimalEncoder, sort_keys=True)
+    data = "\0".join((type(parameter).__name__, parameter.name, options))
+    return hashlib.sha256(data.encode()).digest()
+
+
+class SequenceHash:
+    """Incremental content hash of a pulse sequence.
+
+    The changes of the pulse sequence are passed to apply as the deltas of the undo module.
+
+    Example:
+        >>> sequence_hash = SequenceHash(sequence)
+        >>> sequence_hash.hexdigest
+        '3f1c...'
+
+    Args:
+        sequence (PulseSequence): The pulse sequence.
+        pool (ParameterPool, optional): The parameter pool of the pulse sequence. The digests of its canonical instances are cached. Defaults to None.
+
+    Attributes:
+        event_digests (list): The digests of the events.
+    """
+
+    def __init__(self, sequence: PulseSequence, pool=None) -> None:
+        """Initializes the content hash."""
+        self.pool = pool
+        self.reset(sequence)
+
+    def reset(self, sequence: PulseSequence) -> None:
+        """Hashes all events of a pulse sequence.
+
+        This is needed after pulse parameters were changed in place, e.g. by PulseSequence.update_options.
+
+        Args:
+            sequence (PulseSequence): The pulse sequence.
+        """
+        self.sequence = sequence
+        # Released instances of the parameter pool are removed with their digests
+        self._parameter_digests = weakref.WeakKeyDictionary()
+        # Nothing is changed while the events are hashed, so all instances are only hashed once
+        digests = {}
+        self.event_digests = [
+            self.get_event_digest(event, digests) for event in sequence.events
+        ]
+        self._hexdigest = None
+
+    def get_event_digest(self, event, digests: dict = None) -> bytes:
+        """Returns the digest of an event.
+
+        Args:
+            event (Event): The event.
+            digests (dict, optional): The digests of the pulse parameters that are not in the parameter pool by their id, which must not change while the dict is used. Defaults to None.
+
+        Returns:
+            bytes: The SHA-256 digest of the name, the duration and the pulse parameters of the event.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{event.name}\0{event.duration}\0".encode())
+        for name, parameter in event.parameters.items():
+            digest.update(name.encode() + b"\0")
+            digest.update(self.get_cached_parameter_digest(parameter, digests))
+        return digest.digest()
+
+    def get_cached_parameter_digest(self, parameter: PulseParameter, digests: dict = None) -> bytes:
+        """Returns the digest of a pulse parameter, which is cached for the canonical instances of the parameter pool.
+
+        Args:
+            parameter (PulseParameter): The pulse parameter.
+            digests (dict, optional): The digests of the pulse parameters that are not in the parameter pool by their id. Defaults to None.
+
+        Returns:
+            bytes: The digest of the pulse parameter.
+        """
+        cached = self._parameter_digests.get(parameter)
+        if cached is not None:
+            return cached
+        if digests is not None and id(parameter) in digests:
+            return digests[id(parameter)]
+        digest = get_parameter_digest(parameter)
+        # Private instances may still be changed in place
+        if self.pool is not None and self.pool.is_interned(parameter):
+            self._parameter_digests[parameter] = digest
+        elif digests is not None:
+            digests[id(parameter)] = digest
+        return digest
+
+    def apply(self, delta: tuple) -> None:
+        """Updates the event digests after a delta was applied to the pulse sequence.
+
+        Args:
+            delta (tuple): The delta.
+        """
+        operation, index, *data = delta
+        if operation == "insert":
+            self.event_digests.insert(index, self.get_event_digest(self.sequence.events[index]))
+        elif operation == "remove":
+            del self.event_digests[index]
+        elif operation == "move":
+            self.event_digests.insert(data[0], self.event_digests.pop(index))
+        elif operation in ("rename", "duration", "parameter"):
+            self.update_event(index)
+        self._hexdigest = None
+
+    def update_event(self, index: int) -> None:
+        """Hashes an event again.
+
+        Args:
+            index (int): The index of the event.
+        """
+        self.event_digests[index] = self.get_event_digest(self.sequence.events[index])
+        self._hexdigest = None
+
+    @property
+    def hexdigest(self) -> str:
+        """str: The content hash of the pulse sequence as hexadecimal string."""
+        if self._hexdigest is None:
+            digest = hashlib.sha256()
+            header = json.dumps(
+                {
+                    "version": self.sequence.version,
+                    "repeat_blocks": get_repeat_blocks(self.sequence),
+                },
+                sort_keys=True,
+            )
+            digest.update(header.encode() + b"\0")
+            digest.update(b"".join(self.event_digests))
+            self._hexdigest = digest.hexdigest()
+        return self._hexdigest
+
+
+def get_sequence_hash(sequence: PulseSequence) -> str:
+    """Returns the content hash of a pulse sequence.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence.
+
+    Returns:
+        str: The content hash as hexadecimal string.
+    """
+    return SequenceHash(sequence).hexdigest
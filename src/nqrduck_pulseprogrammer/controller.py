@@ -1,12 +1,14 @@
 """Controller of  the pulse programmer module."""
 
 import logging
-import json
 import decimal
-from PyQt6.QtCore import pyqtSlot
-from nqrduck.helpers.serializer import DecimalEncoder
+from pathlib import Path
+from PyQt6.QtCore import pyqtSlot, pyqtSignal, QCoreApplication, QThreadPool, QStandardPaths, QTimer
 from nqrduck.module.module_controller import ModuleController
-from quackseq.pulsesequence import QuackSequence
+from . import sequence_io
+from .journal import SequenceJournal
+from .sequence_worker import SequenceWorker
+from .sweep import Sweep
 
 logger = logging.getLogger(__name__)
 
@@ -15,11 +17,191 @@ class PulseProgrammerController(ModuleController):
     """Controller of the pulse programmer module.
 
     This class is responsible for handling the logic of the pulse programmer module.
+
+    Single edits are recorded in the autosave journal right away. Snapshots of the whole pulse sequence are written once after a burst of full changes, so batch edits are not slowed down by writing the pulse sequence.
+
+    Attributes:
+        AUTOSAVE_INTERVAL (int): The default time in ms after a full change of the pulse sequence until the autosave snapshot is written.
+        autosave_interval (int): The time in ms after a full change of the pulse sequence until the autosave snapshot is written.
+
+    Signals:
+        sequence_io_started: Emitted with a description when a pulse sequence is saved or loaded in the background.
+        sequence_io_progress: Emitted with the number of processed and the total number of events while a pulse sequence is saved or loaded.
+        sequence_io_finished: Emitted when saving or loading is complete, failed or was cancelled.
     """
 
+    sequence_io_started = pyqtSignal(str)
+    sequence_io_progress = pyqtSignal(int, int)
+    sequence_io_finished = pyqtSignal()
+
+    AUTOSAVE_INTERVAL = 2000
+
+    def __init__(self, module):
+        """Initializes the pulse programmer controller.
+
+        Args:
+            module (Module): The module to which this controller belongs.
+        """
+        super().__init__(module)
+        self.sequence_worker = None
+        self.journal = None
+        self.snapshot_timer = None
+        self.autosave_interval = self.AUTOSAVE_INTERVAL
+
     def on_loading(self) -> None:
-        """This method is called when the module is loaded. It sets the pulse parameter options in the model."""
+        """This method is called when the module is loaded. It starts the autosave journal and the disk tier of the compile cache and validates the pulse sequence against the pulse parameter options of the spectrometer."""
         logger.debug("Pulse programmer controller on loading")
+        self.module.model.invalidate_options()
+        self.module.model.validate()
+        # Every spectrometer module calls this method, but the journal is only started once
+        if self.journal is None:
+            self.start_journal()
+            self.module.model.compile_cache.directory = self.get_data_directory() / "compiled"
+
+    def process_signals(self, key: str, value: object) -> None:
+        """Processes the signals of the other modules.
+
+        When the active spectrometer changed, the pulse parameter options are marked as outdated and the pulse sequence is validated again.
+
+        Args:
+            key (str): The key of the signal.
+            value (object): The value of the signal.
+        """
+        if key == "active_spectrometer_changed":
+            logger.debug("Active spectrometer changed to %s", value)
+            self.module.model.invalidate_options()
+            self.module.model.validate()
+
+    @staticmethod
+    def get_data_directory() -> Path:
+        """Returns the directory in which the pulse programmer stores its autosave and cached data.
+
+        Returns:
+            Path: The directory in the application data location.
+        """
+        return Path(
+            QStandardPaths.writableLocation(
+                QStandardPaths.StandardLocation.AppLocalDataLocation
+            )
+        ) / "pulseprogrammer"
+
+    def start_journal(self, directory: str = None) -> None:
+        """Starts the autosave journal and restores the pulse sequence of a previous session.
+
+        Args:
+            directory (str, optional): The directory of the autosave. Defaults to the application data location.
+        """
+        if directory is None:
+            directory = self.get_data_directory()
+
+        self.journal = SequenceJournal(directory)
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.setSingleShot(True)
+        self.snapshot_timer.timeout.connect(self.write_autosave_snapshot)
+        application = QCoreApplication.instance()
+        if application is not None:
+            application.aboutToQuit.connect(self.flush_autosave)
+        try:
+            sequence = self.journal.restore()
+        except Exception as exception:
+            logger.error("Could not restore the autosave: %s", exception)
+            self.journal.clear()
+            sequence = None
+
+        model = self.module.model
+        if sequence is not None:
+            logger.debug("Restored autosave with %s events", len(sequence.events))
+            model.sequence = sequence
+            model.events_changed.emit()
+            self.module.nqrduck_signal.emit(
+                "notification", ["Info", "Restored the pulse sequence of the last session"]
+            )
+
+        model.events_changed.connect(self.on_autosave_snapshot)
+        model.event_inserted.connect(self.on_autosave_insert)
+        model.event_removed.connect(self.on_autosave_remove)
+        model.event_moved.connect(self.on_autosave_move)
+        model.event_renamed.connect(self.on_autosave_rename)
+        model.event_duration_changed.connect(self.on_autosave_duration)
+        model.event_parameter_changed.connect(self.on_autosave_parameter)
+        model.repeat_blocks_changed.connect(self.on_autosave_repeat)
+
+    def autosave(self, record, *args) -> None:
+        """Records an operation in the autosave journal and schedules a snapshot if the journal grew too large.
+
+        Operations are not recorded while a snapshot is scheduled, because the journal still belongs to the previous snapshot and the new snapshot contains them. Errors are logged but never interrupt editing.
+
+        Args:
+            record (callable): The record method of the journal.
+            *args: The arguments of the record method.
+        """
+        if self.snapshot_timer.isActive():
+            return
+        try:
+            record(*args)
+        except Exception as exception:
+            logger.error("Autosave failed: %s", exception)
+        if self.journal.needs_compaction():
+            self.on_autosave_snapshot()
+
+    @pyqtSlot()
+    def on_autosave_snapshot(self) -> None:
+        """Schedules an autosave snapshot when the whole pulse sequence changed."""
+        # A running timer is not restarted, so continuous changes are still saved once per interval
+        if not self.snapshot_timer.isActive():
+            self.snapshot_timer.start(self.autosave_interval)
+
+    @pyqtSlot()
+    def write_autosave_snapshot(self) -> None:
+        """Writes an autosave snapshot of the pulse sequence and starts a new journal for it."""
+        self.snapshot_timer.stop()
+        try:
+            self.journal.write_snapshot(self.module.model.sequence)
+        except Exception as exception:
+            logger.error("Autosave failed: %s", exception)
+
+    @pyqtSlot()
+    def flush_autosave(self) -> None:
+        """Writes the scheduled autosave snapshot right away, e.g. before the application quits."""
+        if self.snapshot_timer is not None and self.snapshot_timer.isActive():
+            self.write_autosave_snapshot()
+
+    @pyqtSlot(int)
+    def on_autosave_insert(self, index: int) -> None:
+        """Records an inserted event in the autosave journal."""
+        self.autosave(self.journal.record_insert, self.module.model.sequence, index)
+
+    @pyqtSlot(int)
+    def on_autosave_remove(self, index: int) -> None:
+        """Records a removed event in the autosave journal."""
+        self.autosave(self.journal.record_remove, index)
+
+    @pyqtSlot(int, int)
+    def on_autosave_move(self, old_index: int, new_index: int) -> None:
+        """Records a moved event in the autosave journal."""
+        self.autosave(self.journal.record_move, old_index, new_index)
+
+    @pyqtSlot(int)
+    def on_autosave_rename(self, index: int) -> None:
+        """Records a renamed event in the autosave journal."""
+        self.autosave(self.journal.record_rename, self.module.model.sequence, index)
+
+    @pyqtSlot(int)
+    def on_autosave_duration(self, index: int) -> None:
+        """Records a changed event duration in the autosave journal."""
+        self.autosave(self.journal.record_duration, self.module.model.sequence, index)
+
+    @pyqtSlot(int, str)
+    def on_autosave_parameter(self, index: int, parameter: str) -> None:
+        """Records changed pulse parameter options in the autosave journal."""
+        self.autosave(
+            self.journal.record_parameter, self.module.model.sequence, index, parameter
+        )
+
+    @pyqtSlot()
+    def on_autosave_repeat(self) -> None:
+        """Records changed repeat blocks in the autosave journal."""
+        self.autosave(self.journal.record_repeat, self.module.model.sequence)
 
     @pyqtSlot(str)
     def delete_event(self, event_name: str) -> None:
@@ -29,8 +211,7 @@ class PulseProgrammerController(ModuleController):
             event_name (str): The name of the event to be deleted.
         """
         logger.debug("Deleting event %s", event_name)
-        self.module.model.pulse_sequence.delete_event(event_name)
-        self.module.model.events_changed.emit()
+        self.module.model.delete_event(event_name)
 
     @pyqtSlot(str, str)
     def change_event_name(self, old_name: str, new_name: str) -> None:
@@ -41,11 +222,13 @@ class PulseProgrammerController(ModuleController):
             new_name (str): The new name of the event.
         """
         logger.debug("Changing event name from %s to %s", old_name, new_name)
-        for event in self.module.model.pulse_sequence.events:
-            if event.name == old_name:
-                event.name = new_name
-                break
-        self.module.model.events_changed.emit()
+        try:
+            self.module.model.rename_event(old_name, new_name)
+        except ValueError:
+            logger.error("Event with name %s already exists", new_name)
+            self.module.nqrduck_signal.emit(
+                "notification", ["Error", f"Event with name {new_name} already exists"]
+            )
 
     @pyqtSlot(str, str)
     def change_event_duration(self, event_name: str, duration) -> None:
@@ -56,19 +239,16 @@ class PulseProgrammerController(ModuleController):
             duration (str): The new duration of the event.
         """
         logger.debug("Changing duration of event %s to %s", event_name, duration)
-        for event in self.module.model.pulse_sequence.events:
-            if event.name == event_name:
-                try:
-                    # The u is for microseconds
-                    event.duration = duration + "u"
-                except decimal.InvalidOperation:
-                    logger.error("Duration must be a positive number")
-                    # Emit signal to the nqrduck core to show an error message
-                    self.module.nqrduck_signal.emit(
-                        "notification", ["Error", "Duration must be a positive number"]
-                    )
-                break
-        self.module.model.events_changed.emit()
+        try:
+            # The u is for microseconds
+            self.module.model.set_event_duration(event_name, duration + "u")
+        # quackseq raises a ValueError for invalid and negative durations
+        except (decimal.InvalidOperation, ValueError):
+            logger.error("Duration must be a positive number")
+            # Emit signal to the nqrduck core to show an error message
+            self.module.nqrduck_signal.emit(
+                "notification", ["Error", "Duration must be a positive number"]
+            )
 
     @pyqtSlot(str)
     def on_move_event_left(self, event_name: str) -> None:
@@ -78,18 +258,7 @@ class PulseProgrammerController(ModuleController):
             event_name (str): The name of the event to be moved.
         """
         logger.debug("Moving event %s to the left", event_name)
-        for i, event in enumerate(self.module.model.pulse_sequence.events):
-            if event.name == event_name:
-                if i > 0:
-                    (
-                        self.module.model.pulse_sequence.events[i],
-                        self.module.model.pulse_sequence.events[i - 1],
-                    ) = (
-                        self.module.model.pulse_sequence.events[i - 1],
-                        self.module.model.pulse_sequence.events[i],
-                    )
-                    break
-        self.module.model.events_changed.emit()
+        self.module.model.move_event(event_name, -1)
 
     @pyqtSlot(str)
     def on_move_event_right(self, event_name: str) -> None:
@@ -99,52 +268,182 @@ class PulseProgrammerController(ModuleController):
             event_name (str): The name of the event to be moved.
         """
         logger.debug("Moving event %s to the right", event_name)
-        for i, event in enumerate(self.module.model.pulse_sequence.events):
-            if event.name == event_name:
-                if i < len(self.module.model.pulse_sequence.events) - 1:
-                    (
-                        self.module.model.pulse_sequence.events[i],
-                        self.module.model.pulse_sequence.events[i + 1],
-                    ) = (
-                        self.module.model.pulse_sequence.events[i + 1],
-                        self.module.model.pulse_sequence.events[i],
-                    )
-                    break
-        self.module.model.events_changed.emit()
+        self.module.model.move_event(event_name, 1)
+
+    @pyqtSlot(str, str, int)
+    def set_repeat_block(self, first_event: str, last_event: str, count: int) -> None:
+        """This method repeats a range of events.
+
+        Args:
+            first_event (str): The name of the first event of the range.
+            last_event (str): The name of the last event of the range.
+            count (int): The number of times the events are played. One removes the repetition.
+        """
+        logger.debug("Repeating events %s to %s %s times", first_event, last_event, count)
+        try:
+            self.module.model.set_repeat_block(first_event, last_event, count)
+        except ValueError as exception:
+            logger.error("Could not repeat events: %s", exception)
+            self.module.nqrduck_signal.emit("notification", ["Error", str(exception)])
 
-    def save_pulse_sequence(self, path: str) -> None:
+    @pyqtSlot()
+    def undo(self) -> None:
+        """This method reverts the last change of the pulse sequence."""
+        logger.debug("Undoing last change")
+        self.module.model.undo()
+
+    @pyqtSlot()
+    def redo(self) -> None:
+        """This method applies the last reverted change of the pulse sequence again."""
+        logger.debug("Redoing last change")
+        self.module.model.redo()
+
+    def save_pulse_sequence(self, path: str, background: bool = True) -> None:
         """This method saves the pulse sequence to a file.
 
+        The format is selected by the file extension, see sequence_io. The file is written to a temporary file first which then replaces the target file, so an existing file is never left partially written. By default the pulse sequence is serialized and written in a background thread. The thread gets a snapshot of the pulse sequence that is taken in the GUI thread, so the pulse sequence can be edited while it is saved.
+
         Args:
             path (str): The path to the file.
+            background (bool, optional): Whether the file is written in a background thread. Defaults to True.
         """
         logger.debug("Saving pulse sequence to %s", path)
-        # Get the name of the file without the extension and without the path
-        file_name = path.split("/")[-1].split(".")[0]
-        self.module.model.pulse_sequence.name = file_name
-        logger.debug("Pulse sequence name: %s", self.module.model.pulse_sequence.name)
+        self.module.model.sequence.name = sequence_io.get_sequence_name(path)
+        logger.debug("Pulse sequence name: %s", self.module.model.sequence.name)
         self.module.model.pulse_sequence_changed.emit()
 
-        sequence = self.module.model.pulse_sequence.to_json()
-        with open(path, "w") as file:
-            file.write(json.dumps(sequence, cls=DecimalEncoder))
+        if not background:
+            sequence_io.save_sequence(self.module.model.sequence, path)
+            return
+
+        self.start_sequence_worker(
+            f"Saving pulse sequence to {path}",
+            None,
+            sequence_io.save_sequence,
+            sequence_io.snapshot_sequence(self.module.model.sequence),
+            path,
+        )
 
-    def load_pulse_sequence(self, path: str) -> None:
+    def load_pulse_sequence(self, path: str, background: bool = True) -> None:
         """This method loads a pulse sequence from a file.
 
+        The format is selected by the file extension, see sequence_io. By default the file is read and parsed in a background thread. The pulse sequence of the model is replaced in the GUI thread once parsing is complete.
+
         Args:
             path (str): The path to the file.
+            background (bool, optional): Whether the file is read in a background thread. Defaults to True.
         """
         logger.debug("Loading pulse sequence from %s", path)
-        sequence = None
-        with open(path) as file:
-            sequence = file.read()
+        if not background:
+            self.on_pulse_sequence_loaded(sequence_io.load_sequence(path))
+            return
+
+        self.start_sequence_worker(
+            f"Loading pulse sequence from {path}",
+            self.on_pulse_sequence_loaded,
+            sequence_io.load_sequence,
+            path,
+        )
 
-        sequence = json.loads(sequence)
+    def save_sweep(self, directory: str, variables: list, parallel: bool, extension: str) -> None:
+        """This method saves the variants of a parameter sweep over the pulse sequence to a directory.
 
-        loaded_sequence = QuackSequence.load_sequence(
-            sequence
+        The variants are generated and written in a background thread from a snapshot of the pulse sequence.
+
+        Args:
+            directory (str): The directory of the variants.
+            variables (list): The sweep variables.
+            parallel (bool): Whether the variables are varied together instead of in all combinations.
+            extension (str): The file extension, which selects the format.
+        """
+        try:
+            sweep = Sweep(
+                sequence_io.snapshot_sequence(self.module.model.sequence),
+                variables,
+                parallel,
+            )
+        except ValueError as exception:
+            logger.error("Invalid sweep: %s", exception)
+            self.module.nqrduck_signal.emit("notification", ["Error", str(exception)])
+            return
+
+        logger.debug("Saving %s sweep variants to %s", len(sweep), directory)
+        self.start_sequence_worker(
+            f"Saving {len(sweep)} variants to {directory}",
+            None,
+            sweep.save_variants,
+            directory,
+            extension,
         )
 
-        self.module.model.pulse_sequence = loaded_sequence
+    def start_sequence_worker(self, description: str, on_finished, function, *args):
+        """Runs a function of sequence_io in the global QThreadPool.
+
+        Only one pulse sequence can be saved or loaded at a time.
+
+        Args:
+            description (str): The description of the operation.
+            on_finished (callable): The slot that is called with the result of the function or None.
+            function (callable): The function of sequence_io.
+            *args: The arguments of the function.
+
+        Returns:
+            SequenceWorker: The started worker or None if another operation is running.
+        """
+        if self.sequence_worker is not None:
+            logger.warning("A pulse sequence is already being saved or loaded")
+            self.module.nqrduck_signal.emit(
+                "notification",
+                ["Error", "A pulse sequence is already being saved or loaded"],
+            )
+            return None
+
+        worker = SequenceWorker(function, *args)
+        worker.signals.progress.connect(self.sequence_io_progress)
+        if on_finished is not None:
+            worker.signals.finished.connect(on_finished)
+        worker.signals.failed.connect(self.on_sequence_worker_failed)
+        worker.signals.finished.connect(self.on_sequence_worker_done)
+        worker.signals.failed.connect(self.on_sequence_worker_done)
+        worker.signals.cancelled.connect(self.on_sequence_worker_done)
+
+        self.sequence_worker = worker
+        self.sequence_io_started.emit(description)
+        QThreadPool.globalInstance().start(worker)
+        return worker
+
+    @pyqtSlot()
+    def cancel_sequence_io(self) -> None:
+        """Cancels the running save or load operation."""
+        if self.sequence_worker is not None:
+            logger.debug("Cancelling sequence worker")
+            self.sequence_worker.cancel()
+
+    @pyqtSlot(object)
+    def on_pulse_sequence_loaded(self, sequence) -> None:
+        """This method is called in the GUI thread when a pulse sequence was loaded.
+
+        Args:
+            sequence (QuackSequence): The loaded pulse sequence.
+        """
+        self.module.model.sequence = sequence
         self.module.model.events_changed.emit()
+
+    @pyqtSlot(object)
+    def on_sequence_worker_failed(self, exception) -> None:
+        """This method is called when saving or loading a pulse sequence failed.
+
+        Args:
+            exception (Exception): The exception that was raised.
+        """
+        if isinstance(exception, KeyError):
+            message = "Error loading pulse sequence -  maybe the version of the pulse sequence is not compatible?"
+        else:
+            message = f"Error saving or loading pulse sequence: {exception}"
+        self.module.nqrduck_signal.emit("notification", ["Error", message])
+
+    @pyqtSlot()
+    def on_sequence_worker_done(self) -> None:
+        """This method is called when the running save or load operation is complete, failed or was cancelled."""
+        self.sequence_worker = None
+        self.sequence_io_finished.emit()
@@ -0,0 +1,200 @@
+"""Opt-in timing instrumentation of the hot paths of the pulse programmer.
+
+The instrumented slots and functions record their call count, total and maximum duration. Counters record events such as rendered parameter icons, gauges record the last value of a quantity such as the number of widgets of the view. The report can be logged in production sessions to find slow refreshes without a profiler.
+
+The instrumentation is disabled by default and costs a single attribute check per call then. It is enabled with the environment variable NQRDUCK_PULSEPROGRAMMER_INSTRUMENTATION=1, in which case the report is logged when NQRduck exits, or at runtime:
+
+Example:
+    >>> pulse_programmer.instrumentation.enable()
+    >>> ...
+    >>> pulse_programmer.instrumentation.log_report()
+
+This module does not depend on Qt.
+"""
+
+import atexit
+import functools
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+ENVIRONMENT_VARIABLE = "NQRDUCK_PULSEPROGRAMMER_INSTRUMENTATION"
+
+
+class Instrumentation:
+    """Collects the durations of instrumented calls, counters and gauges.
+
+    Calls can be recorded from the GUI thread and from the background threads that save and load pulse sequences.
+
+    Args:
+        enabled (bool, optional): Whether the instrumentation records anything. Defaults to False.
+
+    Attributes:
+        timings (dict): The call count, the total and the maximum duration in seconds by name.
+        counters (Counter): The counters by name.
+        gauges (dict): The last value of the gauges by name.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """Initializes the instrumentation."""
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.timings = {}
+        self.counters = Counter()
+        self.gauges = {}
+
+    def enable(self) -> None:
+        """Starts recording."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stops recording. The recorded data is kept."""
+        self.enabled = False
+
+    def record(self, name: str, duration: float) -> None:
+        """Records the duration of a call.
+
+        Args:
+            name (str): The name of the instrumented code.
+            duration (float): The duration in seconds.
+        """
+        with self.lock:
+            timing = self.timings.setdefault(name, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += duration
+            timing[2] = max(timing[2], duration)
+
+    @contextmanager
+    def measure(self, name: str):
+        """Records the duration of a block of code.
+
+        Example:
+            >>> with instrumentation.measure("view.parameter_dialog"):
+            ...     dialog = build_dialog()
+
+        Args:
+            name (str): The name of the instrumented code.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name: str):
+        """Returns a decorator that records the durations of calls of a function.
+
+        The decorator is applied below pyqtSlot, so the slot signature is kept.
+
+        Example:
+            >>> @pyqtSlot()
+            ... @instrumentation.timed("view.on_events_changed")
+            ... def on_events_changed(self) -> None:
+
+        Args:
+            name (str): The name of the instrumented function.
+
+        Returns:
+            callable: The decorator.
+        """
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def count(self, name: str, step: int = 1) -> None:
+        """Increments a counter.
+
+        Args:
+            name (str): The name of the counter.
+            step (int, optional): The increment. Defaults to 1.
+        """
+        if self.enabled:
+            with self.lock:
+                self.counters[name] += step
+
+    def set_gauge(self, name: str, value) -> None:
+        """Sets the value of a gauge.
+
+        Args:
+            name (str): The name of the gauge.
+            value (float): The value.
+        """
+        if self.enabled:
+            with self.lock:
+                self.gauges[name] = value
+
+    def get_report(self) -> dict:
+        """Returns the recorded data.
+
+        Returns:
+            dict: The timings with the call count, total, mean and maximum duration in ms, the counters and the gauges.
+        """
+        with self.lock:
+            timings = {
+                name: {
+                    "count": count,
+                    "total_ms": total * 1e3,
+                    "mean_ms": total / count * 1e3,
+                    "max_ms": maximum * 1e3,
+                }
+                for name, (count, total, maximum) in sorted(self.timings.items())
+            }
+            return {
+                "timings": timings,
+                "counters": dict(sorted(self.counters.items())),
+                "gauges": dict(sorted(self.gauges.items())),
+            }
+
+    def log_report(self, level: int = logging.INFO) -> None:
+        """Logs the recorded data.
+
+        Args:
+            level (int, optional): The log level. Defaults to logging.INFO.
+        """
+        report = self.get_report()
+        for name, timing in report["timings"].items():
+            logger.log(
+                level,
+                "%s: %s calls, %.2f ms total, %.2f ms mean, %.2f ms max",
+                name,
+                timing["count"],
+                timing["total_ms"],
+                timing["mean_ms"],
+                timing["max_ms"],
+            )
+        for name, value in report["counters"].items():
+            logger.log(level, "%s: %s", name, value)
+        for name, value in report["gauges"].items():
+            logger.log(level, "%s: %s", name, value)
+
+    def reset(self) -> None:
+        """Removes the recorded data."""
+        with self.lock:
+            self.timings.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+
+instrumentation = Instrumentation(os.environ.get(ENVIRONMENT_VARIABLE, "0") not in ("", "0"))
+if instrumentation.enabled:
+    atexit.register(instrumentation.log_report)
@@ -0,0 +1,190 @@
+"""Shared storage of identical pulse parameters.
+
+Every event of a quackseq pulse sequence has its own pulse parameter objects with their own options, including the pulse shape functions. Most events of a pulse sequence use the same few configurations, so the pulse programmer interns the pulse parameters: events with identical configurations share a single canonical instance.
+
+The canonical instances are copy-on-write. They must not be changed in place, an event that is edited gets a private copy with ParameterPool.detach first, which is interned again once the edit is done.
+
+The pool only holds weak references to the canonical instances. An instance that is no longer used by an event or the undo stack is released and its configuration is removed from the pool.
+
+This module does not depend on Qt.
+"""
+
+import copy
+import json
+import logging
+import weakref
+
+from nqrduck.helpers.serializer import DecimalEncoder
+from quackseq.pulsesequence import PulseSequence
+from quackseq.pulseparameters import PulseParameter, FunctionOption
+
+logger = logging.getLogger(__name__)
+
+
+def get_function_key(function) -> tuple:
+    """Returns the key of a pulse shape function.
+
+    The sympy expression is part of the key itself, since printing it as it is done by Function.to_json takes much longer than comparing it.
+
+    Args:
+        function (Function): The pulse shape function.
+
+    Returns:
+        tuple: The class, the name, the expression, the parameters and the sampling of the function.
+    """
+    parameters = json.dumps(
+        [parameter.to_json() for parameter in function.parameters],
+        cls=DecimalEncoder,
+        sort_keys=True,
+    )
+    return (
+        type(function),
+        function.name,
+        function.expr,
+        parameters,
+        function.resolution,
+        function.start_x,
+        function.end_x,
+    )
+
+
+def get_option_key(option) -> tuple:
+    """Returns the key of an option of a pulse parameter.
+
+    Args:
+        option (Option): The option.
+
+    Returns:
+        tuple: The class and the serialized option or, for function options, the keys of the selected and the available functions.
+    """
+    if isinstance(option, FunctionOption):
+        return (
+            type(option),
+            option.name,
+            get_function_key(option.value),
+            tuple(get_function_key(function) for function in option.functions),
+        )
+    return (type(option), json.dumps(option.to_json(), cls=DecimalEncoder, sort_keys=True))
+
+
+class ParameterPool:
+    """Pool of the canonical pulse parameter instances of a pulse sequence.
+
+    Attributes:
+        instances (weakref.WeakValueDictionary): The canonical pulse parameters by their configuration key.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the empty parameter pool."""
+        self.instances = weakref.WeakValueDictionary()
+        # Weak references by id, the id of a released instance may be reused by another object
+        self._refs = {}
+
+    @staticmethod
+    def get_key(parameter: PulseParameter) -> tuple:
+        """Returns the configuration key of a pulse parameter.
+
+        Args:
+            parameter (PulseParameter): The pulse parameter.
+
+        Returns:
+            tuple: The class, the name and the keys of the options of the pulse parameter.
+        """
+        options = tuple(get_option_key(option) for option in parameter.options)
+        return (type(parameter), parameter.name, options)
+
+    def is_interned(self, parameter: PulseParameter) -> bool:
+        """Checks if a pulse parameter is a canonical instance that may be shared.
+
+        Args:
+            parameter (PulseParameter): The pulse parameter.
+
+        Returns:
+            bool: True if the pulse parameter is in the pool.
+        """
+        ref = self._refs.get(id(parameter))
+        return ref is not None and ref() is parameter
+
+    def add_canonical(self, parameter: PulseParameter) -> None:
+        """Marks a pulse parameter as canonical instance until it is released.
+
+        Args:
+            parameter (PulseParameter): The pulse parameter.
+        """
+        key = id(parameter)
+
+        def release(ref) -> None:
+            if self._refs.get(key) is ref:
+                del self._refs[key]
+
+        self._refs[key] = weakref.ref(parameter, release)
+
+    def intern(self, parameter: PulseParameter) -> PulseParameter:
+        """Returns the canonical instance for the configuration of a pulse parameter.
+
+        If there is no canonical instance yet, the pulse parameter becomes the canonical instance and must not be changed in place afterwards.
+
+        Args:
+            parameter (PulseParameter): The pulse parameter.
+
+        Returns:
+            PulseParameter: The canonical instance.
+        """
+        if self.is_interned(parameter):
+            return parameter
+        canonical = self.instances.setdefault(self.get_key(parameter), parameter)
+        if canonical is parameter:
+            self.add_canonical(canonical)
+        return canonical
+
+    def intern_event(self, event) -> None:
+        """Replaces the pulse parameters of an event with their canonical instances.
+
+        Args:
+            event (Event): The event.
+        """
+        for name, parameter in event.parameters.items():
+            event.parameters[name] = self.intern(parameter)
+
+    def intern_sequence(self, sequence: PulseSequence) -> None:
+        """Rebuilds the pool from the pulse parameters of a pulse sequence.
+
+        This is needed after the pulse parameters were changed in place, e.g. by PulseSequence.update_options. Every distinct instance is only serialized once.
+
+        Args:
+            sequence (PulseSequence): The pulse sequence.
+        """
+        self.instances = weakref.WeakValueDictionary()
+        self._refs = {}
+        # The instances are kept alive while the pool is built, so their ids are unique
+        keys = {}
+        for event in sequence.events:
+            for name, parameter in event.parameters.items():
+                if id(parameter) not in keys:
+                    keys[id(parameter)] = (self.get_key(parameter), parameter)
+                key = keys[id(parameter)][0]
+                event.parameters[name] = self.instances.setdefault(key, parameter)
+        for parameter in self.instances.values():
+            self.add_canonical(parameter)
+
+        logger.debug(
+            "Interned %s distinct pulse parameter instances to %s configurations",
+            len(keys),
+            len(self.instances),
+        )
+
+    def detach(self, event, name: str) -> PulseParameter:
+        """Gives an event a private copy of a pulse parameter that can be changed in place.
+
+        Args:
+            event (Event): The event.
+            name (str): The name of the pulse parameter.
+
+        Returns:
+            PulseParameter: The private pulse parameter of the event.
+        """
+        parameter = event.parameters[name]
+        if self.is_interned(parameter):
+            parameter = copy.deepcopy(parameter)
+            event.parameters[name] = parameter
+        return parameter
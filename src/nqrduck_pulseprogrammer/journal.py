@@ -0,0 +1,298 @@
+"""Autosave journal of the pulse programmer.
+
+The autosave consists of a snapshot of the pulse sequence in the binary format of sequence_io and an append-only journal of the operations that were applied to the pulse sequence since the snapshot was written. Every operation is a single JSON line, so recording an edit only appends a short line to the journal. The pulse sequence is restored by loading the snapshot and replaying the journal.
+
+To bound the size of the journal it is compacted into a new snapshot after MAX_RECORDS operations. The first line of the journal names the snapshot it applies to. A new snapshot is written under a new name before the journal is replaced, so a crash during compaction always leaves a snapshot and a journal that belong together.
+
+This module does not depend on Qt.
+"""
+
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+
+from nqrduck.helpers.serializer import DecimalEncoder
+from quackseq.pulsesequence import QuackSequence
+from quackseq.pulseparameters import Option
+from quackseq.event import Event
+
+from . import sequence_io
+from .interning import ParameterPool
+from .repeat import get_repeat_blocks, set_repeat_blocks
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceJournal:
+    """Append-only autosave journal for a pulse sequence.
+
+    Events are referenced by their index in the pulse sequence, so the operations have to be replayed in the order they were recorded.
+
+    Args:
+        directory (str): The directory of the snapshot and the journal.
+        max_records (int, optional): The number of operations after which the journal is compacted. Defaults to MAX_RECORDS.
+
+    Attributes:
+        SNAPSHOT_PREFIX (str): The prefix of the file names of the snapshots.
+        JOURNAL_NAME (str): The file name of the journal.
+        MAX_RECORDS (int): The default number of operations after which the journal is compacted.
+        records (int): The number of operations in the journal.
+    """
+
+    SNAPSHOT_PREFIX = "autosave-"
+    JOURNAL_NAME = "autosave.journal"
+    MAX_RECORDS = 1000
+
+    def __init__(self, directory: str, max_records: int = MAX_RECORDS) -> None:
+        """Initializes the journal."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.directory / self.JOURNAL_NAME
+        self.max_records = max_records
+        self.records = 0
+        self._file = None
+
+    def get_snapshot_path(self, snapshot: str) -> Path:
+        """Returns the path of a snapshot.
+
+        Args:
+            snapshot (str): The name of the snapshot.
+
+        Returns:
+            Path: The path of the snapshot file.
+        """
+        return self.directory / f"{self.SNAPSHOT_PREFIX}{snapshot}.{sequence_io.BINARY_EXTENSION}"
+
+    def has_autosave(self) -> bool:
+        """Checks if there is an autosave that can be restored.
+
+        Returns:
+            bool: True if the journal exists and is not empty.
+        """
+        return self.journal_path.exists() and self.journal_path.stat().st_size > 0
+
+    def restore(self) -> QuackSequence:
+        """Restores the pulse sequence from the snapshot and the journal.
+
+        A truncated or invalid line at the end of the journal, e.g. from a crash while it was written, is skipped together with all following lines.
+
+        Returns:
+            QuackSequence: The restored pulse sequence or None if there is no autosave.
+        """
+        if not self.has_autosave():
+            return None
+
+        self.records = 0
+        with open(self.journal_path, "rb+") as file:
+            try:
+                snapshot = json.loads(file.readline())["snapshot"]
+            except (ValueError, KeyError):
+                logger.warning("Autosave journal has no valid header")
+                return None
+            if snapshot is None:
+                sequence = QuackSequence("Untitled pulse sequence")
+            else:
+                sequence = sequence_io.load_sequence(str(self.get_snapshot_path(snapshot)))
+            # Events with identical pulse parameters share one instance, which replay must not change in place
+            pool = ParameterPool()
+            pool.intern_sequence(sequence)
+
+            valid_size = file.tell()
+            for line in iter(file.readline, b""):
+                try:
+                    self.replay(sequence, json.loads(line), pool)
+                except (ValueError, KeyError, IndexError, TypeError) as exception:
+                    logger.warning(
+                        "Skipping rest of the journal after %s records: %s",
+                        self.records,
+                        exception,
+                    )
+                    # New records must not be appended after the invalid line
+                    file.truncate(valid_size)
+                    break
+                valid_size = file.tell()
+                self.records += 1
+
+        logger.debug("Replayed %s journal records", self.records)
+        return sequence
+
+    @staticmethod
+    def replay(sequence: QuackSequence, record: dict, pool: ParameterPool) -> None:
+        """Applies a single journal record to a pulse sequence.
+
+        Changed pulse parameters are copied before they are changed, like in PulseProgrammerModel.apply, so events that share them with the changed event keep their options.
+
+        Args:
+            sequence (QuackSequence): The pulse sequence.
+            record (dict): The journal record.
+            pool (ParameterPool): The parameter pool of the pulse sequence.
+
+        Raises:
+            ValueError: If the operation of the record is unknown.
+        """
+        operation = record["operation"]
+        events = sequence.events
+        if operation == "insert":
+            event = Event.load_event(record["event"], sequence)
+            pool.intern_event(event)
+            events.insert(record["index"], event)
+        elif operation == "remove":
+            del events[record["index"]]
+        elif operation == "move":
+            events.insert(record["new_index"], events.pop(record["index"]))
+        elif operation == "rename":
+            events[record["index"]].name = record["name"]
+        elif operation == "duration":
+            events[record["index"]].duration = record["duration"]
+        elif operation == "parameter":
+            event = events[record["index"]]
+            parameter = pool.detach(event, record["parameter"])
+            parameter.options = [Option.from_json(option) for option in record["options"]]
+            event.parameters[record["parameter"]] = pool.intern(parameter)
+        elif operation == "repeat":
+            set_repeat_blocks(sequence, record["blocks"])
+        else:
+            raise ValueError(f"Unknown journal operation {operation}")
+
+    def append(self, operation: str, **data) -> None:
+        """Appends an operation to the journal.
+
+        The line is flushed immediately so that it survives a crash of the application.
+
+        Args:
+            operation (str): The name of the operation.
+            **data: The data of the operation.
+        """
+        if self._file is None:
+            self._file = open(self.journal_path, "a")
+            if self._file.tell() == 0:
+                # A journal without snapshot starts with an empty pulse sequence
+                self._file.write(json.dumps({"snapshot": None}) + "\n")
+        self._file.write(json.dumps({"operation": operation, **data}, cls=DecimalEncoder) + "\n")
+        self._file.flush()
+        self.records += 1
+
+    def needs_compaction(self) -> bool:
+        """Checks if the journal should be compacted into a new snapshot.
+
+        Returns:
+            bool: True if the journal holds more than max_records operations.
+        """
+        return self.records >= self.max_records
+
+    def record_insert(self, sequence: QuackSequence, index: int) -> None:
+        """Records that an event was inserted.
+
+        Args:
+            sequence (QuackSequence): The pulse sequence.
+            index (int): The index of the new event.
+        """
+        self.append("insert", index=index, event=sequence_io.event_to_json(sequence.events[index]))
+
+    def record_remove(self, index: int) -> None:
+        """Records that an event was removed.
+
+        Args:
+            index (int): The former index of the event.
+        """
+        self.append("remove", index=index)
+
+    def record_move(self, index: int, new_index: int) -> None:
+        """Records that an event was moved.
+
+        Args:
+            index (int): The old index of the event.
+            new_index (int): The new index of the event.
+        """
+        self.append("move", index=index, new_index=new_index)
+
+    def record_rename(self, sequence: QuackSequence, index: int) -> None:
+        """Records that an event was renamed.
+
+        Args:
+            sequence (QuackSequence): The pulse sequence.
+            index (int): The index of the event.
+        """
+        self.append("rename", index=index, name=sequence.events[index].name)
+
+    def record_duration(self, sequence: QuackSequence, index: int) -> None:
+        """Records that the duration of an event changed.
+
+        Args:
+            sequence (QuackSequence): The pulse sequence.
+            index (int): The index of the event.
+        """
+        self.append("duration", index=index, duration=sequence.events[index].duration)
+
+    def record_parameter(self, sequence: QuackSequence, index: int, parameter: str) -> None:
+        """Records that the options of a pulse parameter of an event changed.
+
+        Args:
+            sequence (QuackSequence): The pulse sequence.
+            index (int): The index of the event.
+            parameter (str): The name of the pulse parameter.
+        """
+        options = sequence.events[index].parameters[parameter].options
+        self.append(
+            "parameter",
+            index=index,
+            parameter=parameter,
+            options=[option.to_json() for option in options],
+        )
+
+    def record_repeat(self, sequence: QuackSequence) -> None:
+        """Records that the repeat blocks of the pulse sequence changed.
+
+        Args:
+            sequence (QuackSequence): The pulse sequence.
+        """
+        self.append("repeat", blocks=get_repeat_blocks(sequence))
+
+    def write_snapshot(self, sequence: QuackSequence) -> None:
+        """Writes a snapshot of the pulse sequence and starts a new journal for it.
+
+        The new snapshot is written next to the old one and the journal is replaced atomically afterwards. Snapshots that are not referenced by the journal anymore are removed.
+
+        Args:
+            sequence (QuackSequence): The pulse sequence.
+        """
+        logger.debug("Writing autosave snapshot with %s events", len(sequence.events))
+        snapshot = uuid.uuid4().hex
+        sequence_io.save_sequence(sequence, str(self.get_snapshot_path(snapshot)))
+
+        self.close()
+        temporary_path = self.journal_path.with_suffix(".tmp")
+        with open(temporary_path, "w") as file:
+            file.write(json.dumps({"snapshot": snapshot}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.journal_path)
+        sequence_io.sync_directory(self.directory)
+        self.records = 0
+
+        self.remove_snapshots(keep=snapshot)
+
+    def remove_snapshots(self, keep: str = None) -> None:
+        """Removes the snapshot files of the journal.
+
+        Args:
+            keep (str, optional): The name of a snapshot that is not removed. Defaults to None.
+        """
+        for path in self.directory.glob(f"{self.SNAPSHOT_PREFIX}*"):
+            if keep is None or path != self.get_snapshot_path(keep):
+                path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Removes the journal and all snapshots."""
+        self.close()
+        self.journal_path.unlink(missing_ok=True)
+        self.remove_snapshots()
+        self.records = 0
+
+    def close(self) -> None:
+        """Closes the journal file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
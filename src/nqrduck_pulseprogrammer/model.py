@@ -1,10 +1,21 @@
 """Model for the pulse programmer module."""
 
 import logging
+from contextlib import contextmanager
 from PyQt6.QtCore import pyqtSignal
 from nqrduck.module.module_model import ModuleModel
 from quackseq.pulsesequence import QuackSequence
 from quackseq.event import Event
+from quackseq.pulseparameters import TableOption
+from . import sequence_io
+from .undo import UndoStack
+from . import repeat
+from .validation import SequenceValidator
+from .timing import TimingIndex
+from .interning import ParameterPool
+from .content_hash import SequenceHash
+from .compile_cache import compile_cache
+from .instrumentation import instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -14,20 +25,48 @@ class PulseProgrammerModel(ModuleModel):
 
     This class is responsible for storing the data of the pulse programmer module.
 
+    Events with identical pulse parameter configurations share one pulse parameter instance from the parameter pool. Shared instances are never changed in place, see detach_parameter.
+
+    pulse_sequence is the edited pulse sequence. Spectrometer modules that support repeat blocks run expanded_sequence, in which the repeat blocks are unrolled.
+
+    Spectrometer modules that translate the pulse sequence before a measurement can skip the translation of unchanged pulse sequences with get_compiled, which caches the result by pulse_sequence_hash and the spectrometer settings.
+
     Attributes:
         FILE_EXTENSION (str): The file extension for pulse programmer files.
+        BINARY_FILE_EXTENSION (str): The file extension for binary pulse programmer files.
 
     Signals:
-        pulse_parameter_options_changed: Emitted when the pulse parameter options change.
-        events_changed: Emitted when the events in the pulse sequence change.
-        pulse_sequence_changed: Emitted when the pulse sequence changes.
+        pulse_parameter_options_changed: Emitted when the pulse parameters of the pulse sequence change, e.g. after the active spectrometer changed.
+        events_changed: Emitted when the events in the pulse sequence change in a way that requires a full refresh.
+        pulse_sequence_changed: Emitted when the pulse sequence changes. The content hash of the new pulse sequence is pulse_sequence_hash.
+        event_inserted: Emitted with the index of an event that was added to the pulse sequence.
+        event_removed: Emitted with the former index of an event that was deleted from the pulse sequence.
+        event_moved: Emitted with the old and the new index of an event that was moved.
+        event_renamed: Emitted with the index of an event that was renamed.
+        event_duration_changed: Emitted with the index of an event whose duration changed.
+        event_parameter_changed: Emitted with the index of an event and the name of the pulse parameter whose options changed.
+        undo_stack_changed: Emitted when a step was added to or removed from the undo or redo stack.
+        repeat_blocks_changed: Emitted when a repeat block was added, removed or its repeat count changed.
+        problems_changed: Emitted with the index of an event whose validation problems changed or -1 if the problems of the whole pulse sequence may have changed.
     """
 
-    FILE_EXTENSION = "quack"
+    FILE_EXTENSION = sequence_io.JSON_EXTENSION
+    BINARY_FILE_EXTENSION = sequence_io.BINARY_EXTENSION
 
+    pulse_parameter_options_changed = pyqtSignal()
     events_changed = pyqtSignal()
     pulse_sequence_changed = pyqtSignal()
 
+    event_inserted = pyqtSignal(int)
+    event_removed = pyqtSignal(int)
+    event_moved = pyqtSignal(int, int)
+    event_renamed = pyqtSignal(int)
+    event_duration_changed = pyqtSignal(int)
+    event_parameter_changed = pyqtSignal(int, str)
+    undo_stack_changed = pyqtSignal()
+    repeat_blocks_changed = pyqtSignal()
+    problems_changed = pyqtSignal(int)
+
     def __init__(self, module):
         """Initializes the pulse programmer model.
 
@@ -35,7 +74,61 @@ class PulseProgrammerModel(ModuleModel):
             module (Module): The module to which this model belongs.
         """
         super().__init__(module)
-        self.pulse_sequence = QuackSequence("Untitled pulse sequence")
+        self._batch_depth = 0
+        self._batch_changed = False
+        self._undo_step = []
+        self._undoing = False
+        self.undo_stack = UndoStack()
+        self._expanded_sequence = None
+        self.parameter_pool = ParameterPool()
+        # Whether the options of the pulse parameters may be outdated, see update_options
+        self.options_dirty = True
+        self._pulse_parameter_options = None
+        self.compile_cache = compile_cache
+        sequence = QuackSequence("Untitled pulse sequence")
+        self.validator = SequenceValidator(sequence)
+        self.timing = TimingIndex(sequence)
+        self.content_hash = SequenceHash(sequence, self.parameter_pool)
+        self.sequence = sequence
+
+    @contextmanager
+    def batch(self):
+        """Groups several changes of the pulse sequence into a single notification.
+
+        Within the batch no fine-grained signals are emitted. When the outermost batch is left, events_changed is emitted once if anything changed. All changes of the batch are undone in a single step.
+
+        Example:
+            >>> with model.batch():
+            ...     model.add_event("Pulse", 3)
+            ...     model.add_event("Readout", 100)
+
+        Yields:
+            PulseProgrammerModel: The model.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                if self._undo_step:
+                    self.push_undo_step(self._undo_step)
+                    self._undo_step = []
+                if self._batch_changed:
+                    self._batch_changed = False
+                    self.events_changed.emit()
+
+    def notify(self, signal, *args) -> None:
+        """Emits a fine-grained signal or defers it if a batch is active.
+
+        Args:
+            signal (pyqtBoundSignal): The signal that should be emitted.
+            *args: The arguments of the signal.
+        """
+        if self._batch_depth:
+            self._batch_changed = True
+        else:
+            signal.emit(*args)
 
     def add_event(self, event_name: str, duration: float = 20):
         """Add a new event to the current pulse sequence.
@@ -44,20 +137,574 @@ class PulseProgrammerModel(ModuleModel):
             event_name (str): A human-readable name for the event
             duration (float): The duration of the event in µs. Defaults to 20.
         """
-        logger.debug(f"Adding event {event_name} with duration {duration}")
-        
-        event = Event(event_name, f"{duration}u", self.pulse_sequence)
-        self.pulse_sequence.add_event(event)
+        logger.debug("Adding event %s with duration %s", event_name, duration)
+
+        if self.has_event(event_name):
+            raise ValueError(
+                f"Event with name {event_name} already exists in the pulse sequence"
+            )
+
+        event = Event(event_name, f"{duration}u", self.sequence)
+        # The name check was already done with the event index
+        self.apply(("insert", len(self.sequence.events), event))
+
+        # Serializing the whole pulse sequence is expensive, so only do it if it is logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Pulse sequence: %s", self.sequence.to_json())
+
+    def add_events(self, events) -> None:
+        """Adds several events to the current pulse sequence with a single notification.
+
+        Args:
+            events (list): The events as tuples of name and duration in µs.
+        """
+        with self.batch():
+            for event_name, duration in events:
+                self.add_event(event_name, duration)
+
+    def rebuild_event_index(self) -> None:
+        """Rebuilds the mapping of event names to their index in the pulse sequence."""
+        self._event_index = {
+            event.name: index for index, event in enumerate(self.sequence.events)
+        }
+
+    def get_event_index(self, event_name: str) -> int:
+        """Returns the index of an event in the pulse sequence.
+
+        The lookup uses the event index of the model. If the event index does not match the pulse sequence anymore because it was changed without the model (e.g. with the quackseq API), it is rebuilt.
+
+        Args:
+            event_name (str): The name of the event.
+
+        Returns:
+            int: The index of the event or -1 if there is no event with this name.
+        """
+        events = self.sequence.events
+        index = self._event_index.get(event_name)
+        if index is not None and index < len(events) and events[index].name == event_name:
+            return index
+
+        if index is None and len(self._event_index) == len(events):
+            return -1
+
+        logger.debug("Event index is outdated, rebuilding it")
+        self.rebuild_event_index()
+        return self._event_index.get(event_name, -1)
+
+    def has_event(self, event_name: str) -> bool:
+        """Checks if there is an event with the given name in the pulse sequence.
+
+        Args:
+            event_name (str): The name of the event.
+
+        Returns:
+            bool: True if there is an event with this name.
+        """
+        return self.get_event_index(event_name) >= 0
+
+    def get_event(self, event_name: str):
+        """Returns the event with the given name.
+
+        Args:
+            event_name (str): The name of the event.
+
+        Returns:
+            Event: The event or None if there is no event with this name.
+        """
+        index = self.get_event_index(event_name)
+        if index < 0:
+            return None
+        return self.sequence.events[index]
+
+    def delete_event(self, event_name: str) -> None:
+        """Deletes an event from the pulse sequence.
+
+        Args:
+            event_name (str): The name of the event to be deleted.
+        """
+        index = self.get_event_index(event_name)
+        if index < 0:
+            return
+        self.apply_with_blocks(
+            ("remove", index, self.sequence.events[index]),
+            repeat.remove_event(self.get_repeat_blocks(), index),
+        )
 
-        logger.debug(self.pulse_sequence.to_json())
-        self.events_changed.emit()
+    def rename_event(self, old_name: str, new_name: str) -> None:
+        """Changes the name of an event.
+
+        Args:
+            old_name (str): The old name of the event.
+            new_name (str): The new name of the event.
+        """
+        index = self.get_event_index(old_name)
+        if index < 0 or old_name == new_name:
+            return
+        if self.has_event(new_name):
+            raise ValueError(
+                f"Event with name {new_name} already exists in the pulse sequence"
+            )
+        self.apply(("rename", index, old_name, new_name))
+
+    def set_event_duration(self, event_name: str, duration: str) -> None:
+        """Changes the duration of an event.
+
+        Args:
+            event_name (str): The name of the event.
+            duration (str): The new duration of the event with a unit suffix (n, u, m).
+        """
+        index = self.get_event_index(event_name)
+        if index < 0:
+            return
+        event = self.sequence.events[index]
+        old_duration = event.duration
+        event.duration = duration
+        # The duration was converted and validated by the event
+        self.apply(("duration", index, old_duration, event.duration))
+
+    def set_durations(self, durations: dict) -> None:
+        """Changes the durations of several events with a single notification.
+
+        Args:
+            durations (dict): The new durations with a unit suffix (n, u, m) by event name.
+        """
+        with self.batch():
+            for event_name, duration in durations.items():
+                self.set_event_duration(event_name, duration)
+
+    def move_event(self, event_name: str, offset: int) -> None:
+        """Moves an event by the given offset if the new position lies within the pulse sequence.
+
+        Args:
+            event_name (str): The name of the event to be moved.
+            offset (int): The number of positions the event is moved. Negative values move the event to the left.
+        """
+        events = self.sequence.events
+        index = self.get_event_index(event_name)
+        new_index = index + offset
+        if index < 0 or not 0 <= new_index < len(events):
+            return
+        self.apply_with_blocks(
+            ("move", index, new_index),
+            repeat.move_event(self.get_repeat_blocks(), index, new_index),
+        )
+
+    def get_repeat_blocks(self) -> list:
+        """Returns the repeat blocks of the pulse sequence.
+
+        Returns:
+            list: The repeat blocks as tuples of start index, number of events and repeat count.
+        """
+        return repeat.get_repeat_blocks(self.sequence)
+
+    def get_repeat_block(self, event_name: str) -> tuple:
+        """Returns the repeat block that contains an event.
+
+        Args:
+            event_name (str): The name of the event.
+
+        Returns:
+            tuple: The repeat block or None if the event is not repeated.
+        """
+        return repeat.get_block_at(self.get_repeat_blocks(), self.get_event_index(event_name))
+
+    def set_repeat_block(self, first_event: str, last_event: str, count: int) -> None:
+        """Repeats a range of events.
+
+        Repeat blocks that overlap the range are replaced. A repeat count of one removes the repetition of the range.
+
+        Args:
+            first_event (str): The name of the first event of the range.
+            last_event (str): The name of the last event of the range.
+            count (int): The number of times the events are played.
+
+        Raises:
+            ValueError: If an event does not exist, the last event lies before the first event or the repeat count is below one.
+        """
+        start = self.get_event_index(first_event)
+        end = self.get_event_index(last_event)
+        if start < 0 or end < 0:
+            raise ValueError(f"Events {first_event} and {last_event} not found in the pulse sequence")
+        if end < start:
+            raise ValueError(f"Event {last_event} lies before event {first_event}")
+        if count < 1:
+            raise ValueError("The repeat count must be at least one")
+
+        blocks = [
+            block
+            for block in self.get_repeat_blocks()
+            if block[0] + block[1] <= start or block[0] > end
+        ]
+        if count > 1:
+            blocks.append((start, end - start + 1, count))
+        self.apply_with_blocks(None, sorted(blocks))
+
+    def remove_repeat_block(self, event_name: str) -> None:
+        """Removes the repeat block that contains an event.
+
+        Args:
+            event_name (str): The name of an event of the repeat block.
+        """
+        block = self.get_repeat_block(event_name)
+        if block is None:
+            return
+        blocks = [other for other in self.get_repeat_blocks() if other != block]
+        self.apply_with_blocks(None, blocks)
+
+    def apply_with_blocks(self, delta: tuple, blocks: list) -> None:
+        """Applies a delta and sets the repeat blocks that are valid after the delta.
+
+        If the repeat blocks change, both are applied in a batch, so they are undone in a single step.
+
+        Args:
+            delta (tuple): The delta or None if only the repeat blocks change.
+            blocks (list): The repeat blocks after the delta.
+        """
+        old_blocks = self.get_repeat_blocks()
+        if blocks == old_blocks:
+            if delta is not None:
+                self.apply(delta)
+            return
+
+        blocks_delta = ("repeat", 0, old_blocks, blocks)
+        if delta is None:
+            self.apply(blocks_delta)
+            return
+        with self.batch():
+            self.apply(delta)
+            self.apply(blocks_delta)
+
+    def set_parameter_values(self, event_name: str, parameter: str, values: list) -> None:
+        """Sets the values of the options of a pulse parameter of an event.
+
+        Args:
+            event_name (str): The name of the event.
+            parameter (str): The name of the pulse parameter.
+            values (list): The new values of the options in the order of the options of the pulse parameter.
+        """
+        index = self.get_event_index(event_name)
+        if index < 0:
+            return
+        options = self.sequence.events[index].parameters[parameter].options
+        old_values = [self.get_option_value(option) for option in options]
+        self.apply(("parameter", index, parameter, old_values, list(values)))
+
+    def set_parameter_values_of_events(self, event_names: list, parameter: str, values: list) -> None:
+        """Sets the values of the options of a pulse parameter of several events with a single notification.
+
+        All events are changed in a single undo step.
+
+        Args:
+            event_names (list): The names of the events.
+            parameter (str): The name of the pulse parameter.
+            values (list): The new values of the options in the order of the options of the pulse parameter.
+        """
+        with self.batch():
+            for event_name in event_names:
+                self.set_parameter_values(event_name, parameter, values)
+
+    @staticmethod
+    def get_option_value(option):
+        """Returns the value of an option in the form that is accepted by its set_value method.
+
+        Args:
+            option (Option): The option.
+
+        Returns:
+            The value of the option.
+        """
+        if isinstance(option, TableOption):
+            return option.get_value()
+        return option.value
+
+    @instrumentation.timed("model.apply")
+    def apply(self, delta: tuple) -> None:
+        """Applies a delta to the pulse sequence, see undo for the available deltas.
+
+        The event index, the timing index and the validation problems are updated, the fine-grained signal of the change is emitted and the delta is recorded for undo.
+
+        Args:
+            delta (tuple): The delta.
+        """
+        operation, index, *data = delta
+        events = self.sequence.events
+        self._expanded_sequence = None
+        if operation == "insert":
+            self.parameter_pool.intern_event(data[0])
+            events.insert(index, data[0])
+            self.update_event_index(index, len(events) - 1)
+            signal = (self.event_inserted, index)
+        elif operation == "remove":
+            del self._event_index[events.pop(index).name]
+            self.update_event_index(index, len(events) - 1)
+            signal = (self.event_removed, index)
+        elif operation == "move":
+            new_index = data[0]
+            events.insert(new_index, events.pop(index))
+            self.update_event_index(min(index, new_index), max(index, new_index))
+            signal = (self.event_moved, index, new_index)
+        elif operation == "rename":
+            old_name, new_name = data
+            events[index].name = new_name
+            del self._event_index[old_name]
+            self._event_index[new_name] = index
+            signal = (self.event_renamed, index)
+        elif operation == "duration":
+            events[index].duration = data[-1]
+            signal = (self.event_duration_changed, index)
+        elif operation == "parameter":
+            parameter = data[0]
+            # Shared pulse parameters are copied before they are changed
+            pulse_parameter = self.parameter_pool.detach(events[index], parameter)
+            for option, value in zip(pulse_parameter.options, data[-1]):
+                logger.debug("Setting value %s for option %s", value, option)
+                option.set_value(value)
+            events[index].parameters[parameter] = self.parameter_pool.intern(
+                pulse_parameter
+            )
+            signal = (self.event_parameter_changed, index, parameter)
+        elif operation == "repeat":
+            # The blocks may not match the events in the middle of an undo step
+            repeat.set_repeat_blocks(self.sequence, data[-1], validate=False)
+            signal = (self.repeat_blocks_changed,)
+        else:
+            raise ValueError(f"Unknown operation {operation}")
+
+        # Events with other pulse parameters may change the options, e.g. the number of phase cycles
+        if operation in ("insert", "remove", "parameter"):
+            self.options_dirty = True
+
+        # The timing index and the validator are updated before the slots see the change
+        self.timing.apply(delta)
+        self.content_hash.apply(delta)
+        # Only the events affected by the delta are checked again
+        problems = self.validator.apply(delta)
+
+        self.notify(*signal)
+        for changed in problems:
+            self.notify(self.problems_changed, changed)
+
+        if self._undoing:
+            return
+        if self._batch_depth:
+            self._undo_step.append(delta)
+        else:
+            self.push_undo_step([delta])
+
+    def detach_parameter(self, event_name: str, parameter: str):
+        """Gives an event a private copy of a pulse parameter, e.g. before it is edited in a dialog.
+
+        The pulse parameter is shared again by set_parameter_values or intern_parameter.
+
+        Args:
+            event_name (str): The name of the event.
+            parameter (str): The name of the pulse parameter.
+
+        Returns:
+            PulseParameter: The private pulse parameter of the event.
+        """
+        return self.parameter_pool.detach(self.get_event(event_name), parameter)
+
+    def intern_parameter(self, event_name: str, parameter: str) -> None:
+        """Shares the pulse parameter of an event with the events that have the same configuration again.
+
+        Args:
+            event_name (str): The name of the event.
+            parameter (str): The name of the pulse parameter.
+        """
+        event = self.get_event(event_name)
+        event.parameters[parameter] = self.parameter_pool.intern(event.parameters[parameter])
+        # The private copy may have been changed in place
+        self._expanded_sequence = None
+        self.content_hash.update_event(self.get_event_index(event_name))
+
+    def invalidate_options(self) -> None:
+        """Marks the options of the pulse parameters as outdated, e.g. after the active spectrometer changed.
+
+        If the pulse parameters of the pulse sequence changed, pulse_parameter_options_changed is emitted.
+        """
+        self.options_dirty = True
+        options = list(self.sequence.pulse_parameter_options.items())
+        if options != self._pulse_parameter_options:
+            logger.debug("Pulse parameters changed to %s", [name for name, _ in options])
+            self._pulse_parameter_options = options
+            self.pulse_parameter_options_changed.emit()
+
+    def update_options(self, force: bool = False) -> None:
+        """Updates the options of the pulse parameters from the pulse sequence, e.g. the number of phase cycles.
+
+        The options are only updated if the pulse sequence was replaced, events were added or removed or pulse parameters changed since the last update. Every distinct pulse parameter instance is updated once. If options were changed in place, the parameter pool and the content hash are rebuilt afterwards.
+
+        Args:
+            force (bool, optional): Whether the options are updated even if they are not outdated. Defaults to False.
+        """
+        if not (self.options_dirty or force):
+            return
+        self.options_dirty = False
+
+        # PulseSequence.update_options updates every event, which scans the whole pulse sequence for each of them
+        parameters = {
+            id(parameter): parameter
+            for event in self.sequence.events
+            for parameter in event.parameters.values()
+        }
+        parameters = list(parameters.values())
+        keys = [self.parameter_pool.get_key(parameter) for parameter in parameters]
+        for parameter in parameters:
+            parameter.update_option(self.sequence)
+
+        if keys != [self.parameter_pool.get_key(parameter) for parameter in parameters]:
+            logger.debug("Pulse parameter options changed, rebuilding the parameter pool")
+            self.parameter_pool.intern_sequence(self.sequence)
+            self.content_hash.reset(self.sequence)
+
+    def get_event_at(self, time: float) -> tuple:
+        """Returns the event that is played at a given time of the pulse sequence.
+
+        Args:
+            time (float): The time in seconds.
+
+        Returns:
+            tuple: The event and the number of the repetition of its repeat block (0 for the first repetition) or None if the time lies outside of the pulse sequence.
+        """
+        position = self.timing.get_event_at(time)
+        if position is None:
+            return None
+        index, repetition = position
+        return self.sequence.events[index], repetition
+
+    def validate(self) -> None:
+        """Checks all events of the pulse sequence again, e.g. after the pulse parameter options of the spectrometer changed."""
+        self.validator.reset(self.sequence)
+        self.problems_changed.emit(-1)
+
+    def set_max_duration(self, max_duration: float) -> None:
+        """Sets the maximum duration of the pulse sequence that is checked by the validator.
+
+        Args:
+            max_duration (float): The maximum duration in seconds or None for no limit.
+        """
+        if self.validator.set_max_duration(max_duration):
+            self.problems_changed.emit(-1)
+
+    def update_event_index(self, first: int, last: int) -> None:
+        """Updates the event index for a range of events whose position changed.
+
+        Args:
+            first (int): The index of the first event.
+            last (int): The index of the last event.
+        """
+        events = self.sequence.events
+        for index in range(first, last + 1):
+            self._event_index[events[index].name] = index
+
+    def push_undo_step(self, deltas: list) -> None:
+        """Pushes an undo step to the undo stack.
+
+        Args:
+            deltas (list): The deltas of the step.
+        """
+        self.undo_stack.push(deltas)
+        self.undo_stack_changed.emit()
+
+    def undo(self) -> None:
+        """Reverts the last change of the pulse sequence."""
+        if not self.undo_stack.can_undo():
+            return
+        self.apply_undo_step(self.undo_stack.undo())
+
+    def redo(self) -> None:
+        """Applies the last reverted change of the pulse sequence again."""
+        if not self.undo_stack.can_redo():
+            return
+        self.apply_undo_step(self.undo_stack.redo())
+
+    def apply_undo_step(self, deltas: list) -> None:
+        """Applies the deltas of an undo step without recording them.
+
+        Args:
+            deltas (list): The deltas.
+        """
+        self._undoing = True
+        try:
+            # Steps with several deltas were recorded in a batch
+            if len(deltas) > 1:
+                with self.batch():
+                    for delta in deltas:
+                        self.apply(delta)
+            else:
+                self.apply(deltas[0])
+        finally:
+            self._undoing = False
+        self.undo_stack_changed.emit()
+
+    @property
+    def sequence(self):
+        """PulseSequence: The pulse sequence that is edited, in which the events of a repeat block are only stored once."""
+        return self._sequence
+
+    @sequence.setter
+    def sequence(self, value):
+        self._sequence = value
+        self._expanded_sequence = None
+        self.options_dirty = True
+        self._pulse_parameter_options = list(value.pulse_parameter_options.items())
+        self.parameter_pool.intern_sequence(value)
+        self.rebuild_event_index()
+        self.validator.reset(value)
+        self.timing.reset(value)
+        self.content_hash.reset(value)
+        # The deltas reference events of the old pulse sequence
+        self.undo_stack.clear()
+        self.undo_stack_changed.emit()
+        self.pulse_sequence_changed.emit()
 
     @property
     def pulse_sequence(self):
-        """PulseSequence: The pulse sequence."""
-        return self._pulse_sequence
+        """PulseSequence: The pulse sequence, the same as sequence."""
+        return self.sequence
 
     @pulse_sequence.setter
     def pulse_sequence(self, value):
-        self._pulse_sequence = value
-        self.pulse_sequence_changed.emit()
+        self.sequence = value
+
+    @property
+    def expanded_sequence(self):
+        """PulseSequence: The pulse sequence as it is run by the spectrometers, in which the repeat blocks are unrolled.
+
+        The expanded pulse sequence is only built when it is requested after a change and must be treated as read-only. Without repeat blocks it is the edited pulse sequence itself.
+        """
+        if self._expanded_sequence is None:
+            self._expanded_sequence = repeat.expand_sequence(self.sequence)
+        return self._expanded_sequence
+
+    @property
+    def pulse_sequence_hash(self) -> str:
+        """str: The content hash of the pulse sequence, see the content_hash module.
+
+        The hash is kept up to date incrementally and is equal for pulse sequences that play the same events, independent of the name of the pulse sequence.
+        """
+        return self.content_hash.hexdigest
+
+    def get_compiled(self, spectrometer: str, compile, settings: dict = None):
+        """Returns the pulse sequence compiled for a spectrometer, which is only compiled again after the pulse sequence or the settings changed.
+
+        Example:
+            >>> samples = model.get_compiled(
+            ...     "Simulator", lambda sequence: translate(sequence), spectrometer_model.settings
+            ... )
+
+        Args:
+            spectrometer (str): The name of the spectrometer.
+            compile (callable): Compiles the pulse sequence, called with the expanded pulse sequence.
+            settings (dict, optional): The spectrometer settings the compiled pulse sequence depends on by name, as values or Setting objects. Defaults to None.
+
+        Returns:
+            object: The compiled pulse sequence, which must be treated as read-only.
+        """
+        return self.compile_cache.get_or_compile(
+            self.pulse_sequence_hash,
+            spectrometer,
+            lambda: compile(self.expanded_sequence),
+            settings,
+        )
@@ -0,0 +1,464 @@
+"""Model/view classes for the pulse table of the pulse programmer.
+
+The pulse table does not create any widgets for its cells. The events and pulse parameters are exposed by the PulseTableModel and the cells are painted by the PulseTableDelegate. Clicks are resolved by hit-testing the painted controls.
+"""
+
+import logging
+from PyQt6.QtCore import (
+    Qt,
+    QAbstractTableModel,
+    QModelIndex,
+    QRect,
+    QSize,
+    QEvent,
+    QTimer,
+    pyqtSignal,
+    pyqtSlot,
+)
+from PyQt6.QtGui import QPen, QColor
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+from nqrduck.assets.icons import Logos
+
+from .visual_parameter import VisualParameter
+from .repeat import get_block_at
+from .instrumentation import instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+class PulseTableModel(QAbstractTableModel):
+    """Table model that exposes the pulse sequence of the pulse programmer model.
+
+    Every column is an event of the pulse sequence. The first row holds the event options (edit, delete, move left and move right), the following rows are the pulse parameter options of the pulse sequence. The events of a repeat block are shown once, the block is marked with brackets and its repeat count in the horizontal header. Cells with validation problems are marked.
+
+    Full changes of the pulse sequence reset the table once control returns to the event loop, so a burst of full changes only resets it once. Until then the table keeps the numbers of rows and columns the attached views know and changes of single events are left to the reset.
+
+    Args:
+        model (PulseProgrammerModel): The model of the pulse programmer module.
+
+    Attributes:
+        EVENT_ROLE (int): The item data role that returns the event of a column.
+        PARAMETER_ROLE (int): The item data role that returns the name of the pulse parameter of a row.
+        PROBLEMS_ROLE (int): The item data role that returns the validation problems of a cell. The problems of the event itself belong to the first row.
+    """
+
+    EVENT_ROLE = Qt.ItemDataRole.UserRole + 1
+    PARAMETER_ROLE = Qt.ItemDataRole.UserRole + 2
+    PROBLEMS_ROLE = Qt.ItemDataRole.UserRole + 3
+
+    def __init__(self, model, parent=None):
+        """Initializes the pulse table model."""
+        super().__init__(parent)
+        self.model = model
+        self._rows = self.get_row_count()
+        self._columns = len(self.events)
+
+        self.reset_timer = QTimer(self)
+        self.reset_timer.setSingleShot(True)
+        self.reset_timer.timeout.connect(self.reset)
+
+        model.events_changed.connect(self.on_events_changed)
+        model.pulse_parameter_options_changed.connect(self.on_events_changed)
+        model.event_inserted.connect(self.on_event_inserted)
+        model.event_removed.connect(self.on_event_removed)
+        model.event_moved.connect(self.on_event_moved)
+        model.event_renamed.connect(self.on_event_renamed)
+        model.event_parameter_changed.connect(self.on_event_parameter_changed)
+        model.repeat_blocks_changed.connect(self.on_repeat_blocks_changed)
+        model.problems_changed.connect(self.on_problems_changed)
+
+    @property
+    def events(self) -> list:
+        """list: The events of the pulse sequence."""
+        return self.model.sequence.events
+
+    @property
+    def parameters(self) -> list:
+        """list: The names of the pulse parameter options of the pulse sequence."""
+        return list(self.model.sequence.pulse_parameter_options.keys())
+
+    def get_row_count(self) -> int:
+        """Returns the number of pulse parameter options of the pulse sequence plus one row for the event options."""
+        return len(self.model.sequence.pulse_parameter_options) + 1
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        """Returns the number of pulse parameter options plus one row for the event options."""
+        if parent.isValid():
+            return 0
+        return self._rows
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        """Returns the number of events."""
+        if parent.isValid():
+            return 0
+        return self._columns
+
+    def is_stale(self, row: int, column: int) -> bool:
+        """Checks if a cell no longer exists in the pulse sequence because a pending reset removes it.
+
+        Args:
+            row (int): The row of the cell.
+            column (int): The column of the cell.
+
+        Returns:
+            bool: True if the cell is outside of the pulse sequence.
+        """
+        return row >= self.get_row_count() or column >= len(self.events)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        """Returns the data of a cell of the pulse table.
+
+        Args:
+            index (QModelIndex): The index of the cell.
+            role (Qt.ItemDataRole): The requested role.
+
+        Returns:
+            The icon of the pulse parameter for the decoration role, the event for the EVENT_ROLE, the name of the pulse parameter for the PARAMETER_ROLE and the problem messages for the PROBLEMS_ROLE.
+        """
+        if not index.isValid() or self.is_stale(index.row(), index.column()):
+            return None
+
+        event = self.events[index.column()]
+        if role == self.EVENT_ROLE:
+            return event
+
+        # The first row is used for the event options
+        parameter = self.parameters[index.row() - 1] if index.row() else None
+        if role == self.PROBLEMS_ROLE:
+            return self.get_problems(index.column(), parameter)
+        if parameter is None:
+            if role == Qt.ItemDataRole.ToolTipRole:
+                return "\n".join(self.get_problems(index.column(), None)) or None
+            return None
+
+        if role == self.PARAMETER_ROLE:
+            return parameter
+        if role == Qt.ItemDataRole.DecorationRole:
+            return VisualParameter(event.parameters[parameter]).get_pixmap()
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return "\n".join(
+                [f"{parameter} of {event.name}"] + self.get_problems(index.column(), parameter)
+            )
+        return None
+
+    def get_problems(self, column: int, parameter: str) -> list:
+        """Returns the validation problems of a cell.
+
+        Args:
+            column (int): The index of the event.
+            parameter (str): The name of the pulse parameter or None for the event itself.
+
+        Returns:
+            list: The problem messages.
+        """
+        return [
+            message
+            for problem_parameter, message in self.model.validator.get_event_problems(column)
+            if problem_parameter == parameter
+        ]
+
+    def headerData(self, section: int, orientation, role=Qt.ItemDataRole.DisplayRole):
+        """Returns the event names as horizontal and the pulse parameter names as vertical header."""
+        if orientation == Qt.Orientation.Horizontal:
+            if self.is_stale(0, section):
+                return None
+            return self.get_event_header(section, role)
+        if role != Qt.ItemDataRole.DisplayRole or self.is_stale(section, 0):
+            return None
+        # Move the vertical header labels one row down
+        if section == 0:
+            return ""
+        return self.parameters[section - 1]
+
+    def get_event_header(self, section: int, role):
+        """Returns the header of an event column with the marks of its repeat block.
+
+        Args:
+            section (int): The index of the event.
+            role (Qt.ItemDataRole): The requested role.
+
+        Returns:
+            str: The header text for the display role and a description of the repeat block for the tool tip role.
+        """
+        name = self.events[section].name
+        block = get_block_at(self.model.get_repeat_blocks(), section)
+        if role == Qt.ItemDataRole.ToolTipRole and block is not None:
+            start, length, count = block
+            return f"Events {self.events[start].name} to {self.events[start + length - 1].name} are played {count} times"
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if block is None:
+            return name
+
+        start, length, count = block
+        if section == start:
+            name = f"[ {name}"
+        if section == start + length - 1:
+            name = f"{name} ] ×{count}"
+        return name
+
+    def flags(self, index: QModelIndex):
+        """Cells can be selected but not edited in place."""
+        # Qt expects no flags for the root of a table
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    @pyqtSlot()
+    def on_events_changed(self) -> None:
+        """Schedules a reset of the table model when the whole pulse sequence or its pulse parameters changed."""
+        instrumentation.count("pulse_table.scheduled_resets")
+        if not self.reset_timer.isActive():
+            self.reset_timer.start(0)
+
+    def is_reset_pending(self) -> bool:
+        """Checks if the table model is reset soon, in which case changes of single events are not forwarded to the views.
+
+        Returns:
+            bool: True if a reset is scheduled.
+        """
+        return self.reset_timer.isActive()
+
+    @pyqtSlot()
+    @instrumentation.timed("pulse_table.reset")
+    def reset(self) -> None:
+        """Resets the table model to the current pulse sequence."""
+        self.reset_timer.stop()
+        self.beginResetModel()
+        self._rows = self.get_row_count()
+        self._columns = len(self.events)
+        self.endResetModel()
+
+    @pyqtSlot(int)
+    def on_event_inserted(self, index: int) -> None:
+        """Inserts the column of a new event.
+
+        Args:
+            index (int): The index of the new event.
+        """
+        if self.is_reset_pending():
+            return
+        self.beginInsertColumns(QModelIndex(), index, index)
+        self._columns += 1
+        self.endInsertColumns()
+
+    @pyqtSlot(int)
+    def on_event_removed(self, index: int) -> None:
+        """Removes the column of a deleted event.
+
+        Args:
+            index (int): The former index of the deleted event.
+        """
+        if self.is_reset_pending():
+            return
+        self.beginRemoveColumns(QModelIndex(), index, index)
+        self._columns -= 1
+        self.endRemoveColumns()
+
+    @pyqtSlot(int, int)
+    def on_event_moved(self, old_index: int, new_index: int) -> None:
+        """Moves the column of an event.
+
+        Args:
+            old_index (int): The old index of the event.
+            new_index (int): The new index of the event.
+        """
+        if self.is_reset_pending():
+            return
+        # Qt expects the destination to be the position before the move
+        destination = new_index + 1 if new_index > old_index else new_index
+        self.beginMoveColumns(
+            QModelIndex(), old_index, old_index, QModelIndex(), destination
+        )
+        self.endMoveColumns()
+
+    @pyqtSlot(int)
+    def on_event_renamed(self, index: int) -> None:
+        """Updates the header of a renamed event.
+
+        Args:
+            index (int): The index of the event.
+        """
+        if self.is_reset_pending():
+            return
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, index, index)
+
+    @pyqtSlot()
+    def on_repeat_blocks_changed(self) -> None:
+        """Updates the headers of all events when the repeat blocks changed."""
+        if self._columns and not self.is_reset_pending():
+            self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, len(self.events) - 1)
+
+    @pyqtSlot(int)
+    def on_problems_changed(self, index: int) -> None:
+        """Updates the problem markers of an event or of all events.
+
+        Args:
+            index (int): The index of the event or -1 for all events.
+        """
+        if not self._columns or self.is_reset_pending():
+            return
+        first, last = (0, self._columns - 1) if index < 0 else (index, index)
+        self.dataChanged.emit(
+            self.index(0, first),
+            self.index(self.rowCount() - 1, last),
+            [self.PROBLEMS_ROLE, Qt.ItemDataRole.ToolTipRole],
+        )
+
+    @pyqtSlot(int, str)
+    def on_event_parameter_changed(self, index: int, parameter: str) -> None:
+        """Updates the cell of a pulse parameter whose options changed.
+
+        Args:
+            index (int): The index of the event.
+            parameter (str): The name of the pulse parameter.
+        """
+        if self.is_reset_pending():
+            return
+        cell = self.index(self.parameters.index(parameter) + 1, index)
+        self.dataChanged.emit(cell, cell)
+
+
+class PulseTableDelegate(QStyledItemDelegate):
+    """Item delegate that paints the cells of the pulse table.
+
+    The first row of every column gets the edit, delete, move left and move right controls of the event. All other cells get the icon of the pulse parameter. Cells with validation problems get a frame in PROBLEM_COLOR.
+
+    A click only counts if the mouse button is pressed and released on the same cell without modifiers, so dragging and clicking with Ctrl or Shift select cells.
+
+    Signals:
+        edit_event: Emitted with the event when the edit control is clicked.
+        delete_event: Emitted with the event when the delete control is clicked.
+        move_event_left: Emitted with the name of the event when the move left control is clicked.
+        move_event_right: Emitted with the name of the event when the move right control is clicked.
+        parameter_clicked: Emitted with the event and the name of the pulse parameter when a pulse parameter cell is clicked.
+    """
+
+    CONTROL_SIZE = 24
+    CELL_SIZE = QSize(64, 64)
+    PROBLEM_COLOR = QColor(200, 30, 30)
+
+    edit_event = pyqtSignal(object)
+    delete_event = pyqtSignal(object)
+    move_event_left = pyqtSignal(str)
+    move_event_right = pyqtSignal(str)
+    parameter_clicked = pyqtSignal(object, str)
+
+    def __init__(self, parent=None):
+        """Initializes the pulse table delegate."""
+        super().__init__(parent)
+        # The icons of the event options are the same for every column
+        self.controls = {
+            "edit": Logos.Pen12x12(),
+            "delete": Logos.Garbage12x12(),
+            "left": Logos.ArrowLeft12x12(),
+            "right": Logos.ArrowRight12x12(),
+        }
+        # The row and column of the cell on which the left mouse button was pressed
+        self.pressed_cell = None
+
+    def control_rects(self, rect: QRect) -> dict:
+        """Returns the rectangles of the event option controls within a cell.
+
+        The controls are arranged in a grid with edit and delete in the upper and move left and move right in the lower row.
+
+        Args:
+            rect (QRect): The rectangle of the cell.
+
+        Returns:
+            dict: The rectangles of the controls by control name.
+        """
+        size = self.CONTROL_SIZE
+        left = rect.center().x() - size
+        top = rect.center().y() - size
+        return {
+            "edit": QRect(left, top, size, size),
+            "delete": QRect(left + size, top, size, size),
+            "left": QRect(left, top + size, size, size),
+            "right": QRect(left + size, top + size, size, size),
+        }
+
+    @instrumentation.timed("pulse_table.paint")
+    def paint(self, painter, option, index: QModelIndex) -> None:
+        """Paints a cell of the pulse table.
+
+        Args:
+            painter (QPainter): The painter.
+            option (QStyleOptionViewItem): The style options of the cell.
+            index (QModelIndex): The index of the cell.
+        """
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        if index.data(PulseTableModel.PROBLEMS_ROLE):
+            painter.save()
+            painter.setPen(QPen(self.PROBLEM_COLOR, 2))
+            painter.drawRect(option.rect.adjusted(1, 1, -1, -1))
+            painter.restore()
+
+        if index.row() == 0:
+            for control, rect in self.control_rects(option.rect).items():
+                self.controls[control].paint(painter, rect)
+            return
+
+        icon = index.data(Qt.ItemDataRole.DecorationRole)
+        if icon is not None:
+            icon.paint(painter, option.rect)
+
+    def sizeHint(self, option, index: QModelIndex) -> QSize:
+        """Returns the size of a cell."""
+        return self.CELL_SIZE
+
+    def editorEvent(self, event, model, option, index: QModelIndex) -> bool:
+        """Handles clicks on the cells of the pulse table by hit-testing the painted controls.
+
+        Args:
+            event (QEvent): The event.
+            model (PulseTableModel): The table model.
+            option (QStyleOptionViewItem): The style options of the cell.
+            index (QModelIndex): The index of the cell.
+
+        Returns:
+            bool: True if the click was handled.
+        """
+        if (
+            event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease)
+            or event.button() != Qt.MouseButton.LeftButton
+        ):
+            return False
+
+        cell = (index.row(), index.column())
+        if event.type() == QEvent.Type.MouseButtonPress:
+            # The press is left to the table view, which updates the selection
+            self.pressed_cell = cell
+            return False
+
+        pressed_cell, self.pressed_cell = self.pressed_cell, None
+        if (
+            event.modifiers() != Qt.KeyboardModifier.NoModifier
+            or pressed_cell != cell
+        ):
+            return False
+
+        pulse_event = index.data(PulseTableModel.EVENT_ROLE)
+
+        if index.row() != 0:
+            self.parameter_clicked.emit(
+                pulse_event, index.data(PulseTableModel.PARAMETER_ROLE)
+            )
+            return True
+
+        position = event.position().toPoint()
+        for control, rect in self.control_rects(option.rect).items():
+            if rect.contains(position):
+                logger.debug("Control %s clicked for event %s", control, pulse_event.name)
+                if control == "edit":
+                    self.edit_event.emit(pulse_event)
+                elif control == "delete":
+                    self.delete_event.emit(pulse_event)
+                elif control == "left":
+                    self.move_event_left.emit(pulse_event.name)
+                else:
+                    self.move_event_right.emit(pulse_event.name)
+                return True
+        return False
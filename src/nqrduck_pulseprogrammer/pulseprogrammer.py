@@ -1,27 +1,96 @@
 """Initialize the PulseProgrammer module."""
 
+import logging
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
 from nqrduck.module.module import Module
 from .model import PulseProgrammerModel
 from .controller import PulseProgrammerController
-from .view import PulseProgrammerView
+from .instrumentation import instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+class DeferredView(QWidget):
+    """Container widget that builds the view of a module the first time it is shown.
+
+    The container can be added to layouts and stacked widgets right away, while the view and its imports are only loaded when they are needed.
+
+    Args:
+        module (Module): The module of the view.
+        create_view (callable): The function that creates the view for the module.
+    """
+
+    def __init__(self, module, create_view, parent=None):
+        """Initializes the deferred view."""
+        super().__init__(parent)
+        self.module = module
+        self.create_view = create_view
+        self._view = None
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+    @property
+    def view(self):
+        """The view of the module. It is built on first access."""
+        if self._view is None:
+            logger.debug("Building deferred view of %s", self.module)
+            self._view = self.create_view(self.module)
+            self.layout().addWidget(self._view)
+        return self._view
+
+    def showEvent(self, event) -> None:
+        """Builds the view when the container is shown for the first time."""
+        self.view
+        super().showEvent(event)
+
+
+def create_view(module):
+    """Creates the view of the pulse programmer module.
+
+    The view is imported here because it pulls in the widgets of the formbuilder and matplotlib, which take most of the import time of the module.
+
+    Args:
+        module (PulseProgrammer): The pulse programmer module.
+
+    Returns:
+        PulseProgrammerView: The view.
+    """
+    from .view import PulseProgrammerView
+
+    return PulseProgrammerView(module)
 
 
 class PulseProgrammer(Module):
-    """The pulse programmer module."""
+    """The pulse programmer module.
+
+    Attributes:
+        instrumentation (Instrumentation): The opt-in timing instrumentation of the hot paths, see the instrumentation module.
+    """
 
     def __init__(self, model, view, controller):
         """Initializes the pulse programmer module.
 
         Args:
             model (PulseProgrammerModel): The model of the pulse programmer module.
-            view (PulseProgrammerView): The view of the pulse programmer module.
+            view (callable): The view class of the pulse programmer module or a function that creates the view. The view is created when it is shown for the first time.
             controller (PulseProgrammerController): The controller of the pulse programmer module.
         """
         super().__init__(model, None, controller)
         self.view = None
-        self.pulse_programmer_view = view(self)
+        self._create_view = view
+        self._pulse_programmer_view = None
+        self.instrumentation = instrumentation
+
+    @property
+    def pulse_programmer_view(self) -> DeferredView:
+        """DeferredView: The widget of the pulse programmer that is embedded by the spectrometer modules."""
+        if self._pulse_programmer_view is None:
+            self._pulse_programmer_view = DeferredView(self, self._create_view)
+        return self._pulse_programmer_view
 
 
 pulse_programmer = PulseProgrammer(
-    PulseProgrammerModel, PulseProgrammerView, PulseProgrammerController
+    PulseProgrammerModel, create_view, PulseProgrammerController
 )
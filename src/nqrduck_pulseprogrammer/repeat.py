@@ -0,0 +1,252 @@
+"""Repeat blocks of pulse sequences.
+
+A repeat block is a range of consecutive events that is played several times in a row, e.g. the echo of a CPMG sequence. The events of a block are only stored once. A block is a tuple of the index of its first event, the number of its events and the repeat count. The blocks of a pulse sequence are kept sorted and do not overlap. They are stored in the repeat_blocks attribute of the pulse sequence, so they are saved, swept and autosaved together with its events.
+
+The blocks are only unrolled by expand_sequence when the pulse sequence is handed to a spectrometer. The index of a block is adjusted when events are inserted, removed or moved by the functions of this module.
+
+This module does not depend on Qt.
+"""
+
+import copy
+import logging
+
+from quackseq.phase_table import PhaseTable
+from quackseq.pulsesequence import PulseSequence
+
+logger = logging.getLogger(__name__)
+
+ATTRIBUTE = "repeat_blocks"
+
+
+def get_repeat_blocks(sequence: PulseSequence) -> list:
+    """Returns the repeat blocks of a pulse sequence.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence.
+
+    Returns:
+        list: The repeat blocks as tuples of start index, number of events and repeat count.
+    """
+    return getattr(sequence, ATTRIBUTE, None) or []
+
+
+def set_repeat_blocks(sequence: PulseSequence, blocks: list, validate: bool = True) -> None:
+    """Sets the repeat blocks of a pulse sequence.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence.
+        blocks (list): The repeat blocks as tuples of start index, number of events and repeat count.
+        validate (bool, optional): Whether the blocks are checked against the events of the pulse sequence. Defaults to True.
+
+    Raises:
+        ValueError: If a block lies outside of the pulse sequence, has no events, has a repeat count below one or overlaps another block.
+    """
+    blocks = sorted(tuple(int(value) for value in block) for block in blocks)
+    end = 0
+    for start, length, count in blocks if validate else ():
+        if length < 1 or count < 1:
+            raise ValueError(f"Invalid repeat block {(start, length, count)}")
+        if start < end or start + length > len(sequence.events):
+            raise ValueError(
+                f"Repeat block {(start, length, count)} overlaps another block or lies outside of the pulse sequence"
+            )
+        end = start + length
+    setattr(sequence, ATTRIBUTE, blocks)
+
+
+def get_block_at(blocks: list, index: int) -> tuple:
+    """Returns the repeat block that contains an event.
+
+    Args:
+        blocks (list): The repeat blocks.
+        index (int): The index of the event.
+
+    Returns:
+        tuple: The repeat block or None if the event is not repeated.
+    """
+    for block in blocks:
+        if block[0] <= index < block[0] + block[1]:
+            return block
+    return None
+
+
+def insert_event(blocks: list, index: int) -> list:
+    """Returns the repeat blocks after an event was inserted.
+
+    An event that is inserted between two events of a block becomes part of the block.
+
+    Args:
+        blocks (list): The repeat blocks.
+        index (int): The index of the inserted event.
+
+    Returns:
+        list: The adjusted repeat blocks.
+    """
+    adjusted = []
+    for start, length, count in blocks:
+        if index <= start:
+            start += 1
+        elif index < start + length:
+            length += 1
+        adjusted.append((start, length, count))
+    return adjusted
+
+
+def remove_event(blocks: list, index: int) -> list:
+    """Returns the repeat blocks after an event was removed.
+
+    A block whose last event was removed is dropped.
+
+    Args:
+        blocks (list): The repeat blocks.
+        index (int): The former index of the removed event.
+
+    Returns:
+        list: The adjusted repeat blocks.
+    """
+    adjusted = []
+    for start, length, count in blocks:
+        if index < start:
+            start -= 1
+        elif index < start + length:
+            length -= 1
+            if not length:
+                continue
+        adjusted.append((start, length, count))
+    return adjusted
+
+
+def move_event(blocks: list, index: int, new_index: int) -> list:
+    """Returns the repeat blocks after an event was moved.
+
+    Moving the first or last event of a block outwards moves it out of the block, moving an event next to a block inwards moves it into the block.
+
+    Args:
+        blocks (list): The repeat blocks.
+        index (int): The old index of the event.
+        new_index (int): The new index of the event.
+
+    Returns:
+        list: The adjusted repeat blocks.
+    """
+    return insert_event(remove_event(blocks, index), new_index)
+
+
+def get_expanded_length(sequence: PulseSequence) -> int:
+    """Returns the number of events of a pulse sequence with unrolled repeat blocks.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence.
+
+    Returns:
+        int: The number of events.
+    """
+    return len(sequence.events) + sum(
+        length * (count - 1) for _, length, count in get_repeat_blocks(sequence)
+    )
+
+
+def get_repetition_name(name: str, repetition: int, names: set) -> str:
+    """Returns the name of a repetition of an event, which is the name of the event with the number of the repetition appended.
+
+    If another event already has this name, a further number is appended until the name is unique.
+
+    Args:
+        name (str): The name of the event.
+        repetition (int): The number of the repetition.
+        names (set): The names that are already taken. The returned name is added.
+
+    Returns:
+        str: The unique name of the repetition.
+    """
+    candidate = f"{name}_{repetition}"
+    suffix = 0
+    while candidate in names:
+        suffix += 1
+        candidate = f"{name}_{repetition}_{suffix}"
+    names.add(candidate)
+    return candidate
+
+
+def fold_events(events: list, blocks: list) -> list:
+    """Returns the events of a pulse sequence with unrolled repeat blocks without the further repetitions of the blocks.
+
+    This is the inverse of expand_sequence for the stored events, e.g. the event data of a file.
+
+    Args:
+        events (list): The events with unrolled repeat blocks.
+        blocks (list): The repeat blocks as tuples of start index, number of events and repeat count.
+
+    Returns:
+        list: The events in which every block is only stored once.
+
+    Raises:
+        ValueError: If the number of events does not match the repeat blocks.
+    """
+    blocks = sorted(tuple(block) for block in blocks)
+    repetitions = sum(length * (count - 1) for _, length, count in blocks)
+    if len(events) < repetitions or any(
+        start + length > len(events) - repetitions for start, length, _ in blocks
+    ):
+        raise ValueError(
+            f"{len(events)} events do not match the repeat blocks {blocks}"
+        )
+
+    folded = []
+    position = 0
+    for start, length, count in blocks:
+        # The events before the block are shifted by the repetitions of the previous blocks
+        end = start + length + (position - len(folded))
+        folded.extend(events[position:end])
+        position = end + length * (count - 1)
+    folded.extend(events[position:])
+    return folded
+
+
+def expand_sequence(sequence: PulseSequence) -> PulseSequence:
+    """Returns a pulse sequence in which every repeat block is unrolled.
+
+    The expanded pulse sequence is a shallow copy. The first repetition of a block uses the events of the pulse sequence, the following repetitions use copies of the events whose names get the number of the repetition appended, see get_repetition_name. All copies share the pulse parameters with the original events, so the expanded pulse sequence must be treated as read-only.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence.
+
+    Returns:
+        PulseSequence: The expanded pulse sequence or the pulse sequence itself if it has no repeat blocks.
+    """
+    # The sweep module imports sequence_io, which imports this module
+    from .sweep import copy_event
+
+    blocks = get_repeat_blocks(sequence)
+    if not blocks:
+        return sequence
+
+    expanded = copy.copy(sequence)
+    setattr(expanded, ATTRIBUTE, [])
+    if hasattr(expanded, "phase_table"):
+        expanded.phase_table = PhaseTable(expanded)
+
+    events = sequence.events
+    # The names of the copies must not collide with the names of other events
+    names = {event.name for event in events}
+    expanded.events = []
+    position = 0
+    for start, length, count in blocks:
+        expanded.events.extend(events[position:start])
+        block = events[start : start + length]
+        expanded.events.extend(block)
+        for repetition in range(1, count):
+            for event in block:
+                copied = copy_event(event, expanded)
+                copied.name = get_repetition_name(event.name, repetition, names)
+                expanded.events.append(copied)
+        position = start + length
+    expanded.events.extend(events[position:])
+
+    logger.debug(
+        "Expanded %s events with %s repeat blocks to %s events",
+        len(events),
+        len(blocks),
+        len(expanded.events),
+    )
+    return expanded
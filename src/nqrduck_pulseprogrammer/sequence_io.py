@@ -0,0 +1,597 @@
+"""Reading and writing of pulse sequence files.
+
+Pulse sequences can be stored in two formats which are selected by the file extension:
+
+- ``.quack``: The JSON representation of the pulse sequence as provided by quackseq.
+- ``.quackb``: A compact binary container. It consists of a fixed header, the sampled TX pulse shapes as raw float64 blocks, a JSON block with the names of the events and every distinct pulse parameter configuration and an event table with the durations of the events and references into the other blocks. The shape samples can be memory-mapped with read_shape_samples without loading the pulse sequence.
+
+The binary format stores the repeat blocks of the pulse sequence in compressed form, so the events of a block are only written once. The JSON format is also read by quackseq and other tools, which do not know repeat blocks. It therefore stores the events with unrolled repeat blocks, so every reader plays the same pulse sequence, and the repeat blocks in the JSON_NAMESPACE object, from which load_json restores them.
+
+All functions accept an optional progress callback that is called with the number of processed and the total number of events. The callback may raise SequenceIOCancelled to abort the operation.
+
+This module does not depend on Qt.
+"""
+
+import copy
+import json
+import logging
+import os
+import stat
+import struct
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from nqrduck.helpers.serializer import DecimalEncoder
+from quackseq.pulsesequence import QuackSequence
+from quackseq.pulseparameters import TXPulse
+from quackseq.event import Event
+
+from .shape_cache import shape_cache
+from .repeat import expand_sequence, fold_events, get_repeat_blocks, set_repeat_blocks
+from .instrumentation import instrumentation
+
+logger = logging.getLogger(__name__)
+
+JSON_EXTENSION = "quack"
+BINARY_EXTENSION = "quackb"
+# The key of the JSON object with the data that only the pulse programmer reads
+JSON_NAMESPACE = "nqrduck-pulseprogrammer"
+
+BINARY_MAGIC = b"QUACKBIN"
+BINARY_VERSION = 1
+# Magic, format version, number of events, number of pulse parameters and the offsets and sizes of the metadata, event table and samples
+BINARY_HEADER = struct.Struct("<8sHHII6Q")
+
+# The umask can only be read by setting it, which is not thread-safe, so it is read once on import
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+class SequenceIOCancelled(Exception):
+    """Raised by a progress callback to cancel reading or writing a pulse sequence."""
+
+
+def report_progress(progress, done: int, total: int) -> None:
+    """Calls the progress callback if there is one.
+
+    Args:
+        progress (callable): The progress callback or None.
+        done (int): The number of processed events.
+        total (int): The total number of events.
+    """
+    if progress is not None:
+        progress(done, total)
+
+
+def is_binary_path(path: str) -> bool:
+    """Checks if a path refers to the binary pulse sequence format.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        bool: True if the file extension is the one of the binary format.
+    """
+    return Path(path).suffix == f".{BINARY_EXTENSION}"
+
+
+def get_file_mode(path: Path) -> int:
+    """Returns the permissions of a saved file, which are the ones of the file it replaces or the default permissions of new files.
+
+    Args:
+        path (Path): The path to the file.
+
+    Returns:
+        int: The permission bits.
+    """
+    try:
+        return stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+
+def sync_directory(path: Path) -> None:
+    """Flushes a directory to disk, so that files that were renamed into it survive a crash.
+
+    Directories cannot be opened on Windows, where renames are durable without it.
+
+    Args:
+        path (Path): The path to the directory.
+    """
+    if os.name == "nt":
+        return
+    file_descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(file_descriptor)
+    finally:
+        os.close(file_descriptor)
+
+
+def get_sequence_name(path: str) -> str:
+    """Returns the name of a pulse sequence that is stored in a file, which is the file name without extension.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        str: The name of the pulse sequence.
+    """
+    return Path(path).name.split(".")[0]
+
+
+@instrumentation.timed("sequence_io.save_sequence")
+def save_sequence(sequence: QuackSequence, path: str, progress=None) -> None:
+    """Saves a pulse sequence in the format given by the file extension.
+
+    The pulse sequence is written to a temporary file in the same directory which then atomically replaces the target file. If writing fails or is cancelled, an existing file at the path is left untouched. The file keeps the permissions of the file it replaces, new files get the default permissions.
+
+    Args:
+        sequence (QuackSequence): The pulse sequence.
+        path (str): The path to the file.
+        progress (callable, optional): The progress callback. Defaults to None.
+    """
+    path = Path(path)
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        prefix=f".{path.name}.", suffix=".tmp", dir=path.parent
+    )
+    os.close(file_descriptor)
+    try:
+        if is_binary_path(path):
+            save_binary(sequence, temporary_path, progress)
+        else:
+            save_json(sequence, temporary_path, progress)
+        # Temporary files are only readable by the owner
+        os.chmod(temporary_path, get_file_mode(path))
+        # Make sure the data is on disk before the old file is replaced
+        with open(temporary_path, "rb") as file:
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+        sync_directory(path.parent)
+    except BaseException:
+        Path(temporary_path).unlink(missing_ok=True)
+        raise
+
+
+@instrumentation.timed("sequence_io.load_sequence")
+def load_sequence(path: str, progress=None) -> QuackSequence:
+    """Loads a pulse sequence in the format given by the file extension.
+
+    Args:
+        path (str): The path to the file.
+        progress (callable, optional): The progress callback. Defaults to None.
+
+    Returns:
+        QuackSequence: The loaded pulse sequence.
+
+    Raises:
+        KeyError: If the pulse sequence is not compatible.
+    """
+    if is_binary_path(path):
+        return load_binary(path, progress)
+    return load_json(path, progress)
+
+
+def event_to_json(event) -> dict:
+    """Returns a dict with the data of a single event.
+
+    This is the per event part of PulseSequence.to_json.
+
+    Args:
+        event (Event): The event.
+
+    Returns:
+        dict: The dict with the event data.
+    """
+    return {
+        "name": event.name,
+        "duration": event.duration,
+        "parameters": [
+            {
+                "name": name,
+                "value": [option.to_json() for option in parameter.options],
+            }
+            for name, parameter in event.parameters.items()
+        ],
+    }
+
+
+def snapshot_sequence(sequence: QuackSequence) -> QuackSequence:
+    """Returns a copy of a pulse sequence that can be saved in another thread while the pulse sequence is edited.
+
+    The events and pulse parameters are copied, pulse parameter instances that are shared by several events are also shared in the copy. The pulse parameter options of the spectrometer are not changed by edits and are shared with the pulse sequence.
+
+    Args:
+        sequence (QuackSequence): The pulse sequence.
+
+    Returns:
+        QuackSequence: The copy of the pulse sequence.
+    """
+    options = sequence.pulse_parameter_options
+    return copy.deepcopy(sequence, {id(options): options})
+
+
+def build_sequence(data: dict, progress=None) -> QuackSequence:
+    """Creates a pulse sequence from its dict representation.
+
+    This is QuackSequence.load_sequence with progress reporting. Events with identical pulse parameter data share the loaded pulse parameter instances, so every configuration is only loaded once.
+
+    Args:
+        data (dict): The dict with the sequence data.
+        progress (callable, optional): The progress callback. Defaults to None.
+
+    Returns:
+        QuackSequence: The pulse sequence.
+
+    Raises:
+        KeyError: If the pulse sequence version was not found.
+    """
+    try:
+        sequence = QuackSequence(data["name"], version=data["version"])
+    except KeyError:
+        logger.error("Pulse sequence version not found")
+        raise KeyError("Pulse sequence version not found")
+
+    events = data["events"]
+    shared = {}
+    for index, event_data in enumerate(events):
+        keys = [
+            (parameter["name"], json.dumps(parameter["value"], cls=DecimalEncoder, sort_keys=True))
+            for parameter in event_data["parameters"]
+        ]
+        if (
+            sequence.events
+            and all(key in shared for key in keys)
+            and [key[0] for key in keys] == list(sequence.events[-1].parameters)
+        ):
+            # Creating an event creates the default pulse parameters, which is slow
+            event = copy.copy(sequence.events[-1])
+            event.parameters = OrderedDict(event.parameters)
+            event.name = event_data["name"]
+            event.duration = event_data["duration"]
+        else:
+            # Only the pulse parameters that were not loaded before are loaded
+            event = Event.load_event(
+                {
+                    **event_data,
+                    "parameters": [
+                        parameter
+                        for parameter, key in zip(event_data["parameters"], keys)
+                        if key not in shared
+                    ],
+                },
+                sequence,
+            )
+        for key in keys:
+            if key in shared:
+                event.parameters[key[0]] = shared[key]
+            elif key[0] in event.parameters:
+                shared[key] = event.parameters[key[0]]
+        sequence.events.append(event)
+        report_progress(progress, index + 1, len(events))
+
+    set_repeat_blocks(sequence, data.get("repeat_blocks", []))
+    return sequence
+
+
+def save_json(sequence: QuackSequence, path: str, progress=None) -> None:
+    """Saves a pulse sequence as JSON.
+
+    The JSON is streamed to the file event by event instead of being built as a single string. Repeat blocks are unrolled, see the module description.
+
+    Args:
+        sequence (QuackSequence): The pulse sequence.
+        path (str): The path to the file.
+        progress (callable, optional): The progress callback. Defaults to None.
+    """
+    events = expand_sequence(sequence).events
+    with open(path, "w") as file:
+        header = json.dumps(
+            {"name": sequence.name, "version": sequence.version}, cls=DecimalEncoder
+        )
+        file.write(header[:-1] + ', "events": [')
+        for index, event in enumerate(events):
+            if index:
+                file.write(", ")
+            json.dump(event_to_json(event), file, cls=DecimalEncoder)
+            report_progress(progress, index + 1, len(events))
+        file.write("]")
+        blocks = get_repeat_blocks(sequence)
+        if blocks:
+            namespace = {"events": len(sequence.events), "repeat_blocks": blocks}
+            file.write(f', "{JSON_NAMESPACE}": ' + json.dumps(namespace))
+        file.write("}")
+
+
+def load_json(path: str, progress=None) -> QuackSequence:
+    """Loads a pulse sequence from a JSON file.
+
+    Args:
+        path (str): The path to the file.
+        progress (callable, optional): The progress callback. Defaults to None.
+
+    Returns:
+        QuackSequence: The loaded pulse sequence.
+    """
+    with open(path) as file:
+        sequence = json.load(file)
+
+    namespace = sequence.get(JSON_NAMESPACE, {})
+    blocks = namespace.get("repeat_blocks", [])
+    if blocks:
+        try:
+            events = fold_events(sequence["events"], blocks)
+            if len(events) != namespace.get("events"):
+                raise ValueError(f"{namespace.get('events')} events were saved, {len(events)} were found")
+            sequence["events"] = events
+            sequence["repeat_blocks"] = blocks
+        except ValueError as exception:
+            # The events were changed by another tool, so they are loaded as they are
+            logger.warning("Ignoring the repeat blocks of %s: %s", path, exception)
+    return build_sequence(sequence, progress)
+
+
+def get_event_table_dtype(n_parameters: int) -> np.dtype:
+    """Returns the record type of the event table of the binary format.
+
+    Args:
+        n_parameters (int): The number of pulse parameters per event.
+
+    Returns:
+        np.dtype: The record type with the duration, the position of the TX shape samples and the indices of the pulse parameter configurations.
+    """
+    return np.dtype(
+        [
+            ("duration", "<f8"),
+            ("sample_offset", "<i8"),
+            ("sample_count", "<i8"),
+            ("parameters", "<i4", (n_parameters,)),
+        ]
+    )
+
+
+def sample_tx_shape(event) -> np.ndarray:
+    """Samples the TX pulse shape of an event.
+
+    The samples are taken from the shape cache and must not be modified.
+
+    Args:
+        event (Event): The event.
+
+    Returns:
+        np.ndarray: The samples of the pulse shape or None if the event does not transmit.
+    """
+    for parameter in event.parameters.values():
+        if isinstance(parameter, TXPulse):
+            amplitude = parameter.get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value
+            if amplitude > 0:
+                shape = parameter.get_option_by_name(TXPulse.TX_PULSE_SHAPE).value
+                return np.asarray(
+                    shape_cache.get_pulse_amplitude(shape, event.duration), dtype="<f8"
+                )
+    return None
+
+
+def save_binary(sequence: QuackSequence, path: str, progress=None) -> None:
+    """Saves a pulse sequence in the binary format.
+
+    The blocks are streamed to the file event by event. Identical pulse parameter configurations and identical TX pulse shapes are only stored once.
+
+    Args:
+        sequence (QuackSequence): The pulse sequence.
+        path (str): The path to the file.
+        progress (callable, optional): The progress callback. Defaults to None.
+    """
+    parameter_names = list(sequence.pulse_parameter_options.keys())
+    table = np.zeros(
+        len(sequence.events), dtype=get_event_table_dtype(len(parameter_names))
+    )
+    configurations = []
+    configuration_index = {}
+    # Shared pulse parameter instances are only serialized once, see the interning module
+    instance_index = {}
+    samples = {}
+
+    with open(path, "wb") as file:
+        file.write(b"\0" * BINARY_HEADER.size)
+        samples_offset = file.tell()
+
+        for row, event in enumerate(sequence.events):
+            for column, parameter in enumerate(parameter_names):
+                pulse_parameter = event.parameters[parameter]
+                if id(pulse_parameter) not in instance_index:
+                    options = [option.to_json() for option in pulse_parameter.options]
+                    key = json.dumps(options, cls=DecimalEncoder, sort_keys=True)
+                    if key not in configuration_index:
+                        configuration_index[key] = len(configurations)
+                        configurations.append(options)
+                    instance_index[id(pulse_parameter)] = configuration_index[key]
+                table["parameters"][row, column] = instance_index[id(pulse_parameter)]
+
+            # The shape only depends on the pulse parameter configurations and the duration
+            sample_key = (tuple(table["parameters"][row]), float(event.duration))
+            if sample_key not in samples:
+                block = sample_tx_shape(event)
+                if block is None:
+                    samples[sample_key] = (-1, 0)
+                else:
+                    samples[sample_key] = (file.tell(), len(block))
+                    block.tofile(file)
+            table["duration"][row] = float(event.duration)
+            table["sample_offset"][row], table["sample_count"][row] = samples[
+                sample_key
+            ]
+            report_progress(progress, row + 1, len(sequence.events))
+
+        samples_size = file.tell() - samples_offset
+
+        metadata = json.dumps(
+            {
+                "name": sequence.name,
+                "version": sequence.version,
+                "parameters": parameter_names,
+                "events": [event.name for event in sequence.events],
+                "configurations": configurations,
+                "repeat_blocks": get_repeat_blocks(sequence),
+            },
+            cls=DecimalEncoder,
+        ).encode()
+        metadata_offset = file.tell()
+        file.write(metadata)
+
+        # Keep the event table aligned to its records
+        file.write(b"\0" * (-file.tell() % 8))
+        table_offset = file.tell()
+        table.tofile(file)
+
+        file.seek(0)
+        file.write(
+            BINARY_HEADER.pack(
+                BINARY_MAGIC,
+                BINARY_VERSION,
+                0,
+                len(sequence.events),
+                len(parameter_names),
+                metadata_offset,
+                len(metadata),
+                table_offset,
+                table.nbytes,
+                samples_offset,
+                samples_size,
+            )
+        )
+
+    logger.debug(
+        "Saved %s events with %s distinct pulse parameter configurations to %s",
+        len(sequence.events),
+        len(configurations),
+        path,
+    )
+
+
+def read_binary_header(file) -> dict:
+    """Reads the header of a binary pulse sequence file.
+
+    Args:
+        file (BinaryIO): The opened file.
+
+    Returns:
+        dict: The fields of the header.
+
+    Raises:
+        KeyError: If the file is not a binary pulse sequence or its version is not supported.
+    """
+    (
+        magic,
+        version,
+        _,
+        n_events,
+        n_parameters,
+        metadata_offset,
+        metadata_size,
+        table_offset,
+        table_size,
+        samples_offset,
+        samples_size,
+    ) = BINARY_HEADER.unpack(file.read(BINARY_HEADER.size))
+
+    if magic != BINARY_MAGIC:
+        raise KeyError("File is not a binary pulse sequence")
+    if version > BINARY_VERSION:
+        raise KeyError(f"Binary pulse sequence version {version} is not supported")
+
+    return {
+        "version": version,
+        "n_events": n_events,
+        "n_parameters": n_parameters,
+        "metadata_offset": metadata_offset,
+        "metadata_size": metadata_size,
+        "table_offset": table_offset,
+        "table_size": table_size,
+        "samples_offset": samples_offset,
+        "samples_size": samples_size,
+    }
+
+
+def read_binary_tables(path: str) -> tuple:
+    """Reads the header, the metadata and the event table of a binary pulse sequence file.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        tuple: The header, the metadata and the event table.
+    """
+    with open(path, "rb") as file:
+        header = read_binary_header(file)
+        file.seek(header["metadata_offset"])
+        metadata = json.loads(file.read(header["metadata_size"]).decode())
+        file.seek(header["table_offset"])
+        table = np.frombuffer(
+            file.read(header["table_size"]),
+            dtype=get_event_table_dtype(header["n_parameters"]),
+        )
+    return header, metadata, table
+
+
+def load_binary(path: str, progress=None) -> QuackSequence:
+    """Loads a pulse sequence from a binary file.
+
+    Args:
+        path (str): The path to the file.
+        progress (callable, optional): The progress callback. Defaults to None.
+
+    Returns:
+        QuackSequence: The loaded pulse sequence.
+    """
+    _, metadata, table = read_binary_tables(path)
+
+    configurations = metadata["configurations"]
+    parameter_names = metadata["parameters"]
+    sequence = {
+        "name": metadata["name"],
+        "version": metadata["version"],
+        "events": [
+            {
+                "name": name,
+                "duration": float(record["duration"]),
+                "parameters": [
+                    {"name": parameter, "value": configurations[index]}
+                    for parameter, index in zip(parameter_names, record["parameters"])
+                ],
+            }
+            for name, record in zip(metadata["events"], table)
+        ],
+        "repeat_blocks": metadata.get("repeat_blocks", []),
+    }
+    return build_sequence(sequence, progress)
+
+
+def read_shape_samples(path: str) -> dict:
+    """Memory-maps the TX pulse shape samples of a binary pulse sequence file.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        dict: The samples of the TX pulse shape by event name. Events without TX pulse are omitted.
+    """
+    header, metadata, table = read_binary_tables(path)
+    if not header["samples_size"]:
+        return {}
+
+    samples = np.memmap(
+        path,
+        dtype="<f8",
+        mode="r",
+        offset=header["samples_offset"],
+        shape=(header["samples_size"] // 8,),
+    )
+    result = {}
+    for name, record in zip(metadata["events"], table):
+        if record["sample_offset"] < 0:
+            continue
+        start = (int(record["sample_offset"]) - header["samples_offset"]) // 8
+        result[name] = samples[start : start + int(record["sample_count"])]
+    return result
@@ -0,0 +1,81 @@
+"""Background workers for reading and writing pulse sequence files."""
+
+import logging
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from .sequence_io import SequenceIOCancelled
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceWorkerSignals(QObject):
+    """Signals of the SequenceWorker.
+
+    The signals are emitted from the thread of the worker. Connected slots of objects in the GUI thread are therefore called in the GUI thread.
+
+    Signals:
+        progress: Emitted with the number of processed and the total number of events.
+        finished: Emitted with the result of the operation when it is complete.
+        failed: Emitted with the exception if the operation failed.
+        cancelled: Emitted when the operation was cancelled.
+    """
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    cancelled = pyqtSignal()
+
+
+class SequenceWorker(QRunnable):
+    """Runs a function of sequence_io in a QThreadPool.
+
+    The function is called with a progress callback that reports the progress via the signals of the worker and aborts the function if the worker was cancelled.
+
+    Args:
+        function (callable): The function of sequence_io that should be run.
+        *args: The arguments of the function.
+    """
+
+    def __init__(self, function, *args):
+        """Initializes the SequenceWorker."""
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = SequenceWorkerSignals()
+        self.is_cancelled = False
+        self._last_percentage = -1
+
+    def cancel(self) -> None:
+        """Cancels the operation at the next progress report."""
+        self.is_cancelled = True
+
+    def report_progress(self, done: int, total: int) -> None:
+        """Progress callback of the function. Only changes of the percentage are emitted.
+
+        Args:
+            done (int): The number of processed events.
+            total (int): The total number of events.
+
+        Raises:
+            SequenceIOCancelled: If the worker was cancelled.
+        """
+        if self.is_cancelled:
+            raise SequenceIOCancelled()
+
+        percentage = done * 100 // total if total else 100
+        if percentage != self._last_percentage:
+            self._last_percentage = percentage
+            self.signals.progress.emit(done, total)
+
+    def run(self) -> None:
+        """Runs the function and emits the result."""
+        try:
+            result = self.function(*self.args, progress=self.report_progress)
+        except SequenceIOCancelled:
+            logger.debug("Sequence worker was cancelled")
+            self.signals.cancelled.emit()
+        except Exception as exception:
+            logger.exception("Sequence worker failed")
+            self.signals.failed.emit(exception)
+        else:
+            self.signals.finished.emit(result)
@@ -0,0 +1,127 @@
+"""Cache of sampled pulse shapes.
+
+Evaluating a pulse shape function substitutes its parameters in the sympy expression and compiles it with lambdify, which takes much longer than sampling it. Pulse sequences usually contain many pulses with the same shape and duration, so the sampled shapes are cached.
+
+The cache key contains everything the samples depend on: the function class, its expression, the values of its parameters, the resolution, the evaluated x range and the duration. Changing an option of a pulse therefore changes the key, and the samples of the old state are evicted once they were not used for a while.
+
+This module does not depend on Qt.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ShapeCache:
+    """Bounded LRU cache of sampled pulse shapes.
+
+    The cached arrays are read-only, since they are shared between all pulses with the same shape. The cache can be used from the GUI and from the background threads that save pulse sequences.
+
+    Args:
+        max_entries (int, optional): The maximum number of cached shapes. Defaults to MAX_ENTRIES.
+        max_bytes (int, optional): The maximum size of all cached shapes in bytes. Defaults to MAX_BYTES.
+
+    Attributes:
+        MAX_ENTRIES (int): The default maximum number of cached shapes.
+        MAX_BYTES (int): The default maximum size of all cached shapes in bytes.
+        hits (int): The number of shapes that were returned from the cache.
+        misses (int): The number of shapes that had to be sampled.
+    """
+
+    MAX_ENTRIES = 256
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES) -> None:
+        """Initializes the shape cache."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(function, duration: float) -> tuple:
+        """Returns the cache key of a pulse shape.
+
+        Args:
+            function (Function): The pulse shape function.
+            duration (float): The duration of the pulse in seconds.
+
+        Returns:
+            tuple: The cache key.
+        """
+        parameters = tuple(
+            (parameter.name, parameter.value) for parameter in function.parameters
+        )
+        return (
+            type(function),
+            str(function.expr),
+            parameters,
+            float(function.resolution),
+            float(function.start_x),
+            float(function.end_x),
+            float(duration),
+        )
+
+    def get_pulse_amplitude(self, function, duration: float) -> np.ndarray:
+        """Returns the sampled pulse amplitude of a function.
+
+        Args:
+            function (Function): The pulse shape function.
+            duration (float): The duration of the pulse in seconds.
+
+        Returns:
+            np.ndarray: The read-only samples of the pulse amplitude.
+        """
+        key = self.get_key(function, duration)
+        with self.lock:
+            samples = self.cache.get(key)
+            if samples is not None:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return samples
+            self.misses += 1
+
+        # The function is evaluated without holding the lock
+        samples = np.asarray(function.get_pulse_amplitude(float(duration)))
+        samples.setflags(write=False)
+        with self.lock:
+            if key not in self.cache:
+                self.cache[key] = samples
+                self.bytes += samples.nbytes
+            while len(self.cache) > 1 and (
+                len(self.cache) > self.max_entries or self.bytes > self.max_bytes
+            ):
+                _, evicted = self.cache.popitem(last=False)
+                self.bytes -= evicted.nbytes
+        return samples
+
+    def cache_info(self) -> dict:
+        """Returns the statistics of the shape cache.
+
+        Returns:
+            dict: The number of hits, misses, cached shapes and their size in bytes.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.cache),
+            "bytes": self.bytes,
+        }
+
+    def clear_cache(self) -> None:
+        """Removes all shapes from the cache and resets the statistics."""
+        with self.lock:
+            self.cache.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+shape_cache = ShapeCache()
@@ -0,0 +1,221 @@
+"""Parameter sweeps over pulse sequences.
+
+A sweep varies event durations and numeric option values of a pulse sequence, e.g. the delay of a T1 series. The variants are generated lazily one at a time. A variant is a shallow copy of the base pulse sequence in which only the events that are changed by the sweep are copied. All other events are shared with the base pulse sequence, so the variants must be treated as read-only.
+
+This module does not depend on Qt.
+"""
+
+import copy
+import itertools
+import logging
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from quackseq.phase_table import PhaseTable
+from quackseq.pulsesequence import PulseSequence
+
+from . import sequence_io
+
+logger = logging.getLogger(__name__)
+
+
+class SweepVariable:
+    """A value of an event that is varied by a sweep.
+
+    Args:
+        event_name (str): The name of the event.
+        values (list): The values of the variable. Durations are given in µs.
+        parameter (str, optional): The name of the pulse parameter. Defaults to None, which varies the duration of the event.
+        option (str, optional): The name of the numeric option of the pulse parameter. Defaults to None.
+
+    Attributes:
+        DURATION (str): The label of the duration of an event.
+    """
+
+    DURATION = "Duration (µs)"
+
+    def __init__(self, event_name: str, values, parameter: str = None, option: str = None) -> None:
+        """Initializes the sweep variable."""
+        self.event_name = event_name
+        self.values = list(values)
+        self.parameter = parameter
+        self.option = option
+
+    @classmethod
+    def linear(cls, event_name: str, start: float, stop: float, steps: int, **kwargs) -> "SweepVariable":
+        """Creates a sweep variable with evenly spaced values.
+
+        Args:
+            event_name (str): The name of the event.
+            start (float): The first value.
+            stop (float): The last value.
+            steps (int): The number of values.
+            **kwargs: The parameter and option of the variable.
+
+        Returns:
+            SweepVariable: The sweep variable.
+        """
+        return cls(event_name, np.linspace(start, stop, steps).tolist(), **kwargs)
+
+    @property
+    def label(self) -> str:
+        """str: A human-readable description of the variable."""
+        if self.parameter is None:
+            return f"{self.event_name}: {self.DURATION}"
+        return f"{self.event_name}: {self.parameter} / {self.option}"
+
+    def apply(self, event, value) -> None:
+        """Sets the value of the variable in an event.
+
+        The event must be a copy made by copy_event, so only the changed option is replaced.
+
+        Args:
+            event (Event): The event.
+            value (float): The value.
+        """
+        if self.parameter is None:
+            event.duration = f"{value}u"
+            return
+
+        parameter = copy.copy(event.parameters[self.parameter])
+        parameter.options = list(parameter.options)
+        for index, option in enumerate(parameter.options):
+            if option.name == self.option:
+                option = copy.copy(option)
+                if not getattr(option, "is_float", True):
+                    value = round(value)
+                option.set_value(value)
+                parameter.options[index] = option
+                break
+        else:
+            raise ValueError(f"Option {self.option} not found in {self.parameter}")
+        event.parameters[self.parameter] = parameter
+
+
+def copy_event(event, sequence: PulseSequence):
+    """Returns a shallow copy of an event that belongs to another pulse sequence.
+
+    The pulse parameters are shared with the original event until they are replaced.
+
+    Args:
+        event (Event): The event.
+        sequence (PulseSequence): The pulse sequence of the copy.
+
+    Returns:
+        Event: The copy of the event.
+    """
+    event = copy.copy(event)
+    event.parameters = OrderedDict(event.parameters)
+    event.pulse_sequence = sequence
+    return event
+
+
+class Sweep:
+    """Generates the variants of a pulse sequence for a set of sweep variables.
+
+    Example:
+        >>> sweep = Sweep(sequence, [SweepVariable.linear("Delay", 10, 1000, 50)])
+        >>> for index, values, variant in sweep:
+        ...     sequence_io.save_sequence(variant, f"t1_{index:03d}.quack")
+
+    Args:
+        sequence (PulseSequence): The base pulse sequence.
+        variables (list): The sweep variables.
+        parallel (bool, optional): Whether the variables are varied together, which requires them to have the same number of values. Otherwise all combinations of values are generated. Defaults to False.
+
+    Raises:
+        ValueError: If an event of a variable does not exist or parallel variables have different numbers of values.
+    """
+
+    def __init__(self, sequence: PulseSequence, variables: list, parallel: bool = False) -> None:
+        """Initializes the sweep."""
+        self.sequence = sequence
+        self.variables = list(variables)
+        self.parallel = parallel
+
+        names = sequence.get_event_names()
+        self.event_indices = []
+        for variable in self.variables:
+            if variable.event_name not in names:
+                raise ValueError(f"Event {variable.event_name} not found in the pulse sequence")
+            self.event_indices.append(names.index(variable.event_name))
+
+        if parallel and len({len(variable.values) for variable in self.variables}) > 1:
+            raise ValueError("Variables that are varied in parallel need the same number of values")
+
+    def __len__(self) -> int:
+        """Returns the number of variants."""
+        if not self.variables:
+            return 0
+        if self.parallel:
+            return len(self.variables[0].values)
+        return int(np.prod([len(variable.values) for variable in self.variables]))
+
+    def get_values(self):
+        """Returns an iterator over the values of the variables for every variant.
+
+        Returns:
+            iterator: Tuples with one value per variable.
+        """
+        if self.parallel:
+            return zip(*(variable.values for variable in self.variables))
+        return itertools.product(*(variable.values for variable in self.variables))
+
+    def __iter__(self):
+        """Generates the variants one at a time.
+
+        Yields:
+            tuple: The index of the variant, the values of the variables and the variant.
+        """
+        for index, values in enumerate(self.get_values()):
+            yield index, values, self.create_variant(index, values)
+
+    def create_variant(self, index: int, values: tuple) -> PulseSequence:
+        """Creates a variant of the base pulse sequence.
+
+        Args:
+            index (int): The index of the variant.
+            values (tuple): The values of the variables.
+
+        Returns:
+            PulseSequence: The variant.
+        """
+        variant = copy.copy(self.sequence)
+        variant.name = f"{self.sequence.name}_{index:03d}"
+        variant.events = list(self.sequence.events)
+        if hasattr(variant, "phase_table"):
+            variant.phase_table = PhaseTable(variant)
+
+        copied = {}
+        for variable, event_index, value in zip(self.variables, self.event_indices, values):
+            if event_index not in copied:
+                copied[event_index] = copy_event(variant.events[event_index], variant)
+                variant.events[event_index] = copied[event_index]
+            variable.apply(copied[event_index], value)
+        return variant
+
+    def save_variants(self, directory: str, extension: str = sequence_io.JSON_EXTENSION, progress=None) -> list:
+        """Saves all variants to a directory.
+
+        The files are named after the variants. The progress callback is called with the number of saved and the total number of variants.
+
+        Args:
+            directory (str): The directory.
+            extension (str, optional): The file extension, which selects the format. Defaults to JSON_EXTENSION.
+            progress (callable, optional): The progress callback. Defaults to None.
+
+        Returns:
+            list: The paths of the saved files.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        total = len(self)
+        paths = []
+        for index, values, variant in self:
+            path = directory / f"{variant.name}.{extension}"
+            logger.debug("Saving variant %s with values %s", index, values)
+            sequence_io.save_sequence(variant, str(path))
+            paths.append(str(path))
+            sequence_io.report_progress(progress, index + 1, total)
+        return paths
@@ -0,0 +1,195 @@
+"""Sampled timeline of a whole pulse sequence.
+
+The TX envelope and the RX gate of all events are stored in a single pre-allocated buffer that can be drawn as one line, with the two traces separated by NaN. Events without TX only contribute their start and end point, so long delays do not cost any samples.
+
+For drawing, SequenceTimeline.get_view decimates the visible part of the timeline to a min/max pair per pixel column, so the number of drawn points only depends on the width of the plot.
+
+This module does not depend on Qt.
+"""
+
+import logging
+
+import numpy as np
+from quackseq.pulsesequence import PulseSequence
+from quackseq.pulseparameters import TXPulse, RXReadout
+
+from .sequence_io import sample_tx_shape
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceTimeline:
+    """TX envelope and RX gate of a pulse sequence.
+
+    Times are in seconds. The TX envelope is the magnitude of the pulse shape scaled with the relative amplitude, between 0 and 1. The RX gate is drawn below the TX envelope between RX_OFF and RX_ON.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence.
+
+    Attributes:
+        RX_OFF (float): The value of the RX trace when the receiver is off.
+        RX_ON (float): The value of the RX trace when the receiver is on.
+        event_times (np.ndarray): The start times of the events followed by the end of the pulse sequence.
+        buffer (np.ndarray): The points of both traces with the times in the first and the values in the second row.
+        tx_points (int): The number of points of the TX trace at the start of the buffer.
+    """
+
+    RX_OFF = -1.2
+    RX_ON = -0.2
+
+    def __init__(self, sequence: PulseSequence) -> None:
+        """Samples the pulse sequence."""
+        events = sequence.events
+        durations = np.array([float(event.duration) for event in events], dtype=float)
+        self.event_times = np.concatenate(([0.0], np.cumsum(durations)))
+
+        shapes = [self.get_tx_envelope(event) for event in events]
+        rx = np.array([self.get_rx_state(event) for event in events], dtype=bool)
+
+        # Every event starts and ends at zero, the TX samples lie in between
+        counts = np.array(
+            [2 + (0 if shape is None else len(shape)) for shape in shapes], dtype=int
+        )
+        self.tx_points = int(counts.sum())
+        rx_points = 2 * len(events)
+        self.buffer = np.empty((2, self.tx_points + 1 + rx_points))
+        self._view = np.empty((2, 0))
+
+        self.fill_tx(durations, shapes, counts)
+
+        # Break the line between the two traces
+        self.buffer[:, self.tx_points] = np.nan
+
+        rx_buffer = self.buffer[:, self.tx_points + 1 :]
+        rx_buffer[0, 0::2] = self.event_times[:-1]
+        rx_buffer[0, 1::2] = self.event_times[1:]
+        rx_buffer[1] = np.repeat(np.where(rx, self.RX_ON, self.RX_OFF), 2)
+
+    def fill_tx(self, durations: np.ndarray, shapes: list, counts: np.ndarray) -> None:
+        """Writes the TX trace to the start of the buffer.
+
+        The time axis of all events is computed in one vectorized operation. Each event gets evenly spaced points from its start to its end time.
+
+        Args:
+            durations (np.ndarray): The durations of the events.
+            shapes (list): The TX envelope of every event or None.
+            counts (np.ndarray): The number of points of every event.
+        """
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        event_of_point = np.repeat(np.arange(len(counts)), counts)
+        position = np.arange(self.tx_points) - offsets[event_of_point]
+        fraction = position / np.maximum(counts - 1, 1)[event_of_point]
+
+        times, values = self.buffer[0, : self.tx_points], self.buffer[1, : self.tx_points]
+        np.multiply(fraction, durations[event_of_point], out=times)
+        times += self.event_times[:-1][event_of_point]
+
+        values[:] = 0
+        for offset, count, shape in zip(offsets, counts, shapes):
+            if shape is not None:
+                values[offset + 1 : offset + count - 1] = shape
+
+    @staticmethod
+    def get_tx_envelope(event) -> np.ndarray:
+        """Returns the TX envelope of an event.
+
+        Args:
+            event (Event): The event.
+
+        Returns:
+            np.ndarray: The magnitude of the pulse shape scaled with the relative amplitude or None if the event does not transmit.
+        """
+        shape = sample_tx_shape(event)
+        if shape is None:
+            return None
+        for parameter in event.parameters.values():
+            if isinstance(parameter, TXPulse):
+                amplitude = parameter.get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value
+                return np.abs(shape) * (amplitude / 100)
+        return None
+
+    @staticmethod
+    def get_rx_state(event) -> bool:
+        """Returns whether the receiver is on during an event.
+
+        Args:
+            event (Event): The event.
+
+        Returns:
+            bool: True if any RX readout parameter of the event is on.
+        """
+        return any(
+            bool(parameter.get_option_by_name(RXReadout.RX).value)
+            for parameter in event.parameters.values()
+            if isinstance(parameter, RXReadout)
+        )
+
+    @property
+    def duration(self) -> float:
+        """float: The duration of the pulse sequence in seconds."""
+        return float(self.event_times[-1])
+
+    def get_view(self, start: float, stop: float, columns: int) -> np.ndarray:
+        """Returns the points of both traces that are needed to draw a time range.
+
+        If a trace has more than two points per column in the range, it is reduced to the minimum and maximum of every column. Otherwise the points are returned unchanged.
+
+        Args:
+            start (float): The start of the time range in seconds.
+            stop (float): The end of the time range in seconds.
+            columns (int): The number of pixel columns of the plot.
+
+        Returns:
+            np.ndarray: The times in the first and the values in the second row.
+        """
+        tx = self.buffer[:, : self.tx_points]
+        rx = self.buffer[:, self.tx_points + 1 :]
+        parts = [
+            decimate(tx, start, stop, columns),
+            np.full((2, 1), np.nan),
+            decimate(rx, start, stop, columns),
+        ]
+        size = sum(part.shape[1] for part in parts)
+        # The view buffer is only reallocated if it is too small
+        if self._view.shape[1] < size:
+            self._view = np.empty((2, max(size, 4 * columns + 8)))
+        position = 0
+        for part in parts:
+            self._view[:, position : position + part.shape[1]] = part
+            position += part.shape[1]
+        return self._view[:, :size]
+
+
+def decimate(points: np.ndarray, start: float, stop: float, columns: int) -> np.ndarray:
+    """Reduces the points of a trace within a time range to the minimum and maximum of every column.
+
+    One point before and after the range is kept, so lines that cross the border of the range are drawn.
+
+    Args:
+        points (np.ndarray): The times in the first and the values in the second row. The times must be sorted.
+        start (float): The start of the time range in seconds.
+        stop (float): The end of the time range in seconds.
+        columns (int): The number of columns.
+
+    Returns:
+        np.ndarray: The reduced points with the times in the first and the values in the second row.
+    """
+    times = points[0]
+    first = max(int(np.searchsorted(times, start, side="left")) - 1, 0)
+    last = min(int(np.searchsorted(times, stop, side="right")) + 1, len(times))
+    visible = points[:, first:last]
+    if visible.shape[1] <= 2 * columns or columns <= 0:
+        return visible
+
+    # Start index of the points of every column, empty columns are dropped
+    bounds = np.searchsorted(visible[0], np.linspace(start, stop, columns + 1)[:-1])
+    bounds = np.unique(np.concatenate(([0], bounds)))
+    bounds = bounds[bounds < visible.shape[1]]
+
+    values = visible[1]
+    reduced = np.empty((2, 2 * len(bounds)))
+    reduced[0, 0::2] = visible[0, bounds]
+    reduced[0, 1::2] = visible[0, bounds]
+    reduced[1, 0::2] = np.minimum.reduceat(values, bounds)
+    reduced[1, 1::2] = np.maximum.reduceat(values, bounds)
+    return reduced
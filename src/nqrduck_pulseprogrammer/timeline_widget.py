@@ -0,0 +1,105 @@
+"""Timeline plot of the whole pulse sequence."""
+
+import logging
+from PyQt6.QtCore import QTimer, pyqtSlot
+from matplotlib.ticker import FuncFormatter
+from nqrduck.contrib.mplwidget import MplWidget
+
+from .timeline import SequenceTimeline
+
+logger = logging.getLogger(__name__)
+
+
+class TimelineWidget(MplWidget):
+    """Plots the TX envelope and the RX gate of the pulse sequence over time.
+
+    The timeline shows the pulse sequence as it is run by the spectrometers, with unrolled repeat blocks.
+
+    Both traces are drawn as a single line. When the plot is panned or zoomed, only the visible part of the timeline is decimated to the width of the plot and the data of the line is replaced.
+
+    Changes of the pulse sequence are collected and the timeline is sampled again once control returns to the event loop. While the widget is hidden, the timeline is only sampled when it is shown again.
+
+    Args:
+        model (PulseProgrammerModel): The model of the pulse programmer module.
+        parent (QWidget, optional): The parent widget. Defaults to None.
+    """
+
+    def __init__(self, model, parent=None):
+        """Initializes the timeline widget."""
+        super().__init__(parent)
+        self.model = model
+        self.timeline = None
+        self.outdated = True
+
+        ax = self.canvas.ax
+        (self.line,) = ax.plot([], [], linewidth=1)
+        ax.set_xlabel("Time (µs)")
+        ax.xaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{x * 1e6:g}"))
+        ax.set_yticks(
+            [0.5, (SequenceTimeline.RX_ON + SequenceTimeline.RX_OFF) / 2], ["TX", "RX"]
+        )
+        ax.set_ylim(SequenceTimeline.RX_OFF - 0.2, 1.2)
+        ax.callbacks.connect("xlim_changed", self.on_xlim_changed)
+        self.setMinimumHeight(250)
+
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.timeout.connect(self.update_timeline)
+
+        model.events_changed.connect(self.schedule_update)
+        model.pulse_sequence_changed.connect(self.schedule_update)
+        model.event_inserted.connect(self.schedule_update)
+        model.event_removed.connect(self.schedule_update)
+        model.event_moved.connect(self.schedule_update)
+        model.event_duration_changed.connect(self.schedule_update)
+        model.event_parameter_changed.connect(self.schedule_update)
+        model.repeat_blocks_changed.connect(self.schedule_update)
+
+    @pyqtSlot()
+    def schedule_update(self) -> None:
+        """Marks the timeline as outdated and samples it again from the event loop if the widget is visible."""
+        self.outdated = True
+        if self.isVisible():
+            self.update_timer.start(0)
+
+    def showEvent(self, event) -> None:
+        """Samples the timeline if the pulse sequence changed while the widget was hidden."""
+        super().showEvent(event)
+        if self.outdated:
+            self.update_timer.start(0)
+
+    @pyqtSlot()
+    def update_timeline(self) -> None:
+        """Samples the pulse sequence and redraws the plot."""
+        old_duration = None if self.timeline is None else self.timeline.duration
+        self.timeline = SequenceTimeline(self.model.expanded_sequence)
+        self.outdated = False
+        logger.debug(
+            "Sampled timeline with %s TX points", self.timeline.tx_points
+        )
+
+        duration = self.timeline.duration
+        if duration != old_duration and duration > 0:
+            # Setting the limits redraws the line through on_xlim_changed
+            self.canvas.ax.set_xlim(0, duration)
+        else:
+            self.redraw_line()
+
+    def on_xlim_changed(self, ax) -> None:
+        """Redraws the line for the new time range when the plot was panned or zoomed.
+
+        Args:
+            ax (Axes): The axes of the plot.
+        """
+        self.redraw_line()
+
+    def redraw_line(self) -> None:
+        """Replaces the data of the line with the decimated visible part of the timeline."""
+        if self.timeline is None:
+            return
+        ax = self.canvas.ax
+        start, stop = ax.get_xlim()
+        columns = max(int(ax.bbox.width), 1)
+        view = self.timeline.get_view(start, stop, columns)
+        self.line.set_data(view[0], view[1])
+        self.canvas.draw_idle()
@@ -0,0 +1,178 @@
+"""Timing index of a pulse sequence.
+
+The index keeps the start times of the events as a prefix sum over their spans, so the start time of an event and the total duration are read in constant time and the event that is played at a given time is found with a binary search. A change only recomputes the prefix sum from the first affected event onwards.
+
+The durations and start times are stored in buffers with spare capacity that grow by doubling, like a Python list. Inserting or removing an event therefore only shifts the events behind it instead of copying the whole arrays, so appending events takes amortized constant time.
+
+The span of an event is its duration, except for the last event of a repeat block, whose span also covers the further repetitions of the block. The start times are therefore the start times of the first repetition of every event.
+
+This module does not depend on Qt.
+"""
+
+import logging
+
+import numpy as np
+from quackseq.pulsesequence import PulseSequence
+
+from .repeat import get_repeat_blocks
+
+logger = logging.getLogger(__name__)
+
+
+class TimingIndex:
+    """Prefix sum of the event durations of a pulse sequence.
+
+    The changes of the pulse sequence are passed to apply as the deltas of the undo module. Times are in seconds.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence.
+
+    Attributes:
+        MIN_CAPACITY (int): The smallest number of events the buffers are allocated for.
+        durations (np.ndarray): The durations of the events, a view of the duration buffer.
+        starts (np.ndarray): The start times of the events followed by the total duration, a view of the start time buffer.
+    """
+
+    MIN_CAPACITY = 64
+
+    def __init__(self, sequence: PulseSequence) -> None:
+        """Initializes the timing index."""
+        self.reset(sequence)
+
+    def reset(self, sequence: PulseSequence) -> None:
+        """Builds the timing index for a pulse sequence.
+
+        Args:
+            sequence (PulseSequence): The pulse sequence.
+        """
+        self.sequence = sequence
+        self.size = len(sequence.events)
+        capacity = max(2 * self.size, self.MIN_CAPACITY)
+        self._durations = np.zeros(capacity)
+        self._durations[: self.size] = [float(event.duration) for event in sequence.events]
+        self._starts = np.zeros(capacity + 1)
+        self.update(0)
+
+    @property
+    def durations(self) -> np.ndarray:
+        """np.ndarray: The durations of the events."""
+        return self._durations[: self.size]
+
+    @property
+    def starts(self) -> np.ndarray:
+        """np.ndarray: The start times of the events followed by the total duration."""
+        return self._starts[: self.size + 1]
+
+    def grow(self) -> None:
+        """Doubles the capacity of the buffers."""
+        capacity = 2 * len(self._durations)
+        self._durations = np.resize(self._durations, capacity)
+        self._starts = np.resize(self._starts, capacity + 1)
+
+    def apply(self, delta: tuple) -> None:
+        """Updates the timing index after a delta was applied to the pulse sequence.
+
+        A change of an event takes time proportional to the number of events behind it, because their start times are recomputed.
+
+        Args:
+            delta (tuple): The delta.
+        """
+        operation, index, *data = delta
+        events = self.sequence.events
+        if operation == "insert":
+            if self.size == len(self._durations):
+                self.grow()
+            # Numpy copies overlapping slices correctly
+            self._durations[index + 1 : self.size + 1] = self._durations[index : self.size]
+            self._durations[index] = float(events[index].duration)
+            self.size += 1
+        elif operation == "remove":
+            self._durations[index : self.size - 1] = self._durations[index + 1 : self.size]
+            self.size -= 1
+        elif operation == "move":
+            new_index = data[0]
+            first, last = min(index, new_index), max(index, new_index)
+            self.durations[first : last + 1] = [
+                float(event.duration) for event in events[first : last + 1]
+            ]
+            index = first
+        elif operation == "duration":
+            self.durations[index] = float(events[index].duration)
+        elif operation == "repeat":
+            # Blocks that were removed or added may start anywhere
+            starts = [block[0] for block in data[-2] + data[-1]]
+            index = min(starts, default=0)
+        else:
+            return
+        self.update(index)
+
+    def update(self, index: int) -> None:
+        """Recomputes the start times from an event onwards.
+
+        Args:
+            index (int): The index of the first changed event.
+        """
+        blocks = [
+            block
+            for block in get_repeat_blocks(self.sequence)
+            # The blocks may not match the events in the middle of an undo step
+            if block[0] + block[1] <= len(self.durations)
+        ]
+        # A change within a repeat block changes the span of its last event
+        for start, length, _ in blocks:
+            if start < index < start + length:
+                index = start
+        index = min(max(index, 0), len(self.durations))
+
+        spans = self.durations[index:].copy()
+        for start, length, count in blocks:
+            if start >= index:
+                spans[start + length - 1 - index] += self.durations[start : start + length].sum() * (count - 1)
+
+        np.cumsum(spans, out=self.starts[index + 1 :])
+        self.starts[index + 1 :] += self.starts[index]
+
+    @property
+    def duration(self) -> float:
+        """float: The total duration of the pulse sequence with all repetitions in seconds."""
+        return float(self.starts[-1])
+
+    def get_start_time(self, index: int) -> float:
+        """Returns the start time of the first repetition of an event.
+
+        Args:
+            index (int): The index of the event.
+
+        Returns:
+            float: The start time in seconds.
+        """
+        return float(self.starts[index])
+
+    def get_event_at(self, time: float) -> tuple:
+        """Returns the event that is played at a given time.
+
+        Args:
+            time (float): The time in seconds.
+
+        Returns:
+            tuple: The index of the event and the number of the repetition of its repeat block (0 for the first repetition) or None if the time lies outside of the pulse sequence.
+        """
+        if time < 0 or time >= self.duration:
+            return None
+        index = int(np.searchsorted(self.starts, time, side="right")) - 1
+        end_of_first = self.starts[index] + self.durations[index]
+        if time < end_of_first:
+            return index, 0
+
+        # The time lies in a further repetition of the block that ends with this event
+        for start, length, count in get_repeat_blocks(self.sequence):
+            if start + length - 1 == index:
+                block_start = self.starts[start]
+                block_duration = self.durations[start : start + length].sum()
+                repetition, offset = divmod(time - block_start, block_duration)
+                repetition = min(repetition, count - 1)
+                position = int(
+                    np.searchsorted(self.starts[start : start + length], block_start + offset, side="right")
+                ) - 1
+                return start + position, int(repetition)
+        return index, 0
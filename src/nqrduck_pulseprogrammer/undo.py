@@ -0,0 +1,161 @@
+"""Undo and redo of changes to the pulse sequence.
+
+Changes are recorded as deltas that only contain what is needed to revert them:
+
+- ``("insert", index, event)`` and ``("remove", index, event)``
+- ``("move", old_index, new_index)``
+- ``("rename", index, old_name, new_name)``
+- ``("duration", index, old_duration, new_duration)``
+- ``("parameter", index, parameter, old_values, new_values)``
+- ``("repeat", 0, old_blocks, new_blocks)`` for the repeat blocks of the pulse sequence
+
+The size of a delta therefore depends on the changed event but not on the length of the pulse sequence. Deltas that are recorded together (e.g. in a batch of the model) form a single undo step.
+
+This module does not depend on Qt.
+"""
+
+import logging
+import sys
+from collections import deque
+
+from quackseq.pulsesequence import PulseSequence
+
+logger = logging.getLogger(__name__)
+
+
+def invert_delta(delta: tuple) -> tuple:
+    """Returns the delta that reverts the given delta.
+
+    Args:
+        delta (tuple): The delta.
+
+    Returns:
+        tuple: The inverse delta.
+    """
+    operation, index, *data = delta
+    if operation == "insert":
+        return ("remove", index, *data)
+    if operation == "remove":
+        return ("insert", index, *data)
+    if operation == "move":
+        return ("move", data[0], index)
+    # The old and the new value are always the last two entries
+    return (operation, index, *data[:-2], data[-1], data[-2])
+
+
+def estimate_memory(value, seen: set = None) -> int:
+    """Estimates the memory used by a delta in bytes.
+
+    Containers and the attributes of objects are followed, but references back to the pulse sequence are not, so an event is counted without the rest of the pulse sequence.
+
+    Args:
+        value: The delta or a part of it.
+        seen (set, optional): The ids of the objects that were already counted. Defaults to None.
+
+    Returns:
+        int: The estimated number of bytes.
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen or isinstance(value, (PulseSequence, type)):
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(
+            estimate_memory(key, seen) + estimate_memory(item, seen)
+            for key, item in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        size += sum(estimate_memory(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += estimate_memory(vars(value), seen)
+    return size
+
+
+class UndoStack:
+    """Bounded undo and redo stacks of undo steps.
+
+    An undo step is a list of deltas. If the estimated memory of all undo steps exceeds max_memory, the oldest steps are evicted.
+
+    Args:
+        max_memory (int, optional): The maximum estimated memory of the undo steps in bytes. Defaults to MAX_MEMORY.
+
+    Attributes:
+        MAX_MEMORY (int): The default memory cap in bytes.
+        memory (int): The estimated memory of the undo and redo steps in bytes.
+    """
+
+    MAX_MEMORY = 16 * 1024 * 1024
+
+    def __init__(self, max_memory: int = MAX_MEMORY) -> None:
+        """Initializes the undo stack."""
+        self.max_memory = max_memory
+        self.memory = 0
+        self._undo = deque()
+        self._redo = []
+
+    def can_undo(self) -> bool:
+        """Checks if there is a step that can be undone.
+
+        Returns:
+            bool: True if there is a step on the undo stack.
+        """
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        """Checks if there is a step that can be redone.
+
+        Returns:
+            bool: True if there is a step on the redo stack.
+        """
+        return bool(self._redo)
+
+    def push(self, deltas: list) -> None:
+        """Pushes a new undo step and clears the redo stack.
+
+        Args:
+            deltas (list): The deltas of the step in the order they were applied.
+        """
+        for _, size in self._redo:
+            self.memory -= size
+        self._redo.clear()
+        self._push_undo(deltas)
+
+    def _push_undo(self, deltas: list, size: int = None) -> None:
+        if size is None:
+            size = estimate_memory(deltas)
+        self._undo.append((deltas, size))
+        self.memory += size
+        while self.memory > self.max_memory and len(self._undo) > 1:
+            _, evicted_size = self._undo.popleft()
+            self.memory -= evicted_size
+            logger.debug("Evicted undo step with %s bytes", evicted_size)
+
+    def undo(self) -> list:
+        """Moves the last step to the redo stack.
+
+        Returns:
+            list: The deltas that revert the step in the order they have to be applied.
+        """
+        deltas, size = self._undo.pop()
+        self._redo.append((deltas, size))
+        return [invert_delta(delta) for delta in reversed(deltas)]
+
+    def redo(self) -> list:
+        """Moves the last undone step back to the undo stack.
+
+        Returns:
+            list: The deltas of the step in the order they have to be applied.
+        """
+        deltas, size = self._redo.pop()
+        self.memory -= size
+        self._push_undo(deltas, size)
+        return deltas
+
+    def clear(self) -> None:
+        """Removes all steps."""
+        self._undo.clear()
+        self._redo.clear()
+        self.memory = 0
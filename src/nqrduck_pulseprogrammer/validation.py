@@ -0,0 +1,368 @@
+"""Validation of pulse sequences.
+
+The checks are rules that look at a single event and return its problems. SequenceValidator keeps the problems of every event and only runs the rules again for the events that are affected by a change, so the pulse sequence can be validated after every edit. Checks that need the whole pulse sequence (duplicate event names and the total duration) use a running count of the duplicate names and a running total of the durations, which are updated by every change as well.
+
+The checks only look at the pulse sequence itself and do not depend on Qt, so they can be used by the GUI and by the command line tool.
+"""
+
+import logging
+import math
+from collections import Counter
+
+from quackseq.pulsesequence import PulseSequence
+from quackseq.pulseparameters import NumericOption, FunctionOption, TXPulse, RXReadout
+from quackseq.functions import Function
+
+from .repeat import get_repeat_blocks
+
+logger = logging.getLogger(__name__)
+
+
+def validate_option(option) -> str:
+    """Checks the value of a single option.
+
+    Args:
+        option (Option): The option.
+
+    Returns:
+        str: The problem with the option or None if the option is valid.
+    """
+    if isinstance(option, NumericOption):
+        value = option.value
+        if option.min_value is not None and value < option.min_value:
+            return f"{option.name} is {value} but must be at least {option.min_value}"
+        if option.max_value is not None and value > option.max_value:
+            return f"{option.name} is {value} but must be at most {option.max_value}"
+    elif isinstance(option, FunctionOption):
+        if not isinstance(option.value, Function):
+            return f"{option.name} is not a function"
+    return None
+
+
+def check_duration(sequence: PulseSequence, event) -> list:
+    """Checks that the duration of an event is positive.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence of the event.
+        event (Event): The event.
+
+    Returns:
+        list: The problems as tuples of the name of the pulse parameter (None for the event itself) and a message.
+    """
+    if event.duration < 0:
+        return [(None, f"Duration of {event.name} is negative")]
+    if event.duration == 0:
+        return [(None, f"Duration of {event.name} is zero")]
+    return []
+
+
+def check_parameters(sequence: PulseSequence, event) -> list:
+    """Checks that an event has the pulse parameters of the pulse sequence with valid option values.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence of the event.
+        event (Event): The event.
+
+    Returns:
+        list: The problems as tuples of the name of the pulse parameter and a message.
+    """
+    problems = []
+    expected = sequence.pulse_parameter_options
+    for parameter in expected:
+        if parameter not in event.parameters:
+            problems.append((parameter, f"{event.name} has no {parameter} parameter"))
+
+    for parameter, pulse_parameter in event.parameters.items():
+        if parameter not in expected:
+            problems.append(
+                (parameter, f"{parameter} of {event.name} is not a parameter of the pulse sequence")
+            )
+            continue
+        for option in pulse_parameter.options:
+            problem = validate_option(option)
+            if problem is not None:
+                problems.append((parameter, f"{problem} in {parameter} of {event.name}"))
+    return problems
+
+
+def check_rx_during_tx(sequence: PulseSequence, event) -> list:
+    """Checks that the receiver is not enabled while an event transmits.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence of the event.
+        event (Event): The event.
+
+    Returns:
+        list: The problem with the RX readout parameter as tuple of its name and a message.
+    """
+    tx = rx = None
+    for parameter, pulse_parameter in event.parameters.items():
+        if isinstance(pulse_parameter, TXPulse):
+            if pulse_parameter.get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value > 0:
+                tx = parameter
+        elif isinstance(pulse_parameter, RXReadout):
+            if pulse_parameter.get_option_by_name(RXReadout.RX).value:
+                rx = parameter
+    if tx is not None and rx is not None:
+        return [(rx, f"{rx} of {event.name} overlaps the {tx} pulse")]
+    return []
+
+
+EVENT_RULES = (check_duration, check_parameters, check_rx_during_tx)
+
+
+def validate_event(sequence: PulseSequence, event, rules=EVENT_RULES) -> list:
+    """Checks an event with the given rules.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence of the event.
+        event (Event): The event.
+        rules (tuple, optional): The event rules. Defaults to EVENT_RULES.
+
+    Returns:
+        list: The problems as tuples of the name of the pulse parameter (None for the event itself) and a message.
+    """
+    problems = []
+    for rule in rules:
+        problems.extend(rule(sequence, event))
+    return problems
+
+
+class SequenceValidator:
+    """Incremental validator of a pulse sequence.
+
+    The changes of the pulse sequence are passed to apply as the deltas of the undo module. Only the changed events are checked again.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence.
+        max_duration (float, optional): The maximum duration of the pulse sequence in seconds, e.g. the limit of the spectrometer. Defaults to None.
+        rules (tuple, optional): The event rules. Defaults to EVENT_RULES.
+
+    Attributes:
+        event_problems (list): The problems found by the event rules for every event.
+        sequence_problems (list): The problems of the whole pulse sequence.
+        problem_count (int): The number of problems found by the event rules.
+        duplicates (int): The number of events whose name is used more than once.
+        event_duration (float): The sum of the durations of the events in seconds.
+        repeat_duration (float): The duration of the further repetitions of the repeat blocks in seconds.
+    """
+
+    def __init__(self, sequence: PulseSequence, max_duration: float = None, rules=EVENT_RULES) -> None:
+        """Initializes the validator and checks all events."""
+        self.max_duration = max_duration
+        self.rules = tuple(rules)
+        self.reset(sequence)
+
+    def reset(self, sequence: PulseSequence) -> None:
+        """Checks all events of a pulse sequence.
+
+        Args:
+            sequence (PulseSequence): The pulse sequence.
+        """
+        self.sequence = sequence
+        self.event_problems = [self.check_event(event) for event in sequence.events]
+        self.problem_count = sum(map(len, self.event_problems))
+        self.names = [event.name for event in sequence.events]
+        self.name_counts = Counter(self.names)
+        self.duplicates = sum(count for count in self.name_counts.values() if count > 1)
+        self.durations = [float(event.duration) for event in sequence.events]
+        self.event_duration = math.fsum(self.durations)
+        self.update_repeat_duration()
+        self.sequence_problems = self.check_sequence()
+
+    def check_event(self, event) -> list:
+        """Runs the event rules for an event.
+
+        Args:
+            event (Event): The event.
+
+        Returns:
+            list: The problems as tuples of the name of the pulse parameter and a message.
+        """
+        return validate_event(self.sequence, event, self.rules)
+
+    def check_sequence(self) -> list:
+        """Checks the whole pulse sequence with the running total of the durations.
+
+        Returns:
+            list: The problems as messages.
+        """
+        if self.max_duration is None:
+            return []
+        duration = self.duration
+        # The durations are summed as floats, so a sum that equals the limit may exceed it slightly
+        if duration > self.max_duration and not math.isclose(duration, self.max_duration):
+            return [
+                f"Duration of the pulse sequence is {duration * 1e6:g} µs but must be at most {self.max_duration * 1e6:g} µs"
+            ]
+        return []
+
+    @property
+    def duration(self) -> float:
+        """float: The total duration of the pulse sequence with all repetitions in seconds."""
+        return self.event_duration + self.repeat_duration
+
+    def update_repeat_duration(self) -> None:
+        """Sums the durations of the further repetitions of the repeat blocks again."""
+        self.repeat_duration = math.fsum(
+            math.fsum(self.durations[start : start + length]) * (count - 1)
+            for start, length, count in get_repeat_blocks(self.sequence)
+            # The blocks may not match the events in the middle of an undo step
+            if start + length <= len(self.durations)
+        )
+
+    def set_max_duration(self, max_duration: float) -> bool:
+        """Sets the maximum duration of the pulse sequence.
+
+        Args:
+            max_duration (float): The maximum duration in seconds or None.
+
+        Returns:
+            bool: True if the problems of the pulse sequence changed.
+        """
+        self.max_duration = max_duration
+        return self.update_sequence()
+
+    def update_sequence(self) -> bool:
+        """Checks the whole pulse sequence again.
+
+        Returns:
+            bool: True if the problems of the pulse sequence changed.
+        """
+        problems = self.check_sequence()
+        changed = problems != self.sequence_problems
+        self.sequence_problems = problems
+        return changed
+
+    def apply(self, delta: tuple) -> set:
+        """Updates the problems after a delta was applied to the pulse sequence.
+
+        Args:
+            delta (tuple): The delta.
+
+        Returns:
+            set: The indices of the events whose problems changed, without the events that were inserted or removed. -1 stands for the problems of the whole pulse sequence.
+        """
+        operation, index, *data = delta
+        events = self.sequence.events
+        changed = set()
+        if operation == "insert":
+            event = events[index]
+            self.event_problems.insert(index, self.check_event(event))
+            self.problem_count += len(self.event_problems[index])
+            self.names.insert(index, event.name)
+            self.durations.insert(index, float(event.duration))
+            self.event_duration += self.durations[index]
+            changed |= self.count_name(event.name, 1)
+        elif operation == "remove":
+            self.problem_count -= len(self.event_problems.pop(index))
+            self.event_duration -= self.durations.pop(index)
+            changed |= self.count_name(self.names.pop(index), -1)
+        elif operation == "move":
+            new_index = data[0]
+            for cache in (self.event_problems, self.names, self.durations):
+                cache.insert(new_index, cache.pop(index))
+            index = min(index, new_index)
+        elif operation == "rename":
+            changed |= self.count_name(self.names[index], -1)
+            self.names[index] = events[index].name
+            changed |= self.count_name(self.names[index], 1)
+            changed |= self.update_event(index)
+        elif operation in ("duration", "parameter"):
+            duration = float(events[index].duration)
+            self.event_duration += duration - self.durations[index]
+            self.durations[index] = duration
+            changed |= self.update_event(index)
+
+        # Only a change of the blocks or of an event in or before a block changes the repetitions
+        if operation == "repeat" or (
+            operation in ("insert", "remove", "move", "duration")
+            and any(index < start + length for start, length, _ in get_repeat_blocks(self.sequence))
+        ):
+            self.update_repeat_duration()
+        if self.update_sequence():
+            changed.add(-1)
+        return changed
+
+    def update_event(self, index: int) -> set:
+        """Runs the event rules for an event again.
+
+        Args:
+            index (int): The index of the event.
+
+        Returns:
+            set: The index of the event if its problems changed.
+        """
+        problems = self.check_event(self.sequence.events[index])
+        if problems == self.event_problems[index]:
+            return set()
+        self.problem_count += len(problems) - len(self.event_problems[index])
+        self.event_problems[index] = problems
+        return {index}
+
+    def count_name(self, name: str, step: int) -> set:
+        """Counts an event name that was added or removed.
+
+        Args:
+            name (str): The name of the event.
+            step (int): 1 if the name was added, -1 if it was removed.
+
+        Returns:
+            set: The indices of the events whose duplicate name problem changed.
+        """
+        before = self.name_counts[name]
+        after = self.name_counts[name] = before + step
+        self.duplicates += (after if after > 1 else 0) - (before if before > 1 else 0)
+        if (before > 1) == (after > 1):
+            return set()
+        # Only the rare case of duplicate names needs a scan of the events
+        return {index for index, other in enumerate(self.names) if other == name}
+
+    def get_event_problems(self, index: int) -> list:
+        """Returns the problems of an event.
+
+        Args:
+            index (int): The index of the event.
+
+        Returns:
+            list: The problems as tuples of the name of the pulse parameter (None for the event itself) and a message.
+        """
+        name = self.names[index]
+        if self.name_counts[name] > 1:
+            return [(None, f"Event name {name} is used more than once")] + self.event_problems[index]
+        return self.event_problems[index]
+
+    def get_problems(self) -> list:
+        """Returns all problems of the pulse sequence.
+
+        Returns:
+            list: The problems as tuples of the index of the event (None for the whole pulse sequence), the name of the pulse parameter (None for the event itself) and a message.
+        """
+        problems = [(None, None, message) for message in self.sequence_problems]
+        for index in range(len(self.event_problems)):
+            problems.extend(
+                (index, parameter, message)
+                for parameter, message in self.get_event_problems(index)
+            )
+        return problems
+
+    def count_problems(self) -> int:
+        """Returns the number of problems of the pulse sequence.
+
+        Returns:
+            int: The number of problems.
+        """
+        return len(self.sequence_problems) + self.duplicates + self.problem_count
+
+
+def validate_sequence(sequence: PulseSequence, max_duration: float = None) -> list:
+    """Checks all events of a pulse sequence.
+
+    Args:
+        sequence (PulseSequence): The pulse sequence.
+        max_duration (float, optional): The maximum duration of the pulse sequence in seconds. Defaults to None.
+
+    Returns:
+        list: The problems as tuples of the index of the event (None for the whole pulse sequence), the name of the pulse parameter (None for the event itself) and a message.
+    """
+    return SequenceValidator(sequence, max_duration).get_problems()
@@ -1,11 +1,12 @@
 """This module contains the view for the pulse programmer module. It is responsible for displaying the pulse sequence and the pulse parameter options."""
 
+import copy
 import logging
-import functools
-from PyQt6.QtGui import QValidator
+from PyQt6.QtGui import QValidator, QKeySequence
 from PyQt6.QtWidgets import (
     QFormLayout,
-    QTableWidget,
+    QTableView,
+    QHeaderView,
     QVBoxLayout,
     QPushButton,
     QHBoxLayout,
@@ -13,14 +14,24 @@ from PyQt6.QtWidgets import (
     QDialog,
     QLineEdit,
     QDialogButtonBox,
+    QFileDialog,
+    QProgressDialog,
     QWidget,
-    QToolButton,
     QSizePolicy,
+    QGroupBox,
+    QTableWidget,
+    QComboBox,
+    QCheckBox,
+    QSpinBox,
+    QDoubleSpinBox,
+    QToolTip,
 )
-from PyQt6.QtCore import pyqtSlot, pyqtSignal
+from PyQt6.QtCore import Qt, QEvent, QTimer, pyqtSlot
 from nqrduck.module.module_view import ModuleView
 from nqrduck.assets.icons import Logos
 from nqrduck.helpers.duckwidgets import DuckFloatEdit, DuckEdit
+from nqrduck.helpers.signalprocessing import SignalProcessing as sp
+from nqrduck.contrib.mplwidget import MplWidget
 
 from quackseq.pulseparameters import (
     BooleanOption,
@@ -28,6 +39,8 @@ from quackseq.pulseparameters import (
     FunctionOption,
     TableOption,
 )
+from quackseq.functions import Function
+from quackseq.helpers import UnitConverter
 from nqrduck.helpers.formbuilder import (
     DuckFormBuilder,
     DuckFormFunctionSelectionField,
@@ -36,13 +49,27 @@ from nqrduck.helpers.formbuilder import (
     DuckTableField,
 )
 
-from .visual_parameter import VisualParameter
+from .pulse_table import PulseTableModel, PulseTableDelegate
+from .timeline_widget import TimelineWidget
+from .sweep import SweepVariable
+from .instrumentation import instrumentation
+from .interning import get_function_key
+from .shape_cache import shape_cache
 
 logger = logging.getLogger(__name__)
 
 
 class PulseProgrammerView(ModuleView):
-    """View for the pulse programmer module."""
+    """View for the pulse programmer module.
+
+    Full changes of the pulse sequence are coalesced: the event lengths are rebuilt at most once per refresh interval, while the model is updated synchronously. Single events are updated right away.
+
+    Attributes:
+        REFRESH_INTERVAL (int): The default minimum time between two rebuilds of the event lengths in ms. 0 rebuilds them once control returns to the event loop.
+        refresh_interval (int): The minimum time between two rebuilds of the event lengths in ms.
+    """
+
+    REFRESH_INTERVAL = 0
 
     def __init__(self, module):
         """Initializes the pulse programmer view.
@@ -57,24 +84,215 @@ class PulseProgrammerView(ModuleView):
         self.setup_variabletables()
 
     def setup_variabletables(self) -> None:
-        """Setup the table for the variables."""
-        pass
+        """Setup the table for the variables of a parameter sweep.
+
+        Every row of the table is a sweep variable with the event, the varied value (the duration or a numeric option of a pulse parameter) and evenly spaced values from start to stop.
+        """
+        self.sweep_group = QGroupBox("Parameter sweep")
+        sweep_layout = QVBoxLayout()
+
+        self.sweep_table = QTableWidget(0, 5)
+        self.sweep_table.setHorizontalHeaderLabels(
+            ["Event", "Value", "Start", "Stop", "Steps"]
+        )
+        self.sweep_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+        self.sweep_table.setSizeAdjustPolicy(
+            QTableWidget.SizeAdjustPolicy.AdjustToContents
+        )
+        sweep_layout.addWidget(self.sweep_table)
+
+        button_layout = QHBoxLayout()
+        self.add_sweep_variable_button = QPushButton("Add variable")
+        self.add_sweep_variable_button.clicked.connect(self.on_add_sweep_variable)
+        button_layout.addWidget(self.add_sweep_variable_button)
+
+        self.remove_sweep_variable_button = QPushButton("Remove variable")
+        self.remove_sweep_variable_button.clicked.connect(
+            self.on_remove_sweep_variable
+        )
+        button_layout.addWidget(self.remove_sweep_variable_button)
+
+        self.sweep_parallel_checkbox = QCheckBox("Vary in parallel")
+        self.sweep_parallel_checkbox.setToolTip(
+            "Vary all variables together instead of generating all combinations"
+        )
+        button_layout.addWidget(self.sweep_parallel_checkbox)
+
+        self.sweep_format_combobox = QComboBox()
+        for extension in (
+            self.module.model.FILE_EXTENSION,
+            self.module.model.BINARY_FILE_EXTENSION,
+        ):
+            self.sweep_format_combobox.addItem(f".{extension}", extension)
+        button_layout.addWidget(self.sweep_format_combobox)
+
+        self.save_sweep_button = QPushButton("Save variants")
+        self.save_sweep_button.clicked.connect(self.on_save_sweep_button_clicked)
+        button_layout.addWidget(self.save_sweep_button)
+        button_layout.addStretch(1)
+        sweep_layout.addLayout(button_layout)
+
+        self.sweep_group.setLayout(sweep_layout)
+        self.layout().addWidget(self.sweep_group)
+
+    @pyqtSlot()
+    def on_add_sweep_variable(self) -> None:
+        """This method is called whenever the add variable button is clicked. It adds a row for a new sweep variable."""
+        row = self.sweep_table.rowCount()
+        self.sweep_table.insertRow(row)
+
+        event_combobox = QComboBox()
+        event_combobox.addItems(self.module.model.sequence.get_event_names())
+        value_combobox = QComboBox()
+        event_combobox.currentTextChanged.connect(
+            lambda event_name: self.update_sweep_values(value_combobox, event_name)
+        )
+        self.update_sweep_values(value_combobox, event_combobox.currentText())
+
+        start = QDoubleSpinBox()
+        stop = QDoubleSpinBox()
+        for spinbox in (start, stop):
+            spinbox.setDecimals(3)
+            spinbox.setRange(0, 1e9)
+        steps = QSpinBox()
+        steps.setRange(1, 100000)
+        steps.setValue(10)
+
+        for column, widget in enumerate(
+            (event_combobox, value_combobox, start, stop, steps)
+        ):
+            self.sweep_table.setCellWidget(row, column, widget)
+
+    def update_sweep_values(self, combobox: QComboBox, event_name: str) -> None:
+        """Fills a combobox with the values of an event that can be swept.
+
+        Args:
+            combobox (QComboBox): The combobox.
+            event_name (str): The name of the event.
+        """
+        combobox.clear()
+        combobox.addItem(SweepVariable.DURATION, (None, None))
+        event = self.module.model.get_event(event_name)
+        if event is None:
+            return
+        for parameter_name, parameter in event.parameters.items():
+            for option in parameter.options:
+                if isinstance(option, NumericOption):
+                    combobox.addItem(
+                        f"{parameter_name} / {option.name}", (parameter_name, option.name)
+                    )
+
+    @pyqtSlot()
+    def on_remove_sweep_variable(self) -> None:
+        """This method is called whenever the remove variable button is clicked. It removes the selected or the last sweep variable."""
+        row = self.sweep_table.currentRow()
+        if row < 0:
+            row = self.sweep_table.rowCount() - 1
+        if row >= 0:
+            self.sweep_table.removeRow(row)
+
+    def get_sweep_variables(self) -> list:
+        """Returns the sweep variables of the sweep table.
+
+        Returns:
+            list: The sweep variables.
+        """
+        variables = []
+        for row in range(self.sweep_table.rowCount()):
+            event_name = self.sweep_table.cellWidget(row, 0).currentText()
+            parameter, option = self.sweep_table.cellWidget(row, 1).currentData()
+            variables.append(
+                SweepVariable.linear(
+                    event_name,
+                    self.sweep_table.cellWidget(row, 2).value(),
+                    self.sweep_table.cellWidget(row, 3).value(),
+                    self.sweep_table.cellWidget(row, 4).value(),
+                    parameter=parameter,
+                    option=option,
+                )
+            )
+        return variables
+
+    @pyqtSlot()
+    def on_save_sweep_button_clicked(self) -> None:
+        """This method is called whenever the save variants button is clicked. It opens a dialog to select the directory of the variants."""
+        logger.debug("Save sweep button clicked")
+        variables = self.get_sweep_variables()
+        if not variables:
+            return
+        directory = QFileDialog.getExistingDirectory(
+            self, "Select directory for the variants"
+        )
+        if directory:
+            self.module.controller.save_sweep(
+                directory,
+                variables,
+                self.sweep_parallel_checkbox.isChecked(),
+                self.sweep_format_combobox.currentData(),
+            )
 
     def setup_pulsetable(self) -> None:
         """Setup the table for the pulse sequence. Also add buttons for saving and loading pulse sequences and editing and creation of events."""
         # Create pulse table
-        self.title = QLabel(f"Pulse Sequence: {self.module.model.pulse_sequence.name}")
+        self.title = QLabel(f"Pulse Sequence: {self.module.model.sequence.name}")
         # Make title bold
         font = self.title.font()
         font.setBold(True)
         self.title.setFont(font)
 
+        # Label for the validation problems of the pulse sequence
+        self.problems_label = QLabel()
+        self.problems_label.setStyleSheet("color: rgb(200, 30, 30)")
+        self.problems_label.setWordWrap(True)
+
         # Table setup
-        self.pulse_table = QTableWidget(self)
+        self.pulse_table = QTableView(self)
         self.pulse_table.setSizeAdjustPolicy(
-            QTableWidget.SizeAdjustPolicy.AdjustToContents
+            QTableView.SizeAdjustPolicy.AdjustToContents
         )
         self.pulse_table.setAlternatingRowColors(True)
+        # Cells can be selected to edit a pulse parameter of several events at once
+        self.pulse_table.setSelectionMode(
+            QTableView.SelectionMode.ExtendedSelection
+        )
+        self.pulse_table.setSelectionBehavior(
+            QTableView.SelectionBehavior.SelectItems
+        )
+        self.pulse_table_model = PulseTableModel(self.module.model, self)
+        self.pulse_table.setModel(self.pulse_table_model)
+        self.pulse_table_delegate = PulseTableDelegate(self)
+        # The structure and the dialog of every pulse parameter, see get_parameter_dialog
+        self.parameter_dialogs = {}
+        self.pulse_table.setItemDelegate(self.pulse_table_delegate)
+        # All cells have the same size, so the sections do not need to be measured
+        cell_size = self.pulse_table_delegate.CELL_SIZE
+        self.pulse_table.horizontalHeader().setDefaultSectionSize(cell_size.width())
+        self.pulse_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Fixed
+        )
+        self.pulse_table.verticalHeader().setDefaultSectionSize(cell_size.height())
+        self.pulse_table.verticalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Fixed
+        )
+
+        self.pulse_table_delegate.parameter_clicked.connect(
+            self.on_table_button_clicked
+        )
+        self.pulse_table_delegate.edit_event.connect(self.on_edit_event)
+        self.pulse_table.selectionModel().selectionChanged.connect(
+            self.on_selection_changed
+        )
+        # Resetting the table model clears the selection without a signal
+        self.pulse_table_model.modelReset.connect(self.on_selection_changed)
+        self.pulse_table_delegate.delete_event.connect(self.on_delete_event)
+        self.pulse_table_delegate.move_event_left.connect(
+            self.module.controller.on_move_event_left
+        )
+        self.pulse_table_delegate.move_event_right.connect(
+            self.module.controller.on_move_event_right
+        )
         layout = QVBoxLayout()
         button_layout = QHBoxLayout()
         table_layout = QHBoxLayout()
@@ -89,6 +307,23 @@ class PulseProgrammerView(ModuleView):
         self.new_event_button.clicked.connect(self.on_new_event_button_clicked)
         button_layout.addWidget(self.new_event_button)
 
+        # Add button for repeat blocks
+        self.repeat_button = QPushButton("Repeat events")
+        self.repeat_button.setToolTip(
+            "Play a range of events several times without duplicating them"
+        )
+        self.repeat_button.clicked.connect(self.on_repeat_button_clicked)
+        button_layout.addWidget(self.repeat_button)
+
+        # Add button for editing the selected pulse parameters
+        self.edit_selected_button = QPushButton("Edit selected")
+        self.edit_selected_button.setToolTip(
+            "Set the options of the selected pulse parameter cells at once. Cells are selected by dragging or clicking with Ctrl or Shift."
+        )
+        self.edit_selected_button.setEnabled(False)
+        self.edit_selected_button.clicked.connect(self.on_edit_selected_button_clicked)
+        button_layout.addWidget(self.edit_selected_button)
+
         # Add button for save pulse sequence
         self.save_pulse_sequence_button = QPushButton("Save pulse sequence")
         self.save_pulse_sequence_button.setSizePolicy(
@@ -110,31 +345,102 @@ class PulseProgrammerView(ModuleView):
         self.load_pulse_sequence_button.clicked.connect(self.on_load_button_clicked)
         button_layout.addWidget(self.load_pulse_sequence_button)
 
+        # Add buttons for undo and redo
+        self.undo_button = QPushButton("Undo")
+        self.undo_button.setShortcut(QKeySequence.StandardKey.Undo)
+        self.undo_button.clicked.connect(self.module.controller.undo)
+        button_layout.addWidget(self.undo_button)
+
+        self.redo_button = QPushButton("Redo")
+        self.redo_button.setShortcut(QKeySequence.StandardKey.Redo)
+        self.redo_button.clicked.connect(self.module.controller.redo)
+        button_layout.addWidget(self.redo_button)
+
+        self.refresh_interval = self.REFRESH_INTERVAL
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self.on_events_changed)
+
         # Connect signals
-        self.module.model.events_changed.connect(self.on_events_changed)
+        self.module.model.events_changed.connect(self.schedule_refresh)
         self.module.model.pulse_sequence_changed.connect(self.on_pulse_sequence_changed)
+        self.module.model.event_inserted.connect(self.on_event_inserted)
+        self.module.model.event_removed.connect(self.on_event_removed)
+        self.module.model.event_moved.connect(self.on_event_moved)
+        self.module.model.event_renamed.connect(self.on_event_renamed)
+        self.module.model.event_duration_changed.connect(
+            self.on_event_duration_changed
+        )
+        self.module.model.undo_stack_changed.connect(self.on_undo_stack_changed)
+        self.module.model.problems_changed.connect(self.on_problems_changed)
+        self.module.model.repeat_blocks_changed.connect(self.update_total_duration)
+        self.module.controller.sequence_io_started.connect(self.on_sequence_io_started)
+        self.module.controller.sequence_io_progress.connect(
+            self.on_sequence_io_progress
+        )
+        self.module.controller.sequence_io_finished.connect(
+            self.on_sequence_io_finished
+        )
+        self.sequence_io_dialog = None
 
         button_layout.addStretch(1)
         layout.addWidget(self.title)
+        layout.addWidget(self.problems_label)
         layout.addLayout(button_layout)
         layout.addLayout(table_layout)
+
+        # Add timeline of the whole pulse sequence
+        self.timeline = TimelineWidget(self.module.model, self)
+        layout.addWidget(self.timeline)
         layout.addStretch(1)
 
         self.setLayout(layout)
 
         # Add layout for the event lengths
-        self.event_widget = QWidget()
+        self.event_widget = EventLengthsWidget(self)
+        self.event_layout = QVBoxLayout()
+        self.event_widget.setLayout(self.event_layout)
         self.layout().addWidget(self.event_widget)
 
         self.on_events_changed()
+        self.on_undo_stack_changed()
+        self.on_problems_changed()
 
     @pyqtSlot()
     def on_pulse_sequence_changed(self) -> None:
         """This method is called whenever the pulse sequence changes. It updates the view to reflect the changes."""
         logger.debug(
-            "Updating pulse sequence to %s", self.module.model.pulse_sequence.name
+            "Updating pulse sequence to %s", self.module.model.sequence.name
         )
-        self.title.setText(f"Pulse Sequence: {self.module.model.pulse_sequence.name}")
+        self.title.setText(f"Pulse Sequence: {self.module.model.sequence.name}")
+
+    @pyqtSlot()
+    def on_undo_stack_changed(self) -> None:
+        """This method is called whenever the undo stack changes. It enables the undo and redo buttons if there is something to undo or redo."""
+        undo_stack = self.module.model.undo_stack
+        self.undo_button.setEnabled(undo_stack.can_undo())
+        self.redo_button.setEnabled(undo_stack.can_redo())
+
+    @pyqtSlot(int)
+    @instrumentation.timed("view.on_problems_changed")
+    def on_problems_changed(self, index: int = -1) -> None:
+        """This method is called whenever the validation problems change. It shows the number of problems and the problems of the whole pulse sequence.
+
+        The problems of single events are marked in the pulse table.
+
+        Args:
+            index (int, optional): The index of the event whose problems changed or -1. Defaults to -1.
+        """
+        validator = self.module.model.validator
+        count = validator.count_problems()
+        if not count:
+            self.problems_label.clear()
+            self.problems_label.hide()
+            return
+        lines = [f"{count} problem(s) found"]
+        lines.extend(validator.sequence_problems)
+        self.problems_label.setText("\n".join(lines))
+        self.problems_label.show()
 
     @pyqtSlot()
     def on_new_event_button_clicked(self) -> None:
@@ -152,118 +458,231 @@ class PulseProgrammerView(ModuleView):
             self.module.model.add_event(event_name, duration)
 
     @pyqtSlot()
+    def on_repeat_button_clicked(self) -> None:
+        """This method is called whenever the repeat events button is clicked. It opens a dialog to repeat a range of events."""
+        logger.debug("Repeat events button clicked")
+        event_names = self.module.model.sequence.get_event_names()
+        if not event_names:
+            return
+        dialog = RepeatBlockDialog(event_names, self)
+        if dialog.exec():
+            self.module.controller.set_repeat_block(*dialog.get_repeat_block())
+
+    @pyqtSlot()
+    def schedule_refresh(self) -> None:
+        """This method is called whenever the events in the pulse sequence change. It schedules a rebuild of the event lengths, so a burst of changes only rebuilds them once."""
+        instrumentation.count("view.scheduled_refreshes")
+        # A running timer is not restarted, so continuous changes still refresh once per interval
+        if not self.refresh_timer.isActive():
+            self.refresh_timer.start(self.refresh_interval)
+
+    def is_refresh_pending(self) -> bool:
+        """Checks if the event lengths are rebuilt soon, in which case they do not need to be updated for single events.
+
+        Returns:
+            bool: True if a rebuild of the event lengths is scheduled.
+        """
+        return self.refresh_timer.isActive()
+
+    @pyqtSlot()
+    @instrumentation.timed("view.on_events_changed")
     def on_events_changed(self) -> None:
-        """This method is called whenever the events in the pulse sequence change. It updates the view to reflect the changes."""
+        """Rebuilds the event lengths to reflect the changes of the pulse sequence.
+
+        The pulse table itself is updated by the pulse table model.
+        """
+        logger.debug("Updating events to %s", self.module.model.sequence.events)
+        self.refresh_timer.stop()
+
+        # The first widget of the event layout is the "Event lengths" label
+        if not self.event_layout.count():
+            self.event_layout.addWidget(QLabel("Event lengths:"))
+
+        # The existing labels are reused, only surplus labels are deleted
+        events = self.module.model.sequence.events
+        while self.event_layout.count() > len(events) + 1:
+            self.event_layout.takeAt(self.event_layout.count() - 1).widget().deleteLater()
+        for index, event in enumerate(events):
+            text = self.get_event_length_text(event)
+            item = self.event_layout.itemAt(index + 1)
+            if item is None:
+                self.event_layout.addWidget(QLabel(text))
+            elif item.widget().text() != text:
+                item.widget().setText(text)
+        self.update_total_duration()
+
+        self.on_problems_changed()
+        if instrumentation.enabled:
+            instrumentation.set_gauge("view.widgets", len(self.findChildren(QWidget)))
+
+    @pyqtSlot(int)
+    @instrumentation.timed("view.on_event_inserted")
+    def on_event_inserted(self, index: int) -> None:
+        """This method is called whenever an event is added to the pulse sequence. Only the length label of the new event is created.
 
-        pulse_parameter_options = (
-            self.module.model.pulse_sequence.pulse_parameter_options
+        Args:
+            index (int): The index of the new event.
+        """
+        if self.is_refresh_pending():
+            return
+        event = self.module.model.sequence.events[index]
+        # The first widget of the event layout is the "Event lengths" label
+        self.event_layout.insertWidget(
+            index + 1, QLabel(self.get_event_length_text(event))
         )
+        self.update_total_duration()
 
-        logger.debug(
-            "Updating pulse parameter options to %s",
-            pulse_parameter_options.keys(),
-        )
-        # We set it to the length of the pulse parameter options + 1 because we want to add a row for the parameter option buttons
-        self.pulse_table.setRowCount(len(pulse_parameter_options) + 1)
-        # Move the vertical header labels on row down
-        pulse_options = [""]
-        pulse_options.extend(list(pulse_parameter_options.keys()))
-        self.pulse_table.setVerticalHeaderLabels(pulse_options)
-
-        logger.debug("Updating events to %s", self.module.model.pulse_sequence.events)
-
-        # Add label for the event lengths
-        event_layout = QVBoxLayout()
-        event_parameters_label = QLabel("Event lengths:")
-        event_layout.addWidget(event_parameters_label)
-
-        for event in self.module.model.pulse_sequence.events:
-            logger.debug("Adding event to pulseprogrammer view: %s", event.name)
-            # Create a label for the event
-            event_label = QLabel(f"{event.name} : {event.duration * 1e6:.16g} µs")
-            event_layout.addWidget(event_label)
-
-        # Delete the old widget and create a new one
-        self.event_widget.deleteLater()
-        self.event_widget = QWidget()
-        self.event_widget.setLayout(event_layout)
-        self.layout().addWidget(self.event_widget)
+    @pyqtSlot(int)
+    @instrumentation.timed("view.on_event_removed")
+    def on_event_removed(self, index: int) -> None:
+        """This method is called whenever an event is deleted from the pulse sequence. Only the length label of the event is removed.
+
+        Args:
+            index (int): The former index of the deleted event.
+        """
+        if self.is_refresh_pending():
+            return
+        self.event_layout.takeAt(index + 1).widget().deleteLater()
+        self.update_total_duration()
+
+    @pyqtSlot(int, int)
+    @instrumentation.timed("view.on_event_moved")
+    def on_event_moved(self, old_index: int, new_index: int) -> None:
+        """This method is called whenever an event is moved. Only the length labels between the old and the new position are updated.
+
+        Args:
+            old_index (int): The old index of the event.
+            new_index (int): The new index of the event.
+        """
+        if self.is_refresh_pending():
+            return
+        for index in range(min(old_index, new_index), max(old_index, new_index) + 1):
+            self.update_event_length(index)
 
-        self.pulse_table.setColumnCount(len(self.module.model.pulse_sequence.events))
-        self.pulse_table.setHorizontalHeaderLabels(
-            [event.name for event in self.module.model.pulse_sequence.events]
+    @pyqtSlot(int)
+    @instrumentation.timed("view.on_event_renamed")
+    def on_event_renamed(self, index: int) -> None:
+        """This method is called whenever an event is renamed. Only the length label of the event is updated.
+
+        Args:
+            index (int): The index of the renamed event.
+        """
+        if self.is_refresh_pending():
+            return
+        self.update_event_length(index)
+
+    @pyqtSlot(int)
+    @instrumentation.timed("view.on_event_duration_changed")
+    def on_event_duration_changed(self, index: int) -> None:
+        """This method is called whenever the duration of an event changes. Only the length label of the event is updated.
+
+        Args:
+            index (int): The index of the event.
+        """
+        if self.is_refresh_pending():
+            return
+        self.update_event_length(index)
+        self.update_total_duration()
+
+    @pyqtSlot()
+    def update_total_duration(self) -> None:
+        """Shows the total duration of the pulse sequence from the timing index of the model."""
+        duration = self.module.model.timing.duration
+        self.event_layout.itemAt(0).widget().setText(
+            f"Event lengths (total {duration * 1e6:.12g} µs):"
         )
 
-        self.set_parameter_icons()
+    def get_event_length_tooltip(self, label: QLabel) -> str:
+        """Returns the tool tip of an event length label with the start time of the event.
+
+        Args:
+            label (QLabel): The event length label.
+
+        Returns:
+            str: The start time of the event.
+        """
+        index = self.event_layout.indexOf(label) - 1
+        start = self.module.model.timing.get_start_time(index)
+        return f"Starts at {start * 1e6:.12g} µs"
+
+    def update_event_length(self, index: int) -> None:
+        """Updates the length label of a single event.
 
-    def set_parameter_icons(self) -> None:
-        """This method sets the icons for the pulse parameter options."""
-        pulse_parrameter_options = (
-            self.module.model.pulse_sequence.pulse_parameter_options
+        Args:
+            index (int): The index of the event.
+        """
+        event = self.module.model.sequence.events[index]
+        self.event_layout.itemAt(index + 1).widget().setText(
+            self.get_event_length_text(event)
         )
 
-        for column_idx, event in enumerate(self.module.model.pulse_sequence.events):
-            for row_idx, parameter in enumerate(pulse_parrameter_options.keys()):
-                if row_idx == 0:
-                    event_options_widget = EventOptionsWidget(event)
-                    # Connect the delete_event signal to the on_delete_event slot
-                    func = functools.partial(
-                        self.module.controller.delete_event, event_name=event.name
-                    )
-                    event_options_widget.delete_event.connect(func)
-                    # Connect the change_event_duration signal to the on_change_event_duration slot
-                    event_options_widget.change_event_duration.connect(
-                        self.module.controller.change_event_duration
-                    )
-                    # Connect the change_event_name signal to the on_change_event_name slot
-                    event_options_widget.change_event_name.connect(
-                        self.module.controller.change_event_name
-                    )
-                    # Connect the move_event_left signal to the on_move_event_left slot
-                    event_options_widget.move_event_left.connect(
-                        self.module.controller.on_move_event_left
-                    )
-                    # Connect the move_event_right signal to the on_move_event_right slot
-                    event_options_widget.move_event_right.connect(
-                        self.module.controller.on_move_event_right
-                    )
+    def get_event_length_text(self, event) -> str:
+        """Returns the text that is displayed for an event in the event lengths list.
 
-                    self.pulse_table.setCellWidget(
-                        row_idx, column_idx, event_options_widget
-                    )
-                    self.pulse_table.setRowHeight(
-                        row_idx, event_options_widget.layout().sizeHint().height()
-                    )
+        Args:
+            event (Event): The event.
 
-                logger.debug(
-                    "Adding button for event %s and parameter %s", event, parameter
-                )
-                logger.debug("Parameter object id: %s", id(event.parameters[parameter]))
-                button = QPushButton()
-
-                icon = VisualParameter(event.parameters[parameter]).get_pixmap()
-                logger.debug("Icon size: %s", icon.availableSizes())
-                button.setIcon(icon)
-                button.setIconSize(icon.availableSizes()[0])
-                button.setFixedSize(icon.availableSizes()[0])
-
-                # We add 1 to the row index because the first row is used for the event options
-                self.pulse_table.setCellWidget(row_idx + 1, column_idx, button)
-                self.pulse_table.setRowHeight(
-                    row_idx + 1, icon.availableSizes()[0].height()
-                )
-                self.pulse_table.setColumnWidth(
-                    column_idx, icon.availableSizes()[0].width()
-                )
+        Returns:
+            str: The name and the duration of the event.
+        """
+        return f"{event.name} : {event.duration * 1e6:.16g} µs"
 
-                # Connect the button to the on_button_clicked slot
-                func = functools.partial(
-                    self.on_table_button_clicked, event=event, parameter=parameter
-                )
-                button.clicked.connect(func)
+    @pyqtSlot(object)
+    def on_edit_event(self, event) -> None:
+        """This method is called when the edit control of an event is clicked. It opens a dialog that allows the user to change the event name and duration.
 
-    @pyqtSlot()
-    def on_table_button_clicked(self, event, parameter) -> None:
+        Args:
+            event (Event): The event that should be edited.
+        """
+        logger.debug("Edit button clicked for event %s", event.name)
+        dialog = EditEventDialog(event, self)
+        result = dialog.exec()
+        if result:
+            logger.debug("Editing event %s", event.name)
+            name = dialog.get_name()
+            duration = dialog.get_duration()
+            # The duration in µs is converted like in the controller, so unchanged durations are not recorded
+            try:
+                duration_changed = UnitConverter.to_float(duration + "u") != event.duration
+            except ValueError:
+                # The controller reports the invalid duration
+                duration_changed = True
+            # Name and duration are changed with a single refresh of the view
+            with self.module.model.batch():
+                if name != event.name:
+                    self.module.controller.change_event_name(event.name, name)
+                if duration_changed:
+                    self.module.controller.change_event_duration(event.name, duration)
+
+    @pyqtSlot(object)
+    def on_delete_event(self, event) -> None:
+        """This method is called when the delete control of an event is clicked.
+
+        It creates a dialog that asks the user if they are sure they want to delete the event.
+
+        Args:
+            event (Event): The event that should be deleted.
+        """
+        # Create an 'are you sure' dialog
+        logger.debug("Delete button clicked")
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Delete event")
+        layout = QVBoxLayout()
+        label = QLabel(f"Are you sure you want to delete event {event.name}?")
+        layout.addWidget(label)
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Yes | QDialogButtonBox.StandardButton.No
+        )
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addWidget(buttons)
+        dialog.setLayout(layout)
+        result = dialog.exec()
+        if result:
+            self.module.controller.delete_event(event.name)
+
+    @pyqtSlot(object, str)
+    def on_table_button_clicked(self, event, parameter: str) -> None:
         """This method is called whenever a button in the pulse table is clicked.
 
         It opens a dialog to set the options for the parameter.
@@ -273,17 +692,230 @@ class PulseProgrammerView(ModuleView):
             parameter (str): The name of the parameter for which the options should be set.
         """
         logger.debug("Button for event %s and parameter %s clicked", event, parameter)
-        # We assume the pulse sequence was updated
-        self.module.model.pulse_sequence.update_options()
+        self.edit_parameter([event], parameter)
+
+    def get_selected_parameters(self) -> dict:
+        """Returns the selected pulse parameter cells of the pulse table.
+
+        Returns:
+            dict: The selected events in the order of the pulse sequence by pulse parameter name. The controls of the events are ignored.
+        """
+        selected = {}
+        indexes = sorted(
+            self.pulse_table.selectionModel().selectedIndexes(),
+            key=lambda index: (index.row(), index.column()),
+        )
+        for index in indexes:
+            if index.row() == 0:
+                continue
+            parameter = index.data(PulseTableModel.PARAMETER_ROLE)
+            selected.setdefault(parameter, []).append(
+                index.data(PulseTableModel.EVENT_ROLE)
+            )
+        return selected
+
+    @pyqtSlot()
+    def on_selection_changed(self) -> None:
+        """Enables the edit selected button if pulse parameter cells are selected."""
+        self.edit_selected_button.setEnabled(bool(self.get_selected_parameters()))
+
+    @pyqtSlot()
+    def on_edit_selected_button_clicked(self) -> None:
+        """Opens a dialog for every selected pulse parameter and applies its values to all selected events of the parameter.
+
+        No further dialogs are opened once a dialog is cancelled.
+        """
+        for parameter, events in self.get_selected_parameters().items():
+            logger.debug("Editing parameter %s of %s events", parameter, len(events))
+            if not self.edit_parameter(events, parameter):
+                break
+
+    def edit_parameter(self, events: list, parameter: str) -> bool:
+        """Opens a dialog to set the options of a pulse parameter of one or more events.
+
+        The dialog shows the options of the first event. The values are applied to all events with a single notification and in a single undo step.
+
+        Args:
+            events (list): The events for which the parameter options should be set.
+            parameter (str): The name of the parameter for which the options should be set.
+
+        Returns:
+            bool: True if the dialog was accepted.
+        """
+        event = events[0]
+        # The options are only updated if the pulse sequence changed since the last dialog
+        self.module.model.update_options()
+        # The dialog may change the options of the pulse parameter in place
+        pulse_parameter = self.module.model.detach_parameter(event.name, parameter)
+
+        with instrumentation.measure("view.parameter_dialog"):
+            dialog = self.get_parameter_dialog(event, parameter, pulse_parameter)
+        if len(events) > 1:
+            dialog.setWindowTitle(f"{parameter} ({len(events)} events)")
+        else:
+            dialog.setWindowTitle("Options")
+
+        result = dialog.exec()
+
+        if result:
+            # The dialog is reused, so the pulse sequence gets copies of its functions
+            values = [
+                copy.deepcopy(value) if isinstance(value, Function) else value
+                for value in dialog.get_values()
+            ]
+            if len(events) == 1:
+                self.module.model.set_parameter_values(event.name, parameter, values)
+            else:
+                self.module.model.set_parameter_values_of_events(
+                    [event.name for event in events], parameter, values
+                )
+        else:
+            self.module.model.intern_parameter(event.name, parameter)
+        return bool(result)
+
+    def get_parameter_dialog(self, event, parameter: str, pulse_parameter) -> DuckFormBuilder:
+        """Returns the dialog to set the options of a pulse parameter.
+
+        The dialogs are cached by pulse parameter name and bound to the options of the clicked event, so repeated clicks reuse the fields. A new dialog is created if the options of the pulse parameter have another structure, e.g. another number of phase cycles.
+
+        Args:
+            event (PulseSequence.Event): The event of the pulse parameter.
+            parameter (str): The name of the pulse parameter.
+            pulse_parameter (PulseParameter): The private pulse parameter of the event.
+
+        Returns:
+            DuckFormBuilder: The dialog with a field for every option.
+        """
+        structure = self.get_option_structure(pulse_parameter.options)
+        cached = self.parameter_dialogs.get(parameter)
+        if cached is not None and cached[0] == structure:
+            instrumentation.count("view.parameter_dialog_reuses")
+            dialog = cached[1]
+            self.bind_parameter_dialog(dialog, event, pulse_parameter)
+            return dialog
+
+        if cached is not None:
+            cached[1].deleteLater()
+        dialog = self.create_parameter_dialog(event, parameter, pulse_parameter)
+        self.parameter_dialogs[parameter] = (structure, dialog)
+        return dialog
+
+    def get_option_structure(self, options: list) -> tuple:
+        """Returns the structure of the fields of a dialog for a list of options.
+
+        Args:
+            options (list): The options of a pulse parameter or of a column of a table option.
+
+        Returns:
+            tuple: The class, the name and the field settings of every option. Table options contain the structure of their columns.
+        """
+        structure = []
+        for option in options:
+            if isinstance(option, TableOption):
+                settings = tuple(
+                    (column.name, self.get_option_structure(column.options))
+                    for column in option.columns
+                )
+            elif isinstance(option, NumericOption):
+                settings = (option.min_value, option.max_value, option.slider)
+            elif isinstance(option, FunctionOption):
+                settings = tuple(function.name for function in option.functions)
+            else:
+                settings = None
+            structure.append((type(option), option.name, settings))
+        return tuple(structure)
+
+    def bind_parameter_dialog(self, dialog: DuckFormBuilder, event, pulse_parameter) -> None:
+        """Sets the fields of a cached dialog to the options of a pulse parameter of an event.
+
+        Args:
+            dialog (DuckFormBuilder): The dialog that was created for a pulse parameter with the same structure.
+            event (PulseSequence.Event): The event of the pulse parameter.
+            pulse_parameter (PulseParameter): The private pulse parameter of the event.
+        """
+        for field, option in zip(dialog.fields, pulse_parameter.options):
+            if isinstance(option, TableOption):
+                for fields, column in zip(field.fields.values(), option.columns):
+                    for row_field, row in zip(fields, column.options):
+                        self.bind_field(row_field, row, event)
+            else:
+                self.bind_field(field, option, event)
+
+    def bind_field(self, field, option, event) -> None:
+        """Sets a field of a cached dialog to the value of an option.
+
+        Function fields only plot the function again if the function or the duration of the event differs from the plotted one.
+
+        Args:
+            field (DuckFormField): The field that was created for the option by get_field_for_option.
+            option (Option): The option.
+            event (PulseSequence.Event): The event of the option.
+        """
+        if isinstance(option, BooleanOption):
+            field.widget.setChecked(option.value)
+        elif isinstance(option, NumericOption):
+            field.widget.set_value(option.value)
+        elif isinstance(option, FunctionOption):
+            functions, index = self.get_dialog_functions(option)
+            duration = float(event.duration)
+            if field.duration == duration and get_function_key(
+                field.selected_function
+            ) == get_function_key(functions[index]):
+                # The plots and parameter fields are bound to the plotted function
+                functions[index] = field.selected_function
+                field.functions = functions
+            else:
+                field.functions = functions
+                field.selected_function = functions[index]
+                field.duration = duration
+                field.update_active_function()
+            # Changes of the advanced settings are only applied by the replot button
+            field.resolution_lineedit.setText(str(field.selected_function.resolution))
+            field.start_x_lineedit.setText(str(field.selected_function.start_x))
+            field.end_x_lineedit.setText(str(field.selected_function.end_x))
+            field.expr_lineedit.setText(str(field.selected_function.expr))
+
+    @staticmethod
+    def get_dialog_functions(option) -> tuple:
+        """Returns copies of the functions of a function option for a dialog, in which the function of the class of the selected function is the selected function.
+
+        The dialogs are reused for other events and change their functions in place, so they must not share functions with the pulse sequence.
+
+        Args:
+            option (FunctionOption): The function option.
+
+        Returns:
+            tuple: The functions and the index of the selected function.
+        """
+        functions = copy.deepcopy(option.functions)
+        # When loading a pulse sequence, the instance of the objects will be different
+        # Therefore we need to operate on the classes
+        for index, function in enumerate(functions):
+            if function.__class__.__name__ == option.value.__class__.__name__:
+                functions[index] = copy.deepcopy(option.value)
+                return functions, index
+        functions.append(copy.deepcopy(option.value))
+        return functions, len(functions) - 1
+
+    def create_parameter_dialog(self, event, parameter: str, pulse_parameter) -> DuckFormBuilder:
+        """Creates the dialog to set the options of a pulse parameter.
+
+        Args:
+            event (PulseSequence.Event): The event of the pulse parameter.
+            parameter (str): The name of the pulse parameter.
+            pulse_parameter (PulseParameter): The private pulse parameter of the event, whose options may be changed by the dialog.
 
+        Returns:
+            DuckFormBuilder: The dialog with a field for every option.
+        """
         # Create a QDialog to set the options for the parameter.
         description = f"Set options for {parameter}"
         dialog = DuckFormBuilder(parameter, description=description, parent=self)
 
         # Adding fields for the options
         form_options = []
-        for option in event.parameters[parameter].options:
-            logger.debug(f"Option value is {option.value}")
+        for option in pulse_parameter.options:
+            logger.debug("Option value is %s", option.value)
             if isinstance(option, TableOption):
                 # Every option is it's own column. Every column has a dedicated number of rows.
                 # Get the option name:
@@ -300,7 +932,7 @@ class PulseProgrammerView(ModuleView):
 
                     name = column.name
 
-                    logger.debug(f"Adding column {name} with fields {fields}")
+                    logger.debug("Adding column %s with fields %s", name, fields)
                     table.add_column(option=column, fields=fields)
 
                 form_options.append(table)
@@ -311,17 +943,7 @@ class PulseProgrammerView(ModuleView):
                 form_options.append(field)
                 dialog.add_field(field)
 
-        result = dialog.exec()
-
-        options = event.parameters[parameter].options
-
-        if result:
-            values = dialog.get_values()
-            for i, value in enumerate(values):
-                logger.debug(f"Setting value {value} for option {options[i]}")
-                options[i].set_value(value)
-
-            self.set_parameter_icons()
+        return dialog
 
     def get_field_for_option(self, option, event):
         """Returns the field for the given option.
@@ -333,7 +955,7 @@ class PulseProgrammerView(ModuleView):
         Returns:
             DuckFormField: The field for the option
         """
-        logger.debug(f"Creating field with value {option.value}")
+        logger.debug("Creating field with value %s", option.value)
         if isinstance(option, BooleanOption):
             field = DuckFormCheckboxField(
                 option.name, tooltip=None, default=option.value
@@ -358,32 +980,29 @@ class PulseProgrammerView(ModuleView):
             )
 
         elif isinstance(option, FunctionOption):
-            logger.debug(f"Functions: {option.functions}")
-
-            # When loading a pulse sequence, the instance of the objects will be different
-            # Therefore we need to operate on the classes
-            for function in option.functions:
-                if function.__class__.__name__ == option.value.__class__.__name__:
-                    default_function = function
+            logger.debug("Functions: %s", option.functions)
+            functions, index = self.get_dialog_functions(option)
 
-            index = option.functions.index(default_function)
-
-            field = DuckFormFunctionSelectionField(
+            field = CachedFunctionSelectionField(
                 option.name,
                 tooltip=None,
-                functions=option.functions,
+                functions=functions,
                 duration=event.duration,
                 default_function=index,
             )
 
-        logger.debug(f"Returning Field: {field}")
+        logger.debug("Returning Field: %s", field)
         return field
 
     @pyqtSlot()
     def on_save_button_clicked(self) -> None:
         """This method is called whenever the save button is clicked. It opens a dialog to select a file to save the pulse sequence to."""
         logger.debug("Save button clicked")
-        file_manager = self.FileManager(self.module.model.FILE_EXTENSION, parent=self)
+        file_manager = SequenceFileManager(
+            self.module.model.FILE_EXTENSION,
+            self.module.model.BINARY_FILE_EXTENSION,
+            parent=self,
+        )
         file_name = file_manager.saveFileDialog()
         if file_name:
             self.module.controller.save_pulse_sequence(file_name)
@@ -392,175 +1011,301 @@ class PulseProgrammerView(ModuleView):
     def on_load_button_clicked(self) -> None:
         """This method is called whenever the load button is clicked. It opens a dialog to select a file to load the pulse sequence from."""
         logger.debug("Load button clicked")
-        file_manager = self.FileManager(self.module.model.FILE_EXTENSION, parent=self)
+        file_manager = SequenceFileManager(
+            self.module.model.FILE_EXTENSION,
+            self.module.model.BINARY_FILE_EXTENSION,
+            parent=self,
+        )
         file_name = file_manager.loadFileDialog()
         if file_name:
-            try:
-                self.module.controller.load_pulse_sequence(file_name)
-            except KeyError:
-                self.module.nqrduck_signal.emit(
-                    "notification",
-                    [
-                        "Error",
-                        "Error loading pulse sequence -  maybe the version of the pulse sequence is not compatible?",
-                    ],
-                )
+            self.module.controller.load_pulse_sequence(file_name)
+
+    @pyqtSlot(str)
+    def on_sequence_io_started(self, description: str) -> None:
+        """This method is called when a pulse sequence is saved or loaded in the background.
+
+        The pulse programmer is disabled until the operation is complete and a cancellable progress dialog is shown for longer operations.
 
+        Args:
+            description (str): The description of the operation.
+        """
+        self.setEnabled(False)
+        self.sequence_io_dialog = QProgressDialog(description, "Cancel", 0, 100, self)
+        self.sequence_io_dialog.setWindowTitle("Pulse sequence")
+        self.sequence_io_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.sequence_io_dialog.canceled.connect(
+            self.module.controller.cancel_sequence_io
+        )
 
-class EventOptionsWidget(QWidget):
-    """This class is a widget that can be used to set the options for a pulse parameter.
+    @pyqtSlot(int, int)
+    def on_sequence_io_progress(self, done: int, total: int) -> None:
+        """This method is called with the progress of the running save or load operation.
 
-    This widget is then added to the the first row of the according event column in the pulse table.
-    It has a edit button that opens a dialog that allows the user to change the options for the event (name and duration).
-    Furthermore it has a delete button that deletes the event from the pulse sequence.
+        Args:
+            done (int): The number of processed events.
+            total (int): The total number of events.
+        """
+        if self.sequence_io_dialog is not None:
+            self.sequence_io_dialog.setValue(done * 100 // total if total else 100)
 
-    Signals:
-        delete_event: Emitted when the delete button is clicked.
-        change_event_duration: Emitted when the duration of the event is changed.
-        change_event_name: Emitted when the name of the event is changed.
-        move_event_left: Emitted when the move left button is clicked.
-        move_event_right: Emitted when the move right button is clicked.
+    @pyqtSlot()
+    def on_sequence_io_finished(self) -> None:
+        """This method is called when the running save or load operation is complete, failed or was cancelled."""
+        if self.sequence_io_dialog is not None:
+            self.sequence_io_dialog.canceled.disconnect()
+            self.sequence_io_dialog.close()
+            self.sequence_io_dialog.deleteLater()
+            self.sequence_io_dialog = None
+        self.setEnabled(True)
+
+
+class SequenceFileManager(ModuleView.FileManager):
+    """File manager for pulse sequences that offers the JSON and the binary format.
+
+    Args:
+        extension (str): The extension of the JSON format.
+        binary_extension (str): The extension of the binary format.
+        parent (QWidget): The parent widget of the file dialog.
     """
 
-    delete_event = pyqtSignal(str)
-    change_event_duration = pyqtSignal(str, str)
-    change_event_name = pyqtSignal(str, str)
-    move_event_left = pyqtSignal(str)
-    move_event_right = pyqtSignal(str)
+    def __init__(self, extension, binary_extension, parent=None):
+        """Initializes the SequenceFileManager."""
+        super().__init__(extension, parent=parent)
+        self.binary_extension = binary_extension
+        self.filters = {
+            f"{extension.upper()} Files (*.{extension})": extension,
+            f"{binary_extension.upper()} Binary Files (*.{binary_extension})": binary_extension,
+        }
 
-    def __init__(self, event):
-        """Initializes the EventOptionsWidget."""
-        super().__init__()
-        self.event = event
+    def loadFileDialog(self) -> str:
+        """Opens a file dialog for the user to select a pulse sequence in one of the formats.
 
-        layout = QVBoxLayout()
-        upper_layout = QHBoxLayout()
-        # Edit button
-        self.edit_button = QToolButton()
-        icon = Logos.Pen12x12()
-        self.edit_button.setIcon(icon)
-        self.edit_button.setIconSize(icon.availableSizes()[0])
-        self.edit_button.setFixedSize(icon.availableSizes()[0])
-        self.edit_button.clicked.connect(self.edit_event)
-
-        # Delete button
-        self.delete_button = QToolButton()
-        icon = Logos.Garbage12x12()
-        self.delete_button.setIcon(icon)
-        self.delete_button.setIconSize(icon.availableSizes()[0])
-        self.delete_button.setFixedSize(icon.availableSizes()[0])
-        self.delete_button.clicked.connect(self.create_delete_event_dialog)
-
-        upper_layout.addWidget(self.edit_button)
-        upper_layout.addWidget(self.delete_button)
-
-        lower_layout = QHBoxLayout()
-        # Move left button
-        self.move_left_button = QToolButton()
-        icon = Logos.ArrowLeft12x12()
-        self.move_left_button.setIcon(icon)
-        self.move_left_button.setIconSize(icon.availableSizes()[0])
-        self.move_left_button.setFixedSize(icon.availableSizes()[0])
-        self.move_left_button.clicked.connect(self.move_event_left_button_clicked)
-
-        # Move right button
-        self.move_right_button = QToolButton()
-        icon = Logos.ArrowRight12x12()
-        self.move_right_button.setIcon(icon)
-        self.move_right_button.setIconSize(icon.availableSizes()[0])
-        self.move_right_button.setFixedSize(icon.availableSizes()[0])
-        self.move_right_button.clicked.connect(self.move_event_right_button_clicked)
-
-        lower_layout.addWidget(self.move_left_button)
-        lower_layout.addWidget(self.move_right_button)
-
-        layout.addLayout(upper_layout)
-        layout.addLayout(lower_layout)
+        Returns:
+            str: The path of the file selected by the user.
+        """
+        file_name, _ = QFileDialog.getOpenFileName(
+            self.parent,
+            "Open pulse sequence",
+            "",
+            f"Pulse Sequences (*.{self.extension} *.{self.binary_extension});;All Files (*)",
+            options=QFileDialog.Option.DontUseNativeDialog,
+        )
+        return file_name or None
 
-        self.setLayout(layout)
-        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+    def saveFileDialog(self) -> str:
+        """Opens a file dialog for the user to select the file and the format to save the pulse sequence in.
 
-    @pyqtSlot()
-    def edit_event(self) -> None:
-        """This method is called when the edit button is clicked. It opens a dialog that allows the user to change the event name and duration.
+        Returns:
+            str: The path of the file selected by the user with the extension of the selected format.
+        """
+        file_name, selected_filter = QFileDialog.getSaveFileName(
+            self.parent,
+            "Save pulse sequence",
+            "",
+            ";;".join(self.filters),
+            options=QFileDialog.Option.DontUseNativeDialog,
+        )
+        if not file_name:
+            return None
+
+        extension = self.filters.get(selected_filter, self.extension)
+        if not file_name.endswith((f".{self.extension}", f".{self.binary_extension}")):
+            file_name += f".{extension}"
+        return file_name
+
+
+class CachedFunctionSelectionField(DuckFormFunctionSelectionField):
+    """Function selection field whose plots take the samples of the pulse shape from the shape cache.
+
+    The dialogs plot the time domain and the frequency domain of the selected function every time it or the duration of the event changes, so the samples are shared with the other dialogs and the saved pulse sequences.
+    """
 
-        If the user clicks ok, the change_event_name and change_event_duration signals are emitted.
+    def get_samples(self, function: Function, pulse_length: float):
+        """Returns the time points and the cached samples of a function.
+
+        Args:
+            function (Function): The function.
+            pulse_length (float): The pulse length in seconds.
+
+        Returns:
+            tuple: The time points and the read-only samples of the pulse amplitude.
         """
-        logger.debug("Edit button clicked for event %s", self.event.name)
+        return (
+            function.get_time_points(pulse_length),
+            shape_cache.get_pulse_amplitude(function, pulse_length),
+        )
 
-        # Create a QDialog to edit the event
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Edit event")
+    def frequency_domain_plot(self, function: Function, pulse_length: float) -> MplWidget:
+        """Plots the frequency domain of the function for the given pulse length.
+
+        Args:
+            function (Function): The function to plot.
+            pulse_length (float): The pulse length in seconds.
+
+        Returns:
+            MplWidget: The matplotlib widget containing the plot.
+        """
+        mpl_widget = MplWidget()
+        xdf, ydf = sp.fft(*self.get_samples(function, pulse_length))
+        mpl_widget.canvas.ax.plot(xdf, abs(ydf))
+        mpl_widget.canvas.ax.set_xlabel("Frequency in Hz")
+        mpl_widget.canvas.ax.set_ylabel("Magnitude")
+        mpl_widget.canvas.ax.grid(True)
+        return mpl_widget
+
+    def time_domain_plot(self, function: Function, pulse_length: float) -> MplWidget:
+        """Plots the time domain of the function for the given pulse length.
+
+        Args:
+            function (Function): The function to plot.
+            pulse_length (float): The pulse length in seconds.
+
+        Returns:
+            MplWidget: The matplotlib widget containing the plot.
+        """
+        mpl_widget = MplWidget()
+        td, yd = self.get_samples(function, pulse_length)
+        mpl_widget.canvas.ax.plot(td, abs(yd))
+        mpl_widget.canvas.ax.set_xlabel("Time in s")
+        mpl_widget.canvas.ax.set_ylabel("Magnitude")
+        mpl_widget.canvas.ax.grid(True)
+        return mpl_widget
+
+
+class EditEventDialog(QDialog):
+    """This dialog is created whenever an event is edited. It allows the user to change the name and the duration of the event.
+
+    Args:
+        event (Event): The event that is edited.
+        parent (QWidget): The parent widget of the dialog.
+    """
+
+    def __init__(self, event, parent=None):
+        """Initializes the EditEventDialog."""
+        super().__init__(parent)
+        self.setWindowTitle("Edit event")
         layout = QVBoxLayout()
-        label = QLabel(f"Edit event: {self.event.name}")
+        label = QLabel(f"Edit event: {event.name}")
         layout.addWidget(label)
 
         # Create the inputs for event name, duration
         event_form_layout = QFormLayout()
         name_label = QLabel("Name:")
-        name_lineedit = QLineEdit(self.event.name)
-        event_form_layout.addRow(name_label, name_lineedit)
+        self.name_lineedit = QLineEdit(event.name)
+        event_form_layout.addRow(name_label, self.name_lineedit)
 
         duration_label = QLabel("Duration (µs):")
-        duration_lineedit = QLineEdit()
+        self.duration_lineedit = QLineEdit()
 
-        duration_lineedit.setText("%.16g" % (self.event.duration * 1e6))
+        # 15 significant digits convert back to the same duration, so an unchanged duration is not changed by accepting the dialog
+        self.duration_lineedit.setText("%.15g" % (event.duration * 1e6))
 
-        event_form_layout.addRow(duration_label, duration_lineedit)
+        event_form_layout.addRow(duration_label, self.duration_lineedit)
         layout.addLayout(event_form_layout)
 
         buttons = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
         )
-        buttons.accepted.connect(dialog.accept)
-        buttons.rejected.connect(dialog.reject)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
-        dialog.setLayout(layout)
-        result = dialog.exec()
-        if result:
-            logger.debug("Editing event %s", self.event.name)
-            if name_lineedit.text() != self.event.name:
-                self.change_event_name.emit(self.event.name, name_lineedit.text())
-            if duration_lineedit.text() != str(self.event.duration):
-                self.change_event_duration.emit(
-                    self.event.name, duration_lineedit.text()
-                )
+        self.setLayout(layout)
 
-    @pyqtSlot()
-    def create_delete_event_dialog(self) -> None:
-        """This method is called when the delete button is clicked.
+    def get_name(self) -> str:
+        """Returns the name entered by the user.
 
-        It creates a dialog that asks the user if he is sure he wants to delete the event.
-        If the user clicks yes, the delete_event signal is emitted.
+        Returns:
+            str: The name entered by the user
         """
-        # Create an 'are you sure' dialog
-        logger.debug("Delete button clicked")
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Delete event")
-        layout = QVBoxLayout()
-        label = QLabel(f"Are you sure you want to delete event {self.event.name}?")
-        layout.addWidget(label)
-        buttons = QDialogButtonBox(
-            QDialogButtonBox.StandardButton.Yes | QDialogButtonBox.StandardButton.No
+        return self.name_lineedit.text()
+
+    def get_duration(self) -> str:
+        """Returns the duration in µs entered by the user.
+
+        Returns:
+            str: The duration entered by the user
+        """
+        return self.duration_lineedit.text()
+
+
+class EventLengthsWidget(QWidget):
+    """Widget of the event lengths list.
+
+    The tool tip with the start time of an event is only created when it is shown, so changing the duration of an event does not update the labels of all following events. The labels are plain QLabels and their tool tip events are handled by this widget. Events that Qt sends to every widget, e.g. when a modal dialog opens, therefore do not call into Python for every event.
+
+    Args:
+        view (PulseProgrammerView): The view of the pulse programmer.
+    """
+
+    def __init__(self, view):
+        """Initializes the EventLengthsWidget."""
+        super().__init__()
+        self.view = view
+
+    def event(self, event) -> bool:
+        """Shows the start time of the event below the cursor as tool tip."""
+        if event.type() == QEvent.Type.ToolTip:
+            label = self.childAt(event.pos())
+            # The first label is the "Event lengths" label
+            if label is not None and self.view.event_layout.indexOf(label) > 0:
+                QToolTip.showText(
+                    event.globalPos(), self.view.get_event_length_tooltip(label), label
+                )
+                return True
+        return super().event(event)
+
+
+class RepeatBlockDialog(QDialog):
+    """This dialog is created whenever a range of events is repeated. It allows the user to select the first and the last event and the repeat count.
+
+    Args:
+        event_names (list): The names of the events of the pulse sequence.
+        parent (PulseProgrammerView): The view of the pulse programmer.
+    """
+
+    def __init__(self, event_names, parent=None):
+        """Initializes the RepeatBlockDialog."""
+        super().__init__(parent)
+
+        self.setWindowTitle("Repeat Events")
+
+        self.layout = QFormLayout(self)
+
+        self.first_event_combobox = QComboBox()
+        self.first_event_combobox.addItems(event_names)
+        self.layout.addRow(QLabel("First event:"), self.first_event_combobox)
+
+        self.last_event_combobox = QComboBox()
+        self.last_event_combobox.addItems(event_names)
+        self.layout.addRow(QLabel("Last event:"), self.last_event_combobox)
+
+        self.count_spinbox = QSpinBox()
+        self.count_spinbox.setRange(1, 1000000)
+        self.count_spinbox.setValue(2)
+        self.count_spinbox.setToolTip("A repeat count of 1 removes the repetition")
+        self.layout.addRow(QLabel("Repeat count:"), self.count_spinbox)
+
+        self.buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+            self,
         )
-        buttons.accepted.connect(dialog.accept)
-        buttons.rejected.connect(dialog.reject)
-        layout.addWidget(buttons)
-        dialog.setLayout(layout)
-        result = dialog.exec()
-        if result:
-            self.delete_event.emit(self.event.name)
 
-    @pyqtSlot()
-    def move_event_left_button_clicked(self) -> None:
-        """This method is called when the move left button is clicked."""
-        logger.debug("Move event left: %s", self.event.name)
-        self.move_event_left.emit(self.event.name)
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+
+        self.layout.addWidget(self.buttons)
+
+    def get_repeat_block(self) -> tuple:
+        """Returns the repeat block entered by the user.
 
-    def move_event_right_button_clicked(self) -> None:
-        """This method is called when the move right button is clicked."""
-        logger.debug("Move event right: %s", self.event.name)
-        self.move_event_right.emit(self.event.name)
+        Returns:
+            tuple: The name of the first and the last event and the repeat count.
+        """
+        return (
+            self.first_event_combobox.currentText(),
+            self.last_event_combobox.currentText(),
+            self.count_spinbox.value(),
+        )
 
 
 class AddEventDialog(QDialog):
@@ -655,14 +1400,7 @@ class AddEventDialog(QDialog):
             if not value:
                 return (QValidator.State.Intermediate, value, position)
 
-            if any(
-                [
-                    event.name == value
-                    for event in self.parent()
-                    .parent()
-                    .module.model.pulse_sequence.events
-                ]
-            ):
+            if self.parent().parent().module.model.has_event(value):
                 return (QValidator.State.Invalid, value, position)
 
             return (QValidator.State.Acceptable, value, position)
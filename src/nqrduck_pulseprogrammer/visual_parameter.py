@@ -1,45 +1,156 @@
+"""Visual representation of the pulse parameters in the pulse table."""
+
+import logging
+from collections import OrderedDict
 from nqrduck.assets.icons import PulseParameters
 from quackseq.pulseparameters import TXPulse, RXReadout, PulseParameter
 from quackseq.functions import RectFunction, SincFunction, GaussianFunction
+from .instrumentation import instrumentation
+
+logger = logging.getLogger(__name__)
+
 
 class VisualParameter():
+    """Returns the icon of a pulse parameter depending on the state of its options.
+
+    Icons are shared between all pulse parameters in the same state. Renderers for the different pulse parameter classes are registered with VisualParameter.register. A renderer takes the pulse parameter and returns a hashable state and a function that loads the icon for this state.
+
+    Args:
+        pulse_parameter (PulseParameter): The pulse parameter that is displayed.
+
+    Attributes:
+        CACHE_SIZE (int): The maximum number of icons that are kept in the cache.
+        renderers (dict): The registered renderers by pulse parameter class.
+        cache_hits (int): The number of icons that were returned from the cache.
+        cache_misses (int): The number of icons that had to be loaded.
+    """
+
+    CACHE_SIZE = 64
+
+    renderers = {}
+    cache = OrderedDict()
+    cache_hits = 0
+    cache_misses = 0
 
     def __init__(self, pulse_parameter : PulseParameter):
+        """Initializes the visual parameter."""
         self.pulse_parameter = pulse_parameter
 
+    @classmethod
+    def register(cls, pulse_parameter_class):
+        """Registers a renderer for a pulse parameter class. The renderer is also used for subclasses of the pulse parameter class.
+
+        Args:
+            pulse_parameter_class (type): The pulse parameter class.
+
+        Returns:
+            function: A decorator that registers the renderer.
+        """
+        def decorator(renderer):
+            cls.renderers[pulse_parameter_class] = renderer
+            return renderer
+
+        return decorator
+
+    @classmethod
+    def cache_info(cls) -> dict:
+        """Returns the statistics of the icon cache.
+
+        Returns:
+            dict: The number of hits, misses and cached icons.
+        """
+        return {
+            "hits": cls.cache_hits,
+            "misses": cls.cache_misses,
+            "size": len(cls.cache),
+        }
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Removes all icons from the cache and resets the statistics."""
+        cls.cache.clear()
+        cls.cache_hits = 0
+        cls.cache_misses = 0
+
+    def get_entry(self):
+        """Returns the cached icon and its size for the state of the pulse parameter.
+
+        Returns:
+            tuple: The icon and its size or None if there is no renderer for the pulse parameter.
+        """
+        for parameter_class in type(self.pulse_parameter).__mro__:
+            renderer = self.renderers.get(parameter_class)
+            if renderer is not None:
+                break
+        else:
+            return None
+
+        state, load_icon = renderer(self.pulse_parameter)
+        key = (parameter_class, state)
+
+        cache = VisualParameter.cache
+        entry = cache.get(key)
+        if entry is not None:
+            VisualParameter.cache_hits += 1
+            cache.move_to_end(key)
+            return entry
+
+        VisualParameter.cache_misses += 1
+        instrumentation.count("visual_parameter.icon_loads")
+        icon = load_icon()
+        entry = (icon, icon.availableSizes()[0])
+        cache[key] = entry
+        if len(cache) > self.CACHE_SIZE:
+            cache.popitem(last=False)
+        return entry
+
     def get_pixmap(self):
-        """Returns the pixmap of the TX Pulse Parameter.
+        """Returns the pixmap of the Pulse Parameter.
+
+        Returns:
+            QIcon: The pixmap of the Pulse Parameter depending on the state of its options.
+        """
+        entry = self.get_entry()
+        if entry is None:
+            return None
+        return entry[0]
+
+    def get_size(self):
+        """Returns the size of the pixmap of the Pulse Parameter.
 
         Returns:
-            QPixmap: The pixmap of the TX Pulse Parameter depending on the relative amplitude.
+            QSize: The size of the pixmap.
         """
-        # Check the instance of the pulse parameter
-        if isinstance(self.pulse_parameter, TXPulse):
-            amplitude = self.pulse_parameter.get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value
-            if amplitude > 0:
-                # Get the shape
-                shape = self.pulse_parameter.get_option_by_name(TXPulse.TX_PULSE_SHAPE).value
-                if isinstance(shape, RectFunction):
-                    pixmap = PulseParameters.TXRect()
-                    return pixmap
-                elif isinstance(shape, SincFunction):
-                    pixmap = PulseParameters.TXSinc()
-                    return pixmap
-                elif isinstance(shape, GaussianFunction):
-                    pixmap = PulseParameters.TXGauss()
-                    return pixmap
-                else:
-                    pixmap = PulseParameters.TXCustom()
-                    return pixmap
-            else:
-                pixmap = PulseParameters.TXOff()
-                return pixmap
-            
-        elif isinstance(self.pulse_parameter, RXReadout):
-            rx = self.pulse_parameter.get_option_by_name(RXReadout.RX).value
-            if rx:
-                pixmap = PulseParameters.RXOn()
-                return pixmap
-            else:
-                pixmap = PulseParameters.RXOff()
-                return pixmap
+        entry = self.get_entry()
+        if entry is None:
+            return None
+        return entry[1]
+
+
+TX_SHAPE_ICONS = {
+    RectFunction: PulseParameters.TXRect,
+    SincFunction: PulseParameters.TXSinc,
+    GaussianFunction: PulseParameters.TXGauss,
+}
+
+
+@VisualParameter.register(TXPulse)
+def render_tx_pulse(pulse_parameter: TXPulse):
+    """Returns the state and the icon of the TX Pulse Parameter depending on the relative amplitude and the pulse shape."""
+    amplitude = pulse_parameter.get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value
+    if amplitude > 0:
+        shape = pulse_parameter.get_option_by_name(TXPulse.TX_PULSE_SHAPE).value
+        for shape_class in type(shape).__mro__:
+            if shape_class in TX_SHAPE_ICONS:
+                return shape_class, TX_SHAPE_ICONS[shape_class]
+        return type(shape), PulseParameters.TXCustom
+    return None, PulseParameters.TXOff
+
+
+@VisualParameter.register(RXReadout)
+def render_rx_readout(pulse_parameter: RXReadout):
+    """Returns the state and the icon of the RX Readout Parameter depending on the RX state."""
+    rx = bool(pulse_parameter.get_option_by_name(RXReadout.RX).value)
+    if rx:
+        return rx, PulseParameters.RXOn
+    return rx, PulseParameters.RXOff
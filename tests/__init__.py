@@ -0,0 +1 @@
+"""Tests and benchmarks of the pulse programmer module."""
@@ -0,0 +1,127 @@
+"""Fixtures of the pulse programmer tests and benchmarks.
+
+The tests run with the offscreen Qt platform, so they do not need a display. The size of the synthetic pulse sequences of the benchmarks is set with --sequence-size.
+"""
+
+import os
+import subprocess
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+SEQUENCE_SIZE = 1000
+
+
+def pytest_addoption(parser):
+    """Adds the --sequence-size option for the number of events of the synthetic pulse sequences."""
+    parser.addoption(
+        "--sequence-size",
+        type=int,
+        default=SEQUENCE_SIZE,
+        help=f"number of events of the synthetic pulse sequences (default {SEQUENCE_SIZE})",
+    )
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """The Qt application of the test session."""
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def module(qapp):
+    """A new pulse programmer module with an empty pulse sequence."""
+    from nqrduck_pulseprogrammer.controller import PulseProgrammerController
+    from nqrduck_pulseprogrammer.model import PulseProgrammerModel
+    from nqrduck_pulseprogrammer.pulseprogrammer import PulseProgrammer, create_view
+
+    return PulseProgrammer(PulseProgrammerModel, create_view, PulseProgrammerController)
+
+
+@pytest.fixture
+def model(module):
+    """The model of a new pulse programmer module."""
+    return module.model
+
+
+@pytest.fixture
+def view(module, qapp):
+    """The shown view of a new pulse programmer module."""
+    widget = module.pulse_programmer_view
+    widget.show()
+    qapp.processEvents()
+    yield widget.view
+    widget.close()
+    widget.deleteLater()
+    qapp.processEvents()
+
+
+@pytest.fixture
+def sequence_size(request):
+    """The number of events of the synthetic pulse sequences."""
+    return request.config.getoption("--sequence-size")
+
+
+def make_sequence(size: int, name: str = "Synthetic pulse sequence"):
+    """Creates a synthetic pulse sequence of alternating pulse and readout events.
+
+    The events are built from the data of two template events like a loaded pulse sequence, which is much faster than creating every event.
+
+    Args:
+        size (int): The number of events.
+        name (str, optional): The name of the pulse sequence.
+
+    Returns:
+        QuackSequence: The pulse sequence.
+    """
+    from quackseq.event import Event
+    from quackseq.pulsesequence import QuackSequence
+    from nqrduck_pulseprogrammer import sequence_io
+
+    template = QuackSequence(name)
+    pulse = Event("pulse", "3u", template)
+    pulse.parameters["TX"].get_option_by_name("Relative TX Amplitude (%)").value = 100
+    readout = Event("readout", "100u", template)
+    readout.parameters["RX"].get_option_by_name("Enable RX Readout").value = True
+    templates = [
+        sequence_io.event_to_json(pulse),
+        sequence_io.event_to_json(readout),
+    ]
+
+    events = []
+    for index in range(size):
+        data = dict(templates[index % 2])
+        data["name"] = f"{data['name']}_{index}"
+        events.append(data)
+    return sequence_io.build_sequence(
+        {"name": name, "version": template.version, "events": events}
+    )
+
+
+def run_python(code: str) -> str:
+    """Runs Python code in a new interpreter with the import path of the tests.
+
+    Args:
+        code (str): The code.
+
+    Returns:
+        str: The output of the code.
+    """
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=environment,
+    )
+    return result.stdout
+
+
+@pytest.fixture
+def large_sequence(qapp, sequence_size):
+    """A synthetic pulse sequence with --sequence-size events."""
+    return make_sequence(sequence_size)
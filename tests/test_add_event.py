@@ -0,0 +1,97 @@
+"""Regression tests of building and editing long pulse sequences event by event."""
+
+import numpy as np
+import pytest
+from quackseq.pulsesequence import QuackSequence
+
+from nqrduck_pulseprogrammer.timing import TimingIndex
+
+from .conftest import make_sequence
+
+EVENT_COUNT = 5000
+
+
+@pytest.fixture
+def rebuilds(model, monkeypatch):
+    """Counts the full rebuilds of the event index, the timing index, the content hash and the validator of the model."""
+    counts = {}
+
+    def spy(owner, name):
+        method = getattr(owner, name)
+        key = f"{getattr(owner, '__name__', type(owner).__name__)}.{name}"
+
+        def wrapper(*args, **kwargs):
+            counts[key] = counts.get(key, 0) + 1
+            return method(*args, **kwargs)
+
+        monkeypatch.setattr(owner, name, wrapper)
+
+    spy(model, "rebuild_event_index")
+    spy(model.timing, "reset")
+    spy(model.content_hash, "reset")
+    spy(model.validator, "reset")
+    spy(QuackSequence, "to_json")
+    return counts
+
+
+def check_indexes(model) -> None:
+    """Checks that the event index and the timing index of the model match its pulse sequence."""
+    events = model.sequence.events
+    assert model._event_index == {event.name: index for index, event in enumerate(events)}
+    assert np.allclose(model.timing.starts, TimingIndex(model.sequence).starts)
+
+
+def test_add_event_is_linear(model, rebuilds, monkeypatch):
+    """Builds a pulse sequence with 5,000 events through add_event, which does the same constant work for every event."""
+    lookups = []
+    get_event_index = model.get_event_index
+    monkeypatch.setattr(
+        model, "get_event_index", lambda name: lookups.append(name) or get_event_index(name)
+    )
+    signals = {"inserted": [], "events_changed": 0}
+    model.event_inserted.connect(signals["inserted"].append)
+
+    def count_events_changed():
+        signals["events_changed"] += 1
+
+    model.events_changed.connect(count_events_changed)
+
+    for index in range(EVENT_COUNT):
+        model.add_event(f"event_{index}", 3)
+
+    assert len(model.sequence.events) == EVENT_COUNT
+    # Nothing is rebuilt or serialized for the whole pulse sequence
+    assert rebuilds == {}
+    # Every event is announced on its own and looked up once in the event index
+    assert signals == {"inserted": list(range(EVENT_COUNT)), "events_changed": 0}
+    assert lookups == [f"event_{index}" for index in range(EVENT_COUNT)]
+    check_indexes(model)
+
+
+def test_single_event_edits_do_not_rebuild(model, rebuilds):
+    """Edits single events of a pulse sequence with 5,000 events, which only updates the indexes for the changed events."""
+    model.sequence = make_sequence(EVENT_COUNT)
+    # Only replacing the whole pulse sequence rebuilds the indexes
+    assert rebuilds == {
+        "PulseProgrammerModel.rebuild_event_index": 1,
+        "TimingIndex.reset": 1,
+        "SequenceHash.reset": 1,
+        "SequenceValidator.reset": 1,
+    }
+    rebuilds.clear()
+    events = model.sequence.events
+
+    model.add_event("new", 5)
+    model.set_event_duration(events[10].name, "7u")
+    model.rename_event(events[20].name, "renamed")
+    model.move_event(events[30].name, 1)
+    model.delete_event(events[40].name)
+    values = [model.get_option_value(option) for option in events[50].parameters["TX"].options]
+    values[0] = 42
+    model.set_parameter_values(events[50].name, "TX", values)
+    model.undo()
+    model.redo()
+
+    assert rebuilds == {}
+    check_indexes(model)
+    assert model.timing.get_start_time(11) == pytest.approx(model.timing.get_start_time(10) + 7e-6)
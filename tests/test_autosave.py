@@ -0,0 +1,94 @@
+"""Tests of the autosave of the pulse programmer controller."""
+
+import pytest
+
+from nqrduck_pulseprogrammer.content_hash import get_sequence_hash
+from nqrduck_pulseprogrammer.journal import SequenceJournal
+
+from .conftest import make_sequence
+
+
+@pytest.fixture
+def controller(module, tmp_path):
+    """The controller of a new module with an autosave journal in a temporary directory."""
+    module.controller.start_journal(tmp_path)
+    module.controller.autosave_interval = 0
+    yield module.controller
+    module.controller.journal.close()
+
+
+def get_snapshots(directory) -> list:
+    """Returns the snapshot files of the autosave in a directory."""
+    return list(directory.glob(f"{SequenceJournal.SNAPSHOT_PREFIX}*"))
+
+
+def restore(directory):
+    """Restores the autosave of a directory."""
+    return SequenceJournal(directory).restore()
+
+
+def test_snapshot_is_deferred(controller, model, qapp, tmp_path, monkeypatch):
+    """Writes a single snapshot after a burst of full changes instead of one per change."""
+    writes = []
+    write_snapshot = controller.journal.write_snapshot
+    monkeypatch.setattr(
+        controller.journal,
+        "write_snapshot",
+        lambda sequence: writes.append(len(sequence.events)) or write_snapshot(sequence),
+    )
+
+    model.sequence = make_sequence(10)
+    model.events_changed.emit()
+    with model.batch():
+        model.add_event("new", 5)
+        model.delete_event("pulse_0")
+    model.set_durations({"pulse_2": "7u", "pulse_4": "8u"})
+
+    # Nothing is written while the edits are made
+    assert writes == []
+    qapp.processEvents()
+
+    assert writes == [10]
+    assert len(get_snapshots(tmp_path)) == 1
+    assert get_sequence_hash(restore(tmp_path)) == model.pulse_sequence_hash
+
+
+def test_single_edits_are_recorded(controller, model, qapp, tmp_path):
+    """Records single edits in the journal after the snapshot was written."""
+    model.sequence = make_sequence(4)
+    model.events_changed.emit()
+    qapp.processEvents()
+
+    model.set_event_duration("pulse_0", "7u")
+    model.rename_event("readout_1", "echo")
+
+    assert controller.journal.records == 2
+    assert get_sequence_hash(restore(tmp_path)) == model.pulse_sequence_hash
+
+
+def test_compaction_is_deferred(controller, model, qapp, tmp_path):
+    """Schedules a snapshot when the journal grew too large."""
+    controller.journal.max_records = 2
+    model.sequence = make_sequence(4)
+    model.events_changed.emit()
+    qapp.processEvents()
+
+    for duration in ["7u", "8u", "9u"]:
+        model.set_event_duration("pulse_0", duration)
+    assert controller.snapshot_timer.isActive()
+    qapp.processEvents()
+
+    assert controller.journal.records == 0
+    assert get_sequence_hash(restore(tmp_path)) == model.pulse_sequence_hash
+
+
+def test_flush_writes_scheduled_snapshot(controller, model, tmp_path):
+    """Writes a scheduled snapshot right away, e.g. when the application quits."""
+    controller.autosave_interval = 60_000
+    model.sequence = make_sequence(4)
+    model.events_changed.emit()
+
+    controller.flush_autosave()
+
+    assert not controller.snapshot_timer.isActive()
+    assert get_sequence_hash(restore(tmp_path)) == model.pulse_sequence_hash
@@ -0,0 +1,355 @@
+"""Benchmarks of the hot paths of the pulse programmer.
+
+The benchmarks use synthetic pulse sequences with --sequence-size events, e.g.
+
+    pytest tests/test_benchmarks.py --sequence-size 5000 --benchmark-only
+"""
+
+import time
+import tracemalloc
+
+import pytest
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (
+    QHBoxLayout,
+    QPushButton,
+    QTableView,
+    QTableWidget,
+    QToolButton,
+    QVBoxLayout,
+    QWidget,
+)
+from nqrduck.assets.icons import Logos
+from nqrduck_pulseprogrammer import sequence_io
+from nqrduck_pulseprogrammer.pulse_table import PulseTableDelegate, PulseTableModel
+from nqrduck_pulseprogrammer.timeline import SequenceTimeline
+from nqrduck_pulseprogrammer.visual_parameter import VisualParameter
+
+from .conftest import make_sequence, run_python
+
+LOOKUP_SIZES = [100, 1000, 10_000]
+LOOKUPS = 1000
+TABLE_SIZES = [10, 100, 1000, 10_000]
+TABLE_SIZE = (800, 600)
+
+
+@pytest.fixture
+def large_view(view, model, large_sequence, qapp):
+    """The view of a module whose pulse sequence is the large synthetic pulse sequence."""
+    model.sequence = large_sequence
+    model.events_changed.emit()
+    qapp.processEvents()
+    return view
+
+
+def test_refresh_event_lengths(benchmark, large_view):
+    """Benchmarks a full refresh of the event lengths."""
+    benchmark(large_view.on_events_changed)
+
+
+def test_refresh_event_lengths_after_duration_changes(benchmark, large_view, model):
+    """Benchmarks a full refresh of the event lengths after the durations of 100 events changed."""
+    durations = iter(range(1, 1_000_000))
+
+    def refresh():
+        duration = next(durations)
+        model.set_durations(
+            {event.name: f"{duration}u" for event in model.sequence.events[:100]}
+        )
+        large_view.on_events_changed()
+
+    benchmark(refresh)
+
+
+def test_parameter_icons(benchmark, large_view):
+    """Benchmarks the icons of all pulse parameter cells of the pulse table."""
+    table_model = large_view.pulse_table.model()
+    indexes = [
+        table_model.index(row, column)
+        for row in range(1, table_model.rowCount())
+        for column in range(table_model.columnCount())
+    ]
+
+    def get_icons():
+        for index in indexes:
+            table_model.data(index, Qt.ItemDataRole.DecorationRole)
+
+    benchmark(get_icons)
+
+
+@pytest.mark.parametrize("parameter", ["TX", "RX"])
+def test_parameter_dialog_construction(benchmark, large_view, model, parameter):
+    """Benchmarks building a new dialog for a pulse parameter."""
+    event = model.sequence.events[0]
+    pulse_parameter = model.detach_parameter(event.name, parameter)
+
+    def create():
+        dialog = large_view.create_parameter_dialog(event, parameter, pulse_parameter)
+        dialog.deleteLater()
+
+    benchmark(create)
+
+
+@pytest.mark.parametrize("parameter", ["TX", "RX"])
+def test_parameter_dialog_reuse(benchmark, large_view, model, parameter):
+    """Benchmarks opening the cached dialog of a pulse parameter for another event."""
+    events = model.sequence.events[:2]
+    pulse_parameters = [
+        model.detach_parameter(event.name, parameter) for event in events
+    ]
+    clicks = iter(range(1_000_000))
+
+    def get_dialog():
+        index = next(clicks) % 2
+        large_view.get_parameter_dialog(events[index], parameter, pulse_parameters[index])
+
+    benchmark(get_dialog)
+
+
+def test_single_event_edit(benchmark, large_view, model, qapp):
+    """Benchmarks changing the duration of a single event in a large pulse sequence, including the update of the view."""
+    event_name = model.sequence.events[len(model.sequence.events) // 2].name
+    durations = iter(range(1, 1_000_000))
+
+    def edit():
+        model.set_event_duration(event_name, f"{next(durations)}u")
+        qapp.processEvents()
+
+    benchmark(edit)
+
+
+def test_add_event(benchmark, model):
+    """Benchmarks building a pulse sequence with 5,000 events through add_event, which must take about the same time per event for short and long pulse sequences.
+
+    The times of the five chunks of 1,000 events are stored in the extra_info of the benchmark. The benchmark only runs with the benchmarks enabled, as the times of a single run are too noisy for the regular tests.
+    """
+    # The build itself is covered by test_add_event.py, only the times are of interest here
+    if benchmark.disabled:
+        pytest.skip("the times of add_event are only compared with --benchmark-only")
+    chunk = 1000
+    durations = []
+
+    def build():
+        for start in range(0, 5 * chunk, chunk):
+            begin = time.perf_counter()
+            for index in range(start, start + chunk):
+                model.add_event(f"event_{index}", 3)
+            durations.append(time.perf_counter() - begin)
+
+    benchmark.pedantic(build, rounds=1, iterations=1)
+    benchmark.extra_info["chunk_seconds"] = durations
+
+    assert len(model.sequence.events) == 5 * chunk
+    # A quadratic build takes about nine times as long for the last chunk as for the first one
+    assert durations[-1] < 3 * durations[0]
+
+
+@pytest.mark.parametrize("size", LOOKUP_SIZES)
+def test_event_lookup(benchmark, model, monkeypatch, size):
+    """Benchmarks looking up events by name, the time per lookup stays the same for 100 to 10,000 events.
+
+    The lookups are spread over the whole pulse sequence, including names of missing events. The results of the sizes are in the same benchmark group for comparison.
+    """
+    model.sequence = make_sequence(size)
+    events = model.sequence.events
+    names = [events[index * len(events) // LOOKUPS].name for index in range(LOOKUPS - 1)]
+    names.append("missing")
+    rebuilds = []
+    rebuild_event_index = model.rebuild_event_index
+    monkeypatch.setattr(
+        model, "rebuild_event_index", lambda: rebuilds.append(True) or rebuild_event_index()
+    )
+    benchmark.group = "event_lookup"
+    benchmark.extra_info["lookups"] = LOOKUPS
+
+    def look_up():
+        return [model.get_event(name) for name in names]
+
+    found = benchmark(look_up)
+
+    assert found[-1] is None
+    assert all(event.name == name for event, name in zip(found[:-1], names))
+    # Every lookup is a dictionary access, the event index is never rebuilt or scanned
+    assert rebuilds == []
+
+
+def test_timeline_sampling(benchmark, large_sequence):
+    """Benchmarks sampling the timeline of a pulse sequence."""
+    timeline = benchmark(SequenceTimeline, large_sequence)
+
+    benchmark.extra_info["tx_points"] = timeline.tx_points
+
+
+@pytest.mark.parametrize("size", LOOKUP_SIZES)
+def test_timeline_view(benchmark, size):
+    """Benchmarks decimating the whole timeline to 1,000 columns, the number of drawn points does not depend on the number of events."""
+    timeline = SequenceTimeline(make_sequence(size))
+    benchmark.group = "timeline_view"
+
+    view = benchmark(timeline.get_view, 0, timeline.duration, 1000)
+
+    benchmark.extra_info["points"] = view.shape[1]
+    assert view.shape[1] <= 2 * 2 * 1000 + 1
+
+
+@pytest.mark.parametrize("extension", [sequence_io.JSON_EXTENSION, sequence_io.BINARY_EXTENSION])
+def test_save_sequence(benchmark, large_sequence, tmp_path, extension):
+    """Benchmarks saving a pulse sequence."""
+    path = tmp_path / f"sequence.{extension}"
+    benchmark(sequence_io.save_sequence, large_sequence, path)
+
+
+@pytest.mark.parametrize("extension", [sequence_io.JSON_EXTENSION, sequence_io.BINARY_EXTENSION])
+def test_load_sequence(benchmark, large_sequence, tmp_path, extension):
+    """Benchmarks loading a pulse sequence."""
+    path = tmp_path / f"sequence.{extension}"
+    sequence_io.save_sequence(large_sequence, path)
+
+    sequence = benchmark(sequence_io.load_sequence, path)
+
+    assert len(sequence.events) == len(large_sequence.events)
+
+
+@pytest.mark.parametrize(
+    "module_name", ["nqrduck_pulseprogrammer.pulseprogrammer", "nqrduck_pulseprogrammer.view"]
+)
+def test_import_time(benchmark, module_name):
+    """Benchmarks importing the module and the view in a new interpreter.
+
+    The import time without the start of the interpreter is stored in the extra_info of the benchmark. Loading the module must not import the view.
+    """
+    code = (
+        "import sys, time;"
+        "import nqrduck.module.module;"
+        "start = time.perf_counter();"
+        f"import {module_name};"
+        "print(time.perf_counter() - start, 'nqrduck_pulseprogrammer.view' in sys.modules)"
+    )
+
+    output = benchmark.pedantic(run_python, args=(code,), rounds=3)
+
+    seconds, view_loaded = output.split()
+    benchmark.extra_info["import_seconds"] = float(seconds)
+    assert view_loaded == str(module_name.endswith(".view"))
+
+
+def test_first_show(benchmark, qapp):
+    """Benchmarks building and showing the view of a new pulse programmer module."""
+    from nqrduck_pulseprogrammer.controller import PulseProgrammerController
+    from nqrduck_pulseprogrammer.model import PulseProgrammerModel
+    from nqrduck_pulseprogrammer.pulseprogrammer import PulseProgrammer, create_view
+
+    widgets = []
+
+    def create():
+        module = PulseProgrammer(PulseProgrammerModel, create_view, PulseProgrammerController)
+        widgets.append(module.pulse_programmer_view)
+        return (widgets[-1],), {}
+
+    def show(widget):
+        widget.show()
+        qapp.processEvents()
+
+    benchmark.pedantic(show, setup=create, rounds=5)
+
+    assert all(widget._view is not None for widget in widgets)
+    for widget in widgets:
+        widget.close()
+        widget.deleteLater()
+    qapp.processEvents()
+
+
+def build_model_table(model) -> QTableView:
+    """Builds the pulse table of the model/view implementation for the pulse sequence of a model."""
+    table = QTableView()
+    table.setModel(PulseTableModel(model, table))
+    delegate = PulseTableDelegate(table)
+    table.setItemDelegate(delegate)
+    table.horizontalHeader().setDefaultSectionSize(delegate.CELL_SIZE.width())
+    table.verticalHeader().setDefaultSectionSize(delegate.CELL_SIZE.height())
+    return table
+
+
+def build_widget_table(model) -> QTableWidget:
+    """Builds the pulse table like the former widget-per-cell implementation of set_parameter_icons.
+
+    Every event gets a widget with the four tool buttons of the event options and every pulse parameter cell a button with the icon of the pulse parameter.
+    """
+    sequence = model.sequence
+    parameters = list(sequence.pulse_parameter_options.keys())
+    table = QTableWidget(len(parameters) + 1, len(sequence.events))
+    controls = [Logos.Pen12x12, Logos.Garbage12x12, Logos.ArrowLeft12x12, Logos.ArrowRight12x12]
+    for column, event in enumerate(sequence.events):
+        options = QWidget()
+        layout = QVBoxLayout(options)
+        for row_controls in (controls[:2], controls[2:]):
+            row_layout = QHBoxLayout()
+            for control in row_controls:
+                button = QToolButton()
+                icon = control()
+                button.setIcon(icon)
+                button.setIconSize(icon.availableSizes()[0])
+                row_layout.addWidget(button)
+            layout.addLayout(row_layout)
+        table.setCellWidget(0, column, options)
+
+        for row, parameter in enumerate(parameters):
+            button = QPushButton()
+            icon = VisualParameter(event.parameters[parameter]).get_pixmap()
+            button.setIcon(icon)
+            button.setIconSize(icon.availableSizes()[0])
+            table.setCellWidget(row + 1, column, button)
+    return table
+
+
+TABLES = {"model_view": build_model_table, "widgets": build_widget_table}
+
+
+def paint_table(build, model) -> QWidget:
+    """Builds a pulse table, shows it and paints it for the first time.
+
+    Returns:
+        QWidget: The shown table.
+    """
+    table = build(model)
+    table.resize(*TABLE_SIZE)
+    table.show()
+    table.grab()
+    return table
+
+
+def close_table(table, qapp) -> None:
+    """Closes a pulse table and deletes its widgets."""
+    table.close()
+    table.deleteLater()
+    qapp.processEvents()
+
+
+@pytest.mark.parametrize("implementation", TABLES)
+@pytest.mark.parametrize("size", TABLE_SIZES)
+def test_pulse_table_first_paint(benchmark, model, qapp, sequence_size, implementation, size):
+    """Benchmarks building and painting the pulse table for the first time and records the memory it uses.
+
+    The time is measured without tracemalloc. The memory is measured in a second build: python_bytes is the peak of the Python allocations traced by tracemalloc and widgets the number of Qt widgets of the table, which covers the memory tracemalloc does not see.
+    """
+    # The widget table takes minutes for large pulse sequences, it is only built when the benchmarks run
+    if benchmark.disabled and implementation == "widgets" and size > sequence_size:
+        pytest.skip("the widget-per-cell table is only built for large pulse sequences with --benchmark-only")
+    model.sequence = make_sequence(size)
+    build = TABLES[implementation]
+
+    # Both builds start without cached icons
+    VisualParameter.clear_cache()
+    table = benchmark.pedantic(paint_table, args=(build, model), rounds=1)
+    close_table(table, qapp)
+
+    VisualParameter.clear_cache()
+    tracemalloc.start()
+    try:
+        table = paint_table(build, model)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["python_bytes"] = peak
+    benchmark.extra_info["widgets"] = len(table.findChildren(QWidget))
+    close_table(table, qapp)
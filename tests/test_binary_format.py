@@ -0,0 +1,90 @@
+"""Tests of the binary pulse sequence format."""
+
+import copy
+
+import numpy as np
+import pytest
+from quackseq.functions import GaussianFunction
+from quackseq.pulseparameters import TXPulse
+
+from nqrduck_pulseprogrammer import sequence_io
+from nqrduck_pulseprogrammer.content_hash import get_sequence_hash
+from nqrduck_pulseprogrammer.repeat import get_repeat_blocks, set_repeat_blocks
+from nqrduck_pulseprogrammer.shape_cache import shape_cache
+
+from .conftest import make_sequence
+
+
+@pytest.fixture
+def sequence():
+    """A pulse sequence with a Gaussian pulse, a zero amplitude pulse, a non-ASCII name and a repeat block."""
+    sequence = make_sequence(8, "Echo µs")
+    # The loaded events share their pulse parameters, so the changed ones are copied
+    for index, option, value in [
+        (2, TXPulse.TX_PULSE_SHAPE, GaussianFunction()),
+        (4, TXPulse.RELATIVE_AMPLITUDE, 0),
+    ]:
+        tx = copy.deepcopy(sequence.events[index].parameters["TX"])
+        tx.get_option_by_name(option).value = value
+        sequence.events[index].parameters["TX"] = tx
+    sequence.events[6].duration = "5u"
+    set_repeat_blocks(sequence, [(2, 2, 4)])
+    return sequence
+
+
+@pytest.fixture
+def path(sequence, tmp_path):
+    """The path of the pulse sequence saved in the binary format."""
+    path = tmp_path / f"sequence.{sequence_io.BINARY_EXTENSION}"
+    sequence_io.save_sequence(sequence, path)
+    return path
+
+
+def test_round_trip(sequence, path):
+    """Loads the same pulse sequence that was saved."""
+    loaded = sequence_io.load_sequence(path)
+
+    assert loaded.name == "Echo µs"
+    assert loaded.get_event_names() == sequence.get_event_names()
+    assert get_repeat_blocks(loaded) == [(2, 2, 4)]
+    assert get_sequence_hash(loaded) == get_sequence_hash(sequence)
+
+
+def test_configurations_are_stored_once(sequence, path):
+    """Stores every distinct pulse parameter configuration and TX shape once."""
+    _, metadata, table = sequence_io.read_binary_tables(path)
+
+    assert metadata["events"] == sequence.get_event_names()
+    # 0 % (also used by the readouts), 100 % rect and 100 % Gaussian TX plus default and enabled RX
+    assert len(metadata["configurations"]) == 5
+    # The 3 µs rect, the Gaussian and the 5 µs rect shape, the zero amplitude pulse does not transmit
+    assert table["sample_offset"][4] == -1
+    assert len(set(table["sample_offset"][table["sample_offset"] >= 0])) == 3
+
+
+def test_read_shape_samples(sequence, path):
+    """Memory-maps the TX shape samples of the transmitting events."""
+    samples = sequence_io.read_shape_samples(path)
+
+    assert sorted(samples) == ["pulse_0", "pulse_2", "pulse_6"]
+    for name, block in samples.items():
+        assert isinstance(block, np.memmap)
+        assert not block.flags.writeable
+        event = sequence.events[sequence.get_event_names().index(name)]
+        shape = event.parameters["TX"].get_option_by_name(TXPulse.TX_PULSE_SHAPE).value
+        assert np.array_equal(block, shape_cache.get_pulse_amplitude(shape, event.duration))
+
+
+def test_invalid_file_is_rejected(tmp_path):
+    """Refuses files without the magic bytes and files of a newer version."""
+    path = tmp_path / f"sequence.{sequence_io.BINARY_EXTENSION}"
+    path.write_bytes(b"\0" * sequence_io.BINARY_HEADER.size)
+    with pytest.raises(KeyError):
+        sequence_io.load_sequence(path)
+
+    sequence_io.save_sequence(make_sequence(2), path)
+    data = bytearray(path.read_bytes())
+    data[len(sequence_io.BINARY_MAGIC)] = sequence_io.BINARY_VERSION + 1
+    path.write_bytes(bytes(data))
+    with pytest.raises(KeyError):
+        sequence_io.load_sequence(path)
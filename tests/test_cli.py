@@ -0,0 +1,133 @@
+"""Tests of the command line tool."""
+
+import json
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from nqrduck_pulseprogrammer import cli, sequence_io
+from nqrduck_pulseprogrammer.cli import main
+
+from .conftest import make_sequence
+
+
+@pytest.fixture
+def files(tmp_path):
+    """A directory with a JSON and a binary pulse sequence file with four events each."""
+    directory = tmp_path / "sequences"
+    directory.mkdir()
+    paths = []
+    for extension in (sequence_io.JSON_EXTENSION, sequence_io.BINARY_EXTENSION):
+        path = directory / f"sequence.{extension}"
+        sequence_io.save_sequence(make_sequence(4, "sequence"), path)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def broken(tmp_path):
+    """A pulse sequence file that can not be loaded."""
+    path = tmp_path / f"broken.{sequence_io.JSON_EXTENSION}"
+    path.write_text("{")
+    return str(path)
+
+
+def run_json(capsys, *args) -> tuple:
+    """Runs the command line tool with JSON output and returns the exit code and the results."""
+    code = main(["--json", "--jobs", "1", *args])
+    return code, json.loads(capsys.readouterr().out)
+
+
+def test_validate(capsys, files):
+    """Validates all files of a directory and fails for pulse sequences that are too long."""
+    directory = str(Path(files[0]).parent)
+
+    code, results = run_json(capsys, "validate", directory)
+    assert code == 0
+    assert sorted(result["path"] for result in results) == sorted(files)
+    assert all(result["ok"] and result["events"] == 4 for result in results)
+
+    # The pulse sequence takes 206 µs
+    code, results = run_json(capsys, "validate", "--max-duration", "100", files[0])
+    assert code == 1
+    assert not results[0]["ok"]
+    assert len(results[0]["problems"]) == 1
+    assert results[0]["error"] is None
+
+
+def test_convert(capsys, files, tmp_path):
+    """Converts a file to the other format without changing the pulse sequence."""
+    output_dir = tmp_path / "binary"
+
+    code, results = run_json(
+        capsys, "convert", "--to", sequence_io.BINARY_EXTENSION, "--output-dir", str(output_dir), files[0]
+    )
+
+    assert code == 0
+    output = output_dir / f"sequence.{sequence_io.BINARY_EXTENSION}"
+    assert results[0]["output"] == str(output)
+    converted = sequence_io.load_sequence(output)
+    original = sequence_io.load_sequence(files[0])
+    assert [sequence_io.event_to_json(event) for event in converted.events] == [
+        sequence_io.event_to_json(event) for event in original.events
+    ]
+
+
+def test_summarize(capsys, files):
+    """Counts the events, the TX pulses and the RX readouts of a file."""
+    code, results = run_json(capsys, "summarize", files[1])
+
+    assert code == 0
+    summary = results[0]
+    assert summary["name"] == "sequence"
+    assert summary["events"] == summary["played_events"] == 4
+    assert summary["duration"] == pytest.approx(206e-6)
+    assert (summary["tx_pulses"], summary["rx_readouts"]) == (2, 2)
+
+
+def test_broken_file_is_isolated(capsys, files, broken):
+    """Reports a broken file as error, processes the other files and returns exit code 1."""
+    code, results = run_json(capsys, "summarize", files[0], broken, files[1])
+
+    assert code == 1
+    assert [result["ok"] for result in results] == [True, False, True]
+    assert results[1]["path"] == broken
+    assert results[1]["error"].startswith("JSONDecodeError")
+
+
+def test_parallel_jobs(capsys, files, broken, monkeypatch):
+    """Gives the same results in the order of the files with a process pool."""
+    paths = [files[0], broken, files[1]]
+    pools = []
+
+    class ProcessPoolExecutor(cli.ProcessPoolExecutor):
+        """Records the number of workers of the process pools.
+
+        The workers are spawned, because the test process has the threads of Qt and forking it may deadlock.
+        """
+
+        def __init__(self, max_workers):
+            pools.append(max_workers)
+            super().__init__(max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    monkeypatch.setattr(cli, "ProcessPoolExecutor", ProcessPoolExecutor)
+
+    code, results = run_json(capsys, "--jobs", "2", "summarize", *paths)
+
+    assert pools == [2]
+    assert code == 1
+    assert [result["path"] for result in results] == paths
+    assert [result["ok"] for result in results] == [True, False, True]
+    assert results[2]["tx_pulses"] == 2
+
+
+def test_text_output(capsys, files, broken):
+    """Prints a line per file and a summary line."""
+    code = main(["--jobs", "1", "validate", files[0], broken])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert code == 1
+    assert lines[0].startswith(f"{files[0]}: ok, 4 events")
+    assert lines[1].startswith(f"{broken}: error: JSONDecodeError")
+    assert lines[2].startswith("2 files, 1 failed")
@@ -0,0 +1,121 @@
+"""Tests of the cache of compiled pulse sequences."""
+
+import threading
+
+import pytest
+from quackseq.spectrometer.spectrometer_settings import NumericalSetting
+
+from nqrduck_pulseprogrammer.compile_cache import CompileCache
+
+SEQUENCE_HASH = "0" * 64
+
+
+class Compiler:
+    """Counts the compilations of a pulse sequence."""
+
+    def __init__(self, artifact="compiled") -> None:
+        """Initializes the compiler with the artifact it returns."""
+        self.artifact = artifact
+        self.calls = 0
+
+    def __call__(self):
+        """Returns the artifact."""
+        self.calls += 1
+        return self.artifact
+
+
+def test_memory_tier():
+    """Compiles a pulse sequence once per content hash and spectrometer."""
+    cache = CompileCache()
+    compiler = Compiler()
+
+    assert cache.get_or_compile(SEQUENCE_HASH, "Simulator", compiler) == "compiled"
+    assert cache.get_or_compile(SEQUENCE_HASH, "Simulator", compiler) == "compiled"
+    cache.get_or_compile(SEQUENCE_HASH, "LimeNQR", compiler)
+    cache.get_or_compile("1" * 64, "Simulator", compiler)
+
+    assert compiler.calls == 3
+    assert cache.cache_info() == {"hits": 1, "disk_hits": 0, "misses": 3, "size": 3}
+
+
+def test_memory_tier_is_bounded():
+    """Evicts the least recently used artifacts from memory."""
+    cache = CompileCache(max_entries=2)
+    for spectrometer in ["A", "B", "C"]:
+        cache.put(SEQUENCE_HASH, spectrometer, spectrometer)
+
+    assert cache.get(SEQUENCE_HASH, "A") is None
+    assert cache.get(SEQUENCE_HASH, "C") == "C"
+
+
+def test_disk_tier(tmp_path):
+    """Loads artifacts that another cache stored on disk."""
+    CompileCache(tmp_path).put(SEQUENCE_HASH, "Simulator", [1, 2, 3])
+    cache = CompileCache(tmp_path)
+    compiler = Compiler()
+
+    assert cache.get_or_compile(SEQUENCE_HASH, "Simulator", compiler) == [1, 2, 3]
+    assert compiler.calls == 0
+    assert cache.disk_hits == 1
+
+
+def test_unpicklable_artifact_is_only_kept_in_memory(tmp_path):
+    """Keeps artifacts that cannot be pickled in memory only."""
+    cache = CompileCache(tmp_path)
+    lock = threading.Lock()
+
+    cache.put(SEQUENCE_HASH, "Simulator", lock)
+
+    assert cache.get(SEQUENCE_HASH, "Simulator") is lock
+    assert list(tmp_path.glob(f"*{CompileCache.FILE_SUFFIX}")) == []
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    """Removes the least recently used files once the disk tier exceeds its size limit."""
+    cache = CompileCache(tmp_path, max_disk_bytes=3000)
+    for spectrometer in ["A", "B", "C"]:
+        cache.put(SEQUENCE_HASH, spectrometer, bytes(1000))
+
+    assert len(list(tmp_path.glob(f"*{CompileCache.FILE_SUFFIX}"))) == 2
+
+
+@pytest.mark.parametrize("memory", [True, False])
+def test_changed_settings_compile_again(tmp_path, memory):
+    """Compiles the pulse sequence again after the spectrometer settings changed, both in memory and on disk."""
+    clock = NumericalSetting("clock", "Acquisition", "The clock frequency", 30.72e6)
+    settings = {"clock": clock, "tx_gain": 40}
+    compiler = Compiler()
+
+    cache = CompileCache(tmp_path)
+    cache.get_or_compile(SEQUENCE_HASH, "LimeNQR", compiler, settings)
+    if not memory:
+        cache = CompileCache(tmp_path)
+    cache.get_or_compile(SEQUENCE_HASH, "LimeNQR", compiler, settings)
+    assert compiler.calls == 1
+
+    clock.value = 61.44e6
+    cache.get_or_compile(SEQUENCE_HASH, "LimeNQR", compiler, settings)
+    settings["tx_gain"] = 50
+    cache.get_or_compile(SEQUENCE_HASH, "LimeNQR", compiler, settings)
+
+    assert compiler.calls == 3
+
+
+def test_model_compiles_changed_sequence(model, monkeypatch):
+    """Compiles the pulse sequence of the model again only after it changed."""
+    monkeypatch.setattr(model, "compile_cache", CompileCache())
+    model.add_event("pulse", 3)
+    compiled = []
+
+    def compile(sequence):
+        compiled.append(sequence.get_event_names())
+        return len(compiled)
+
+    assert model.get_compiled("Simulator", compile) == 1
+    assert model.get_compiled("Simulator", compile) == 1
+    model.add_event("readout", 100)
+    assert model.get_compiled("Simulator", compile) == 2
+    model.undo()
+    assert model.get_compiled("Simulator", compile) == 1
+
+    assert compiled == [["pulse"], ["pulse", "readout"]]
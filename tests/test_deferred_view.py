@@ -0,0 +1,66 @@
+"""Tests of building the view of the pulse programmer when it is first shown."""
+
+import pytest
+
+from nqrduck_pulseprogrammer.controller import PulseProgrammerController
+from nqrduck_pulseprogrammer.model import PulseProgrammerModel
+from nqrduck_pulseprogrammer.pulseprogrammer import PulseProgrammer, create_view
+
+from .conftest import run_python
+
+
+@pytest.fixture
+def created(qapp):
+    """The list of the views created by a new pulse programmer module and the module."""
+    views = []
+
+    def create(module):
+        views.append(create_view(module))
+        return views[-1]
+
+    module = PulseProgrammer(PulseProgrammerModel, create, PulseProgrammerController)
+    yield views, module
+    if module._pulse_programmer_view is not None:
+        module.pulse_programmer_view.close()
+        module.pulse_programmer_view.deleteLater()
+        qapp.processEvents()
+
+
+def test_view_is_built_when_shown(created, qapp):
+    """Builds the view on the first show and keeps it afterwards."""
+    views, module = created
+    widget = module.pulse_programmer_view
+    assert views == []
+
+    widget.show()
+    qapp.processEvents()
+    assert len(views) == 1
+    assert widget.view is views[0]
+
+    widget.hide()
+    widget.show()
+    qapp.processEvents()
+    assert len(views) == 1
+
+
+def test_view_shows_changes_made_before(created, qapp):
+    """Shows the pulse sequence that was edited before the view was built."""
+    views, module = created
+    module.model.add_event("pulse", 3)
+    module.model.add_event("readout", 100)
+    assert views == []
+
+    module.pulse_programmer_view.show()
+    qapp.processEvents()
+
+    assert views[0].pulse_table.model().columnCount() == 2
+
+
+def test_import_does_not_load_view():
+    """Imports the module without the view and its matplotlib widgets."""
+    code = (
+        "import sys, nqrduck_pulseprogrammer.pulseprogrammer;"
+        "print('nqrduck_pulseprogrammer.view' in sys.modules, 'matplotlib' in sys.modules)"
+    )
+
+    assert run_python(code).split() == ["False", "False"]
@@ -0,0 +1,78 @@
+"""Tests of editing the name and the duration of an event in the view."""
+
+import pytest
+
+from nqrduck_pulseprogrammer import view as view_module
+
+
+@pytest.fixture
+def edit(view, model, monkeypatch):
+    """Edits an event with the edit dialog as if the user entered a name and a duration in µs and clicked OK.
+
+    Returns the number of full changes of the pulse sequence, which is at most one because the dialog changes the event in a batch.
+    """
+    entered = {}
+    monkeypatch.setattr(view_module.EditEventDialog, "exec", lambda dialog: True)
+    monkeypatch.setattr(
+        view_module.EditEventDialog, "get_name", lambda dialog: entered.get("name", dialog.name_lineedit.text())
+    )
+    monkeypatch.setattr(
+        view_module.EditEventDialog,
+        "get_duration",
+        lambda dialog: entered.get("duration", dialog.duration_lineedit.text()),
+    )
+    changed = []
+    model.events_changed.connect(lambda: changed.append(True))
+
+    def edit(event_name: str, **values) -> list:
+        entered.clear()
+        entered.update(values)
+        changed.clear()
+        view.on_edit_event(model.get_event(event_name))
+        return len(changed)
+
+    return edit
+
+
+@pytest.mark.parametrize("duration", [3, 0.1, 0.3, 12.34, 999.999])
+def test_unchanged_event_is_not_edited(edit, model, duration):
+    """Accepting the dialog without changes records nothing."""
+    model.add_event("pulse", duration)
+    model.undo_stack.clear()
+    before = model.get_event("pulse").duration
+
+    assert edit("pulse") == 0
+    assert not model.undo_stack.can_undo()
+    assert model.get_event("pulse").duration == before
+
+
+def test_rename_does_not_change_duration(edit, model):
+    """Renaming an event only records the new name."""
+    model.add_event("pulse", 0.1)
+    model.undo_stack.clear()
+    before = model.get_event("pulse").duration
+
+    assert edit("pulse", name="excitation") == 1
+    assert model.get_event("excitation").duration == before
+    model.undo()
+
+    assert model.sequence.get_event_names() == ["pulse"]
+    assert not model.undo_stack.can_undo()
+
+
+def test_changed_duration_is_applied(edit, model):
+    """A changed duration in µs is applied in seconds."""
+    model.add_event("pulse", 3)
+
+    assert edit("pulse", duration="4.5") == 1
+    assert model.get_event("pulse").duration == pytest.approx(4.5e-6)
+
+
+def test_invalid_duration_is_rejected(edit, model, module):
+    """An invalid duration is passed to the controller, which reports it."""
+    model.add_event("pulse", 3)
+    notifications = []
+    module.nqrduck_signal.connect(lambda name, value: notifications.append(value))
+
+    assert edit("pulse", duration="abc") == 0
+    assert notifications == [["Error", "Duration must be a positive number"]]
@@ -0,0 +1,86 @@
+"""Tests of the lookup of events by name through the event index of the model."""
+
+import pytest
+
+from .conftest import make_sequence
+
+
+@pytest.fixture
+def rebuilds(model, monkeypatch):
+    """Counts the rebuilds of the event index of the model."""
+    counts = []
+    rebuild_event_index = model.rebuild_event_index
+    monkeypatch.setattr(
+        model,
+        "rebuild_event_index",
+        lambda: counts.append(True) or rebuild_event_index(),
+    )
+    return counts
+
+
+def check_index(model) -> None:
+    """Checks that every event is found at its position."""
+    for index, event in enumerate(model.sequence.events):
+        assert model.get_event_index(event.name) == index
+        assert model.get_event(event.name) is event
+
+
+def test_edits_update_index(model, rebuilds):
+    """Keeps the event index up to date through edits and undo without rebuilding it."""
+    model.sequence = make_sequence(6)
+    rebuilds.clear()
+
+    model.add_event("new", 5)
+    model.move_event("new", -3)
+    model.delete_event("pulse_0")
+    model.rename_event("readout_1", "echo")
+    check_index(model)
+    assert not model.has_event("pulse_0")
+    assert not model.has_event("readout_1")
+
+    for _ in range(4):
+        model.undo()
+    check_index(model)
+    assert model.get_event_index("readout_1") == 1
+    assert not model.has_event("new")
+    assert rebuilds == []
+
+
+def test_missing_event(model, rebuilds):
+    """Returns -1 for a missing event without rebuilding the index."""
+    model.sequence = make_sequence(4)
+    rebuilds.clear()
+
+    assert model.get_event_index("missing") == -1
+    assert model.get_event("missing") is None
+    assert rebuilds == []
+
+
+def test_outdated_index_is_rebuilt(model, rebuilds):
+    """Rebuilds the index once if the pulse sequence was changed without the model."""
+    model.sequence = make_sequence(4)
+    rebuilds.clear()
+    events = model.sequence.events
+
+    # The pulse sequence is changed with the quackseq API
+    events.insert(0, events.pop())
+    events[1].name = "renamed"
+
+    assert model.get_event_index("readout_3") == 0
+    assert model.get_event_index("renamed") == 1
+    assert model.get_event_index("pulse_0") == -1
+    assert rebuilds == [True]
+    check_index(model)
+    assert rebuilds == [True]
+
+
+def test_duplicate_name_is_rejected(model):
+    """Refuses to add or rename an event to a name that is already used."""
+    model.add_event("pulse", 3)
+    model.add_event("readout", 100)
+
+    with pytest.raises(ValueError):
+        model.add_event("pulse", 5)
+    with pytest.raises(ValueError):
+        model.rename_event("readout", "pulse")
+    check_index(model)
@@ -0,0 +1,146 @@
+"""Tests of the shared storage of identical pulse parameters."""
+
+import gc
+
+from quackseq.functions import GaussianFunction, RectFunction
+from quackseq.pulseparameters import TXPulse
+
+from nqrduck_pulseprogrammer.interning import ParameterPool, get_function_key
+
+from .conftest import make_sequence
+
+
+def get_amplitude(event) -> float:
+    """Returns the TX amplitude of an event."""
+    return event.parameters["TX"].get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value
+
+
+def set_amplitude(model, event_name: str, amplitude: float) -> None:
+    """Sets the TX amplitude of an event through the model."""
+    event = model.get_event(event_name)
+    values = [model.get_option_value(option) for option in event.parameters["TX"].options]
+    values[0] = amplitude
+    model.set_parameter_values(event_name, "TX", values)
+
+
+def test_identical_parameters_are_shared(model):
+    """Shares a single instance between all events with the same configuration."""
+    model.sequence = make_sequence(100)
+    events = model.sequence.events
+
+    instances = {id(event.parameters[name]) for event in events for name in event.parameters}
+
+    # The TX and RX parameters of the pulses and of the readouts
+    assert len(instances) == 4
+    assert events[0].parameters["TX"] is events[98].parameters["TX"]
+    assert events[1].parameters["RX"] is events[99].parameters["RX"]
+
+
+def test_edit_is_copy_on_write(model):
+    """Changes only the edited event and shares its new configuration with equal events."""
+    model.sequence = make_sequence(6)
+    events = model.sequence.events
+
+    set_amplitude(model, "pulse_0", 50)
+    assert [get_amplitude(event) for event in events[::2]] == [50, 100, 100]
+    assert events[0].parameters["TX"] is not events[2].parameters["TX"]
+    assert events[2].parameters["TX"] is events[4].parameters["TX"]
+
+    set_amplitude(model, "pulse_4", 50)
+    assert events[0].parameters["TX"] is events[4].parameters["TX"]
+
+    model.undo()
+    model.undo()
+    assert [get_amplitude(event) for event in events[::2]] == [100, 100, 100]
+    assert events[0].parameters["TX"] is events[2].parameters["TX"]
+
+
+def test_detach_gives_private_copy(model):
+    """Gives an event a private copy for a dialog and shares it again when the dialog is cancelled."""
+    model.sequence = make_sequence(4)
+    events = model.sequence.events
+    shared = events[0].parameters["TX"]
+
+    private = model.detach_parameter("pulse_0", "TX")
+    assert private is not shared
+    assert events[0].parameters["TX"] is private
+    assert not model.parameter_pool.is_interned(private)
+    assert model.detach_parameter("pulse_0", "TX") is private
+
+    private.get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value = 10
+    assert get_amplitude(events[2]) == 100
+    private.get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value = 100
+
+    model.intern_parameter("pulse_0", "TX")
+    assert events[0].parameters["TX"] is shared
+
+
+def test_function_keys():
+    """Gives equal keys to separately created functions with the same settings only."""
+    assert get_function_key(GaussianFunction()) == get_function_key(GaussianFunction())
+    assert get_function_key(GaussianFunction()) != get_function_key(RectFunction())
+
+    function = GaussianFunction()
+    function.parameters[1].value = 2
+    assert get_function_key(function) != get_function_key(GaussianFunction())
+
+
+def test_pool_rebuild_after_change_in_place():
+    """Shares the instances again after the pulse parameters were changed in place."""
+    sequence = make_sequence(4)
+    pool = ParameterPool()
+    pool.intern_sequence(sequence)
+    events = sequence.events
+    # The instance of the pulses is changed in place, e.g. by PulseSequence.update_options
+    events[0].parameters["TX"].get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value = 0
+
+    pool.intern_sequence(sequence)
+
+    assert events[0].parameters["TX"] is events[1].parameters["TX"]
+    assert len(pool.instances) == 3
+
+
+def test_unused_instances_are_released(model):
+    """Releases the canonical instances that are no longer used by an event and interns them again on redo."""
+    model.sequence = make_sequence(6)
+    pool = model.parameter_pool
+    set_amplitude(model, "pulse_0", 50)
+    assert len(pool.instances) == 5
+
+    # The undo stack stores the option values, not the instances
+    model.undo()
+    gc.collect()
+    assert len(pool.instances) == 4
+    model.redo()
+    assert len(pool.instances) == 5
+
+    set_amplitude(model, "pulse_0", 60)
+    gc.collect()
+
+    amplitudes = sorted(
+        parameter.get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value
+        for parameter in pool.instances.values()
+        if isinstance(parameter, TXPulse)
+    )
+    assert amplitudes == [0, 60, 100]
+    assert all(
+        pool.is_interned(parameter)
+        for event in model.sequence.events
+        for parameter in event.parameters.values()
+    )
+
+
+def test_pool_of_replaced_sequence_is_released():
+    """Empties the pool once the pulse sequence is no longer used."""
+    pool = ParameterPool()
+    sequence = make_sequence(4)
+    pool.intern_sequence(sequence)
+    parameter = sequence.events[0].parameters["TX"]
+    assert len(pool.instances) == 4
+    assert pool.is_interned(parameter)
+
+    del sequence, parameter
+    gc.collect()
+
+    assert len(pool.instances) == 0
+    assert pool._refs == {}
@@ -0,0 +1,106 @@
+"""Tests of the autosave journal."""
+
+from nqrduck_pulseprogrammer.content_hash import get_sequence_hash
+from nqrduck_pulseprogrammer.journal import SequenceJournal
+
+from .conftest import make_sequence
+
+AMPLITUDE = "Relative TX Amplitude (%)"
+
+
+def get_amplitudes(sequence) -> list:
+    """Returns the TX amplitudes of the events of a pulse sequence."""
+    return [
+        event.parameters["TX"].get_option_by_name(AMPLITUDE).value
+        for event in sequence.events
+    ]
+
+
+def set_amplitude(model, index: int, amplitude: float) -> None:
+    """Sets the TX amplitude of an event through the model."""
+    event = model.sequence.events[index]
+    values = [model.get_option_value(option) for option in event.parameters["TX"].options]
+    values[0] = amplitude
+    model.set_parameter_values(event.name, "TX", values)
+
+
+def test_restore_replays_operations(tmp_path, model):
+    """Restores the snapshot and replays every kind of recorded operation."""
+    journal = SequenceJournal(tmp_path)
+    model.sequence = make_sequence(6)
+    journal.write_snapshot(model.sequence)
+    sequence = model.sequence
+
+    model.add_event("new", 5)
+    journal.record_insert(sequence, 6)
+    model.delete_event("readout_1")
+    journal.record_remove(1)
+    model.move_event("pulse_2", -1)
+    journal.record_move(1, 0)
+    model.rename_event("pulse_0", "first")
+    journal.record_rename(sequence, 1)
+    model.set_event_duration("first", "7u")
+    journal.record_duration(sequence, 1)
+    set_amplitude(model, 1, 50)
+    journal.record_parameter(sequence, 1, "TX")
+    model.set_repeat_block("readout_3", "pulse_4", 3)
+    journal.record_repeat(sequence)
+    journal.close()
+
+    restored = SequenceJournal(tmp_path).restore()
+
+    assert get_sequence_hash(restored) == model.pulse_sequence_hash
+    assert restored.get_event_names() == sequence.get_event_names()
+
+
+def test_replay_does_not_change_shared_parameters(tmp_path, model):
+    """Replays a changed pulse parameter that the loaded snapshot shares with other events."""
+    journal = SequenceJournal(tmp_path)
+    journal.write_snapshot(make_sequence(6))
+    model.sequence = journal.restore()
+    events = model.sequence.events
+    assert events[0].parameters["TX"] is events[2].parameters["TX"]
+
+    set_amplitude(model, 0, 77)
+    journal.record_parameter(model.sequence, 0, "TX")
+    journal.close()
+
+    restored = SequenceJournal(tmp_path).restore()
+
+    assert get_amplitudes(restored)[::2] == [77, 100, 100]
+    assert get_amplitudes(model.sequence)[::2] == [77, 100, 100]
+
+
+def test_truncated_record_is_skipped(tmp_path, model):
+    """Skips a record that was only partially written, e.g. because of a crash."""
+    journal = SequenceJournal(tmp_path)
+    model.sequence = make_sequence(2)
+    journal.write_snapshot(model.sequence)
+    model.set_event_duration("pulse_0", "7u")
+    journal.record_duration(model.sequence, 0)
+    journal.close()
+    with open(journal.journal_path, "a") as file:
+        file.write('{"operation": "remove", "ind')
+
+    journal = SequenceJournal(tmp_path)
+    restored = journal.restore()
+
+    assert get_sequence_hash(restored) == model.pulse_sequence_hash
+    assert journal.records == 1
+
+
+def test_compaction_starts_new_journal(tmp_path, model):
+    """Writes a new snapshot that replaces the old snapshot and the journal."""
+    journal = SequenceJournal(tmp_path, max_records=2)
+    model.sequence = make_sequence(2)
+    journal.write_snapshot(model.sequence)
+    for duration in ["7u", "8u"]:
+        model.set_event_duration("pulse_0", duration)
+        journal.record_duration(model.sequence, 0)
+    assert journal.needs_compaction()
+
+    journal.write_snapshot(model.sequence)
+
+    assert journal.records == 0
+    assert len(list(tmp_path.glob(f"{SequenceJournal.SNAPSHOT_PREFIX}*"))) == 1
+    assert get_sequence_hash(SequenceJournal(tmp_path).restore()) == model.pulse_sequence_hash
@@ -0,0 +1,205 @@
+"""Tests of the reuse of the pulse parameter dialogs."""
+
+import pytest
+from PyQt6.QtCore import QItemSelectionModel
+from nqrduck.helpers.formbuilder import DuckFormBuilder
+from quackseq.pulseparameters import TXPulse
+
+from .conftest import make_sequence
+
+
+class OpenedDialogs(list):
+    """The dialogs that were opened by the view.
+
+    Attributes:
+        answer (callable): Gets the opened dialog, may change its fields and returns whether the dialog is accepted.
+    """
+
+    answer = staticmethod(lambda dialog: False)
+
+
+@pytest.fixture
+def dialogs(view, model, monkeypatch):
+    """The dialogs that were opened by the view for a pulse sequence with six events."""
+    opened = OpenedDialogs()
+
+    def exec(dialog):
+        opened.append(dialog)
+        return int(opened.answer(dialog))
+
+    monkeypatch.setattr(DuckFormBuilder, "exec", exec)
+    model.sequence = make_sequence(6)
+    return opened
+
+
+def get_field(dialog, name: str):
+    """Returns the field of a dialog for the option with the given name."""
+    return next(field for field in dialog.fields if field.label.text() == f"{name}:")
+
+
+def get_option(model, event_name: str, parameter: str, name: str):
+    """Returns the value of an option of a pulse parameter of an event."""
+    return model.get_event(event_name).parameters[parameter].get_option_by_name(name).value
+
+
+def test_dialog_is_reused(view, model, dialogs):
+    """Opens the same dialog for every event and shows the options of the clicked event."""
+    view.edit_parameter([model.get_event("pulse_0")], "TX")
+    view.edit_parameter([model.get_event("readout_1")], "TX")
+
+    assert dialogs[0] is dialogs[1]
+    amplitude = get_field(dialogs[1], TXPulse.RELATIVE_AMPLITUDE)
+    assert amplitude.return_value() == get_option(model, "readout_1", "TX", TXPulse.RELATIVE_AMPLITUDE)
+
+    view.edit_parameter([model.get_event("pulse_2")], "RX")
+    assert dialogs[2] is not dialogs[0]
+
+
+def test_accepted_values_are_applied(view, model, dialogs):
+    """Applies the values of an accepted dialog to the event without sharing the functions of the dialog."""
+
+    def accept(dialog):
+        get_field(dialog, TXPulse.RELATIVE_AMPLITUDE).widget.set_value(40)
+        return True
+
+    dialogs.answer = accept
+    view.edit_parameter([model.get_event("pulse_2")], "TX")
+
+    assert get_option(model, "pulse_2", "TX", TXPulse.RELATIVE_AMPLITUDE) == 40
+    assert get_option(model, "pulse_0", "TX", TXPulse.RELATIVE_AMPLITUDE) == 100
+    shape_field = get_field(dialogs[0], TXPulse.TX_PULSE_SHAPE)
+    assert get_option(model, "pulse_2", "TX", TXPulse.TX_PULSE_SHAPE) is not shape_field.selected_function
+
+
+def test_cancelled_values_do_not_leak(view, model, dialogs):
+    """Leaves the pulse sequence unchanged when a dialog is cancelled and shows the options of the next event."""
+    before = model.pulse_sequence_hash
+    shared = model.get_event("pulse_0").parameters["TX"]
+
+    def cancel(dialog):
+        get_field(dialog, TXPulse.RELATIVE_AMPLITUDE).widget.set_value(40)
+        return False
+
+    dialogs.answer = cancel
+    view.edit_parameter([model.get_event("pulse_0")], "TX")
+
+    assert model.pulse_sequence_hash == before
+    assert model.get_event("pulse_0").parameters["TX"] is shared
+    assert not model.undo_stack.can_undo()
+
+    dialogs.answer = lambda dialog: False
+    view.edit_parameter([model.get_event("pulse_2")], "TX")
+    assert dialogs[1] is dialogs[0]
+    assert get_field(dialogs[1], TXPulse.RELATIVE_AMPLITUDE).return_value() == 100
+
+
+def test_rx_dialog_is_recreated_for_other_phase_cycles(view, model, dialogs):
+    """Creates a new RX dialog when the number of phase cycles changes the structure of the readout scheme."""
+    view.edit_parameter([model.get_event("readout_1")], "RX")
+
+    def set_phase_cycles(dialog):
+        get_field(dialog, TXPulse.N_PHASE_CYCLES).widget.set_value(4)
+        return True
+
+    dialogs.answer = set_phase_cycles
+    view.edit_parameter([model.get_event("pulse_0")], "TX")
+    dialogs.answer = lambda dialog: False
+    view.edit_parameter([model.get_event("readout_1")], "RX")
+    view.edit_parameter([model.get_event("readout_3")], "RX")
+
+    assert get_option(model, "pulse_0", "TX", TXPulse.N_PHASE_CYCLES) == 4
+    assert dialogs[2] is not dialogs[0]
+    assert dialogs[3] is dialogs[2]
+
+
+@pytest.fixture
+def notifications(model):
+    """Records the full and the single parameter changes of the model."""
+    records = []
+    model.events_changed.connect(lambda: records.append("events"))
+    model.event_parameter_changed.connect(lambda index, parameter: records.append(index))
+    return records
+
+
+def get_amplitudes(model, events: list) -> list:
+    """Returns the TX amplitudes of events."""
+    return [get_option(model, event.name, "TX", TXPulse.RELATIVE_AMPLITUDE) for event in events]
+
+
+def set_amplitude(amplitude: int):
+    """Returns an answer that sets the TX amplitude and accepts the dialog."""
+
+    def accept(dialog):
+        get_field(dialog, TXPulse.RELATIVE_AMPLITUDE).widget.set_value(amplitude)
+        return True
+
+    return accept
+
+
+def select_cells(view, model, qapp, cells: dict) -> None:
+    """Shows the pulse sequence in the pulse table and selects the cells of the given events by pulse parameter."""
+    model.events_changed.emit()
+    qapp.processEvents()
+    table = view.pulse_table_model
+    for parameter, event_names in cells.items():
+        row = table.parameters.index(parameter) + 1
+        for name in event_names:
+            view.pulse_table.selectionModel().select(
+                table.index(row, model.get_event_index(name)),
+                QItemSelectionModel.SelectionFlag.Select,
+            )
+
+
+def test_bulk_edit_is_single_step(view, model, dialogs, notifications):
+    """Applies the values to all events with a single notification and undoes them in a single step."""
+    events = [model.get_event(name) for name in ("pulse_0", "readout_1", "pulse_4")]
+    dialogs.answer = set_amplitude(40)
+
+    assert view.edit_parameter(events, "TX")
+
+    assert notifications == ["events"]
+    assert get_amplitudes(model, events) == [40, 40, 40]
+    assert get_option(model, "pulse_2", "TX", TXPulse.RELATIVE_AMPLITUDE) == 100
+    assert events[0].parameters["TX"] is events[1].parameters["TX"] is events[2].parameters["TX"]
+    assert dialogs[0].windowTitle() == "TX (3 events)"
+
+    model.undo()
+
+    assert get_amplitudes(model, events) == [100, 0, 100]
+    assert not model.undo_stack.can_undo()
+
+
+def test_bulk_edit_of_selection(view, model, qapp, dialogs):
+    """Opens one dialog for the selected cells of a pulse parameter and applies it in a single undo step."""
+    select_cells(view, model, qapp, {"TX": ["pulse_0", "pulse_2", "pulse_4"]})
+    dialogs.answer = set_amplitude(70)
+
+    view.on_edit_selected_button_clicked()
+
+    assert len(dialogs) == 1
+    assert get_amplitudes(model, model.sequence.events) == [70, 0, 70, 0, 70, 0]
+    model.undo()
+    assert not model.undo_stack.can_undo()
+    assert get_option(model, "pulse_2", "TX", TXPulse.RELATIVE_AMPLITUDE) == 100
+
+
+def test_cancelled_bulk_edit_is_interned_again(view, model, qapp, dialogs, notifications):
+    """Shares the detached pulse parameter again and opens no further dialogs when a dialog of the selection is cancelled."""
+    select_cells(view, model, qapp, {"TX": ["pulse_0", "pulse_2"], "RX": ["pulse_0", "pulse_2"]})
+    notifications.clear()
+    # The dialog of the upper row is opened first
+    parameters = view.pulse_table_model.parameters
+    first = min("TX", "RX", key=parameters.index)
+    events = model.sequence.events
+    shared = events[0].parameters[first]
+
+    view.on_edit_selected_button_clicked()
+
+    pool = model.parameter_pool
+    assert len(dialogs) == 1
+    assert dialogs[0].windowTitle() == f"{first} (2 events)"
+    assert notifications == []
+    assert not model.undo_stack.can_undo()
+    assert events[0].parameters[first] is shared
+    assert pool.is_interned(shared)
+    assert events[2].parameters[first] is shared
@@ -0,0 +1,127 @@
+"""Tests of the pulse table model."""
+
+import pytest
+from PyQt6.QtCore import Qt
+from quackseq.pulseparameters import TXPulse
+
+from nqrduck_pulseprogrammer.pulse_table import PulseTableModel
+
+
+@pytest.fixture
+def table(model):
+    """A pulse table model of a pulse sequence with two events."""
+    model.add_event("pulse", 3)
+    model.add_event("readout", 100)
+    return PulseTableModel(model)
+
+
+@pytest.fixture
+def resets(table):
+    """Counts the resets of the pulse table model."""
+    counts = []
+    table.modelReset.connect(lambda: counts.append(True))
+    return counts
+
+
+def test_spectrometer_change_resets_changed_rows(table, model, module, qapp, resets):
+    """Resets the table when a spectrometer change added a pulse parameter, so the new row is shown."""
+    assert table.rowCount() == 3
+
+    model.sequence.add_pulse_parameter_option("TX2", TXPulse)
+    module.controller.process_signals("active_spectrometer_changed", "Simulator")
+    # The views still know the old rows until the reset
+    assert table.rowCount() == 3
+    qapp.processEvents()
+
+    assert len(resets) == 1
+    assert table.rowCount() == 4
+    assert model.options_dirty
+
+
+def test_spectrometer_change_keeps_unchanged_rows(table, model, module, resets):
+    """Does not reset the table if the pulse parameters did not change."""
+    model.update_options()
+
+    module.controller.process_signals("active_spectrometer_changed", "Simulator")
+
+    assert resets == []
+    assert model.options_dirty
+
+
+@pytest.fixture
+def signals(table):
+    """Records the structure and data signals of the pulse table model."""
+    records = []
+    table.modelReset.connect(lambda: records.append(("reset",)))
+    table.columnsInserted.connect(lambda parent, first, last: records.append(("insert", first)))
+    table.columnsRemoved.connect(lambda parent, first, last: records.append(("remove", first)))
+    table.columnsMoved.connect(
+        lambda parent, first, last, destination, column: records.append(("move", first, column))
+    )
+    table.headerDataChanged.connect(
+        lambda orientation, first, last: records.append(("header", first, last))
+    )
+    table.dataChanged.connect(
+        lambda top_left, bottom_right, roles: records.append(
+            ("data", top_left.row(), top_left.column())
+        )
+    )
+    return records
+
+
+def test_single_event_changes_update_columns(table, model, signals):
+    """Inserts, removes, moves and renames single columns instead of resetting the table."""
+    model.add_event("echo", 5)
+    model.move_event("echo", -2)
+    model.rename_event("echo", "first")
+    model.delete_event("readout")
+
+    assert ("reset",) not in signals
+    assert [record for record in signals if record[0] != "data"] == [
+        ("insert", 2),
+        ("move", 2, 0),
+        ("header", 0, 0),
+        ("remove", 2),
+    ]
+    assert [table.headerData(column, Qt.Orientation.Horizontal) for column in range(2)] == [
+        "first",
+        "pulse",
+    ]
+
+
+def test_parameter_change_updates_cell(table, model, signals):
+    """Updates only the cell of a changed pulse parameter."""
+    event = model.sequence.events[1]
+    values = [model.get_option_value(option) for option in event.parameters["TX"].options]
+    values[0] = 50
+
+    model.set_parameter_values(event.name, "TX", values)
+
+    row = table.parameters.index("TX") + 1
+    assert ("data", row, 1) in signals
+    assert ("reset",) not in signals
+
+
+def test_undo_updates_columns(table, model, signals):
+    """Undoes a deletion by inserting the column again."""
+    model.delete_event("pulse")
+    model.undo()
+
+    assert ("reset",) not in signals
+    assert [record for record in signals if record[0] in ("insert", "remove")] == [
+        ("remove", 0),
+        ("insert", 0),
+    ]
+    assert table.columnCount() == 2
+
+
+def test_full_change_resets_table(table, model, qapp, signals):
+    """Resets the table once when the whole pulse sequence changed."""
+    with model.batch():
+        model.add_event("echo", 5)
+        model.delete_event("pulse")
+    assert table.is_reset_pending()
+    qapp.processEvents()
+
+    assert signals.count(("reset",)) == 1
+    assert table.columnCount() == 2
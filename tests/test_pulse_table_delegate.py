@@ -0,0 +1,184 @@
+"""Tests of the data roles of the pulse table model and the click handling of its delegate."""
+
+import pytest
+from PyQt6.QtCore import QEvent, QPointF, QRect, Qt, qInstallMessageHandler
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtTest import QAbstractItemModelTester
+from PyQt6.QtWidgets import QStyleOptionViewItem
+
+from nqrduck_pulseprogrammer.pulse_table import PulseTableDelegate, PulseTableModel
+
+CELL = QRect(0, 0, 64, 64)
+
+
+@pytest.fixture
+def table(model):
+    """A pulse table model of a pulse sequence with two events, which is checked by QAbstractItemModelTester during the test."""
+    model.add_event("pulse", 3)
+    model.add_event("readout", 100)
+    table = PulseTableModel(model)
+    failures = []
+
+    def handle_message(message_type, context, message):
+        if context.category == "qt.modeltest":
+            failures.append(message)
+
+    previous = qInstallMessageHandler(handle_message)
+    table.tester = QAbstractItemModelTester(
+        table, QAbstractItemModelTester.FailureReportingMode.Warning
+    )
+    yield table
+    qInstallMessageHandler(previous)
+    assert failures == []
+
+
+@pytest.fixture
+def delegate(qapp):
+    """A pulse table delegate whose signals are recorded in its clicks attribute."""
+    delegate = PulseTableDelegate()
+    delegate.clicks = []
+    delegate.edit_event.connect(lambda event: delegate.clicks.append(("edit", event.name)))
+    delegate.delete_event.connect(lambda event: delegate.clicks.append(("delete", event.name)))
+    delegate.move_event_left.connect(lambda name: delegate.clicks.append(("left", name)))
+    delegate.move_event_right.connect(lambda name: delegate.clicks.append(("right", name)))
+    delegate.parameter_clicked.connect(
+        lambda event, parameter: delegate.clicks.append((parameter, event.name))
+    )
+    return delegate
+
+
+def click(
+    delegate,
+    table,
+    row: int,
+    column: int,
+    position,
+    modifiers=Qt.KeyboardModifier.NoModifier,
+    release_column: int = None,
+) -> bool:
+    """Presses and releases the left mouse button on a position of a cell.
+
+    Args:
+        delegate (PulseTableDelegate): The delegate.
+        table (PulseTableModel): The table model.
+        row (int): The row of the cell.
+        column (int): The column of the cell on which the button is pressed.
+        position (QPoint): The position within the cell.
+        modifiers (Qt.KeyboardModifier, optional): The pressed keyboard modifiers.
+        release_column (int, optional): The column of the cell on which the button is released. Defaults to the pressed column.
+
+    Returns:
+        bool: True if the delegate handled the release.
+    """
+    option = QStyleOptionViewItem()
+    option.rect = CELL
+    if release_column is None:
+        release_column = column
+    handled = False
+    for event_type, index in (
+        (QEvent.Type.MouseButtonPress, table.index(row, column)),
+        (QEvent.Type.MouseButtonRelease, table.index(row, release_column)),
+    ):
+        event = QMouseEvent(
+            event_type,
+            QPointF(position),
+            QPointF(position),
+            Qt.MouseButton.LeftButton,
+            Qt.MouseButton.LeftButton,
+            modifiers,
+        )
+        handled = delegate.editorEvent(event, table, option, index)
+    return handled
+
+
+def test_data_roles(table, model):
+    """Returns the event, the pulse parameter, the icon and the tool tip of a cell."""
+    row = table.parameters.index("TX") + 1
+    index = table.index(row, 1)
+
+    assert table.rowCount() == len(model.sequence.pulse_parameter_options) + 1
+    assert table.columnCount() == 2
+    assert index.data(PulseTableModel.EVENT_ROLE) is model.sequence.events[1]
+    assert index.data(PulseTableModel.PARAMETER_ROLE) == "TX"
+    assert index.data(Qt.ItemDataRole.DecorationRole) is not None
+    assert index.data(Qt.ItemDataRole.ToolTipRole) == "TX of readout"
+    assert table.index(0, 1).data(PulseTableModel.PARAMETER_ROLE) is None
+    assert table.headerData(row, Qt.Orientation.Vertical) == "TX"
+    assert not table.flags(index) & Qt.ItemFlag.ItemIsEditable
+
+
+def test_problem_roles(table, model):
+    """Returns the validation problems of the event in the first row."""
+    model.set_event_duration("pulse", "0u")
+
+    problems = table.index(0, 0).data(PulseTableModel.PROBLEMS_ROLE)
+
+    assert problems == ["Duration of pulse is zero"]
+    assert table.index(0, 0).data(Qt.ItemDataRole.ToolTipRole) == problems[0]
+    assert table.index(0, 1).data(PulseTableModel.PROBLEMS_ROLE) == []
+
+
+def test_repeat_block_header(table, model):
+    """Marks the events of a repeat block in the horizontal header."""
+    model.set_repeat_block("pulse", "readout", 3)
+
+    assert [table.headerData(column, Qt.Orientation.Horizontal) for column in range(2)] == [
+        "[ pulse",
+        "readout ] ×3",
+    ]
+
+
+def test_control_rects(delegate):
+    """Arranges the event controls in a grid around the center of the cell."""
+    rects = delegate.control_rects(CELL)
+
+    size = PulseTableDelegate.CONTROL_SIZE
+    assert list(rects) == ["edit", "delete", "left", "right"]
+    assert rects["delete"] == rects["edit"].translated(size, 0)
+    assert rects["left"] == rects["edit"].translated(0, size)
+    assert rects["right"] == rects["edit"].translated(size, size)
+    # The controls meet in the center of the cell
+    assert rects["right"].topLeft() == CELL.center()
+    for control, rect in rects.items():
+        assert CELL.contains(rect), control
+
+
+@pytest.mark.parametrize("control", ["edit", "delete", "left", "right"])
+def test_click_on_control(delegate, table, control):
+    """Emits the signal of the event control that was clicked."""
+    position = delegate.control_rects(CELL)[control].center()
+
+    assert click(delegate, table, 0, 1, position)
+
+    assert delegate.clicks == [(control, "readout")]
+
+
+def test_click_on_parameter(delegate, table):
+    """Emits the event and the pulse parameter of a clicked pulse parameter cell."""
+    row = table.parameters.index("RX") + 1
+
+    assert click(delegate, table, row, 0, CELL.topLeft())
+
+    assert delegate.clicks == [("RX", "pulse")]
+
+
+def test_click_outside_of_controls(delegate, table):
+    """Ignores clicks on the event cell that miss the controls."""
+    assert not click(delegate, table, 0, 0, CELL.topLeft())
+    assert delegate.clicks == []
+
+
+def test_click_with_modifier_selects(delegate, table):
+    """Leaves clicks with Ctrl to the selection of the table view."""
+    position = delegate.control_rects(CELL)["delete"].center()
+
+    assert not click(delegate, table, 0, 0, position, Qt.KeyboardModifier.ControlModifier)
+    assert delegate.clicks == []
+
+
+def test_drag_between_cells_selects(delegate, table):
+    """Ignores a release on another cell than the press."""
+    position = delegate.control_rects(CELL)["edit"].center()
+
+    assert not click(delegate, table, 0, 0, position, release_column=1)
+    assert delegate.clicks == []
@@ -0,0 +1,126 @@
+"""Tests of the coalesced refresh of the pulse programmer view."""
+
+import pytest
+from PyQt6.QtCore import Qt
+
+from nqrduck_pulseprogrammer.instrumentation import instrumentation
+
+from .conftest import make_sequence
+
+
+@pytest.fixture
+def refreshes(view, qapp):
+    """Returns the number of rebuilds of the event lengths since the view was shown."""
+    qapp.processEvents()
+    enabled = instrumentation.enabled
+    instrumentation.reset()
+    instrumentation.enable()
+    yield lambda: instrumentation.timings.get("view.on_events_changed", [0])[0]
+    instrumentation.enabled = enabled
+    instrumentation.reset()
+
+
+def get_event_lengths(view) -> list:
+    """Returns the texts of the event length labels of the view."""
+    layout = view.event_layout
+    return [layout.itemAt(index).widget().text() for index in range(1, layout.count())]
+
+
+def check_event_lengths(view, model) -> None:
+    """Checks that the event length labels match the pulse sequence."""
+    assert get_event_lengths(view) == [
+        view.get_event_length_text(event) for event in model.sequence.events
+    ]
+
+
+def test_burst_is_refreshed_once(view, model, qapp, refreshes):
+    """Rebuilds the event lengths exactly once for a burst of full changes."""
+    model.sequence = make_sequence(6)
+    model.events_changed.emit()
+    model.add_events([("first", 3), ("second", 4)])
+    model.set_durations({"pulse_0": "7u", "pulse_2": "8u"})
+    with model.batch():
+        model.delete_event("readout_1")
+    assert view.is_refresh_pending()
+    assert refreshes() == 0
+
+    qapp.processEvents()
+
+    assert refreshes() == 1
+    assert not view.is_refresh_pending()
+    check_event_lengths(view, model)
+
+
+def test_burst_resets_table_once(view, model, qapp):
+    """Resets the pulse table model exactly once for a burst of full and single changes."""
+    table = view.pulse_table_model
+    resets = []
+    table.modelReset.connect(lambda: resets.append(True))
+
+    model.sequence = make_sequence(6)
+    model.events_changed.emit()
+    model.add_events([("first", 3), ("second", 4)])
+    model.add_event("third", 5)
+    model.delete_event("pulse_0")
+    model.pulse_parameter_options_changed.emit()
+    with model.batch():
+        model.move_event("first", -2)
+    assert resets == []
+    # The views still see the pulse sequence as it was before the burst
+    assert table.columnCount() == 0
+
+    qapp.processEvents()
+
+    assert resets == [True]
+    assert not table.is_reset_pending()
+    assert table.columnCount() == len(model.sequence.events) == 8
+    assert [
+        table.headerData(column, Qt.Orientation.Horizontal) for column in range(table.columnCount())
+    ] == model.sequence.get_event_names()
+
+
+def test_single_changes_during_burst_are_skipped(view, model, qapp, refreshes):
+    """Leaves single changes that arrive while a rebuild is pending to the rebuild."""
+    model.sequence = make_sequence(4)
+    model.events_changed.emit()
+
+    model.add_event("new", 5)
+    model.rename_event("pulse_0", "first")
+    model.move_event("first", 1)
+    model.delete_event("readout_3")
+    qapp.processEvents()
+
+    assert refreshes() == 1
+    check_event_lengths(view, model)
+
+
+def test_single_changes_do_not_refresh(view, model, qapp, refreshes):
+    """Updates only the labels of single changed events."""
+    model.add_events([("pulse", 3), ("readout", 100)])
+    qapp.processEvents()
+    count = refreshes()
+
+    model.add_event("new", 5)
+    model.set_event_duration("pulse", "7u")
+    model.move_event("new", -1)
+    model.rename_event("readout", "echo")
+    model.delete_event("pulse")
+
+    assert not view.is_refresh_pending()
+    qapp.processEvents()
+    assert refreshes() == count
+    check_event_lengths(view, model)
+
+
+def test_continuous_changes_refresh_once_per_interval(view, model, refreshes):
+    """Does not postpone a pending rebuild when more changes arrive."""
+    view.refresh_interval = 60_000
+    model.events_changed.emit()
+    remaining = view.refresh_timer.remainingTime()
+
+    model.events_changed.emit()
+
+    assert view.refresh_timer.remainingTime() <= remaining
+    view.on_events_changed()
+    assert not view.is_refresh_pending()
+    assert refreshes() == 1
@@ -0,0 +1,124 @@
+"""Tests of repeat blocks."""
+
+import json
+
+import pytest
+from quackseq.pulsesequence import QuackSequence
+
+from nqrduck_pulseprogrammer import repeat, sequence_io
+
+from .conftest import make_sequence
+
+
+@pytest.fixture
+def repeated(model):
+    """A pulse sequence of six events in which events 1 to 3 are repeated three times."""
+    model.sequence = make_sequence(6)
+    model.set_repeat_block("readout_1", "readout_3", 3)
+    return model
+
+
+def test_expand_sequence(repeated):
+    """Unrolls a repeat block only in the expanded pulse sequence."""
+    expanded = repeated.expanded_sequence
+
+    assert len(repeated.sequence.events) == 6
+    assert repeated.pulse_sequence is repeated.sequence
+    assert expanded.get_event_names() == [
+        "pulse_0",
+        "readout_1", "pulse_2", "readout_3",
+        "readout_1_1", "pulse_2_1", "readout_3_1",
+        "readout_1_2", "pulse_2_2", "readout_3_2",
+        "pulse_4", "readout_5",
+    ]  # fmt: skip
+    assert repeat.get_expanded_length(repeated.sequence) == len(expanded.events)
+    assert repeated.timing.duration == pytest.approx(
+        sum(float(event.duration) for event in expanded.events)
+    )
+
+
+def test_expanded_names_do_not_collide(model):
+    """Gives the repetitions names that no other event has."""
+    model.add_event("tx", 3)
+    model.add_event("tx_1", 3)
+    model.add_event("tx_2_1", 3)
+    model.set_repeat_block("tx", "tx", 3)
+
+    names = model.expanded_sequence.get_event_names()
+
+    assert names == ["tx", "tx_1_1", "tx_2", "tx_1", "tx_2_1"]
+    assert len(set(names)) == len(names)
+
+
+def test_block_follows_edits(repeated):
+    """Adjusts the repeat block when events are inserted, moved or removed."""
+    repeated.delete_event("pulse_0")
+    assert repeated.get_repeat_blocks() == [(0, 3, 3)]
+    repeated.move_event("pulse_4", -1)
+    assert repeated.get_repeat_blocks() == [(0, 4, 3)]
+    repeated.undo()
+    repeated.undo()
+    assert repeated.get_repeat_blocks() == [(1, 3, 3)]
+
+
+@pytest.mark.parametrize(
+    "blocks",
+    [[], [(0, 1, 2)], [(1, 3, 3)], [(0, 2, 2), (3, 2, 4)], [(4, 2, 5)]],
+)
+def test_fold_events_inverts_expansion(model, blocks):
+    """Folds the events of an expanded pulse sequence back into the stored events."""
+    model.sequence = make_sequence(6)
+    repeat.set_repeat_blocks(model.sequence, blocks)
+    expanded = repeat.expand_sequence(model.sequence).events
+
+    assert repeat.fold_events(expanded, blocks) == model.sequence.events
+
+
+def test_fold_events_rejects_mismatch():
+    """Rejects events that do not contain the repetitions of the blocks."""
+    with pytest.raises(ValueError):
+        repeat.fold_events(list(range(5)), [(1, 3, 3)])
+
+
+def test_json_is_readable_by_quackseq(repeated, tmp_path):
+    """Saves JSON files in which other readers see every repetition, while the pulse programmer restores the repeat block."""
+    path = tmp_path / f"sequence.{sequence_io.JSON_EXTENSION}"
+    sequence_io.save_sequence(repeated.sequence, path)
+
+    with open(path) as file:
+        data = json.load(file)
+    other = QuackSequence.load_sequence(data)
+    assert other.get_event_names() == repeated.expanded_sequence.get_event_names()
+
+    loaded = sequence_io.load_sequence(path)
+    assert loaded.get_event_names() == repeated.sequence.get_event_names()
+    assert repeat.get_repeat_blocks(loaded) == [(1, 3, 3)]
+
+
+def test_changed_json_ignores_blocks(repeated, tmp_path):
+    """Loads the events as they are if another tool changed them."""
+    path = tmp_path / f"sequence.{sequence_io.JSON_EXTENSION}"
+    sequence_io.save_sequence(repeated.sequence, path)
+    with open(path) as file:
+        data = json.load(file)
+    del data["events"][-1]
+    with open(path, "w") as file:
+        json.dump(data, file)
+
+    loaded = sequence_io.load_sequence(path)
+
+    assert len(loaded.events) == repeat.get_expanded_length(repeated.sequence) - 1
+    assert repeat.get_repeat_blocks(loaded) == []
+
+
+def test_binary_stores_block_once(repeated, tmp_path):
+    """Stores the events of a repeat block only once in the binary format."""
+    path = tmp_path / f"sequence.{sequence_io.BINARY_EXTENSION}"
+    sequence_io.save_sequence(repeated.sequence, path)
+
+    with open(path, "rb") as file:
+        header = sequence_io.read_binary_header(file)
+    loaded = sequence_io.load_sequence(path)
+
+    assert header["n_events"] == 6
+    assert repeat.get_repeat_blocks(loaded) == [(1, 3, 3)]
@@ -0,0 +1,58 @@
+"""Tests of reading and writing pulse sequence files."""
+
+import os
+import stat
+
+import pytest
+
+from nqrduck_pulseprogrammer import sequence_io
+
+from .conftest import make_sequence
+
+EXTENSIONS = [sequence_io.JSON_EXTENSION, sequence_io.BINARY_EXTENSION]
+
+
+def get_mode(path) -> int:
+    """Returns the permission bits of a file."""
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="permission bits are not supported on Windows")
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_new_file_has_default_permissions(tmp_path, extension):
+    """Saves a new file with the permissions given by the umask instead of the ones of the temporary file."""
+    path = tmp_path / f"sequence.{extension}"
+
+    sequence_io.save_sequence(make_sequence(2), path)
+
+    assert get_mode(path) == 0o666 & ~sequence_io.UMASK
+
+
+@pytest.mark.skipif(os.name == "nt", reason="permission bits are not supported on Windows")
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_replaced_file_keeps_permissions(tmp_path, extension):
+    """Keeps the permissions of the file that is replaced."""
+    path = tmp_path / f"sequence.{extension}"
+    sequence_io.save_sequence(make_sequence(2), path)
+    os.chmod(path, 0o640)
+
+    sequence_io.save_sequence(make_sequence(4), path)
+
+    assert get_mode(path) == 0o640
+    assert len(sequence_io.load_sequence(path).events) == 4
+
+
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_cancelled_save_keeps_file(tmp_path, extension):
+    """Leaves an existing file untouched and removes the temporary file if saving is cancelled."""
+    path = tmp_path / f"sequence.{extension}"
+    sequence_io.save_sequence(make_sequence(2), path)
+
+    def cancel(done, total):
+        raise sequence_io.SequenceIOCancelled()
+
+    with pytest.raises(sequence_io.SequenceIOCancelled):
+        sequence_io.save_sequence(make_sequence(4), path, cancel)
+
+    assert len(sequence_io.load_sequence(path).events) == 2
+    assert [child.name for child in tmp_path.iterdir()] == [path.name]
@@ -0,0 +1,159 @@
+"""Tests of saving and loading pulse sequences in a background thread."""
+
+import pytest
+from PyQt6.QtCore import QThreadPool
+
+from nqrduck_pulseprogrammer import sequence_io
+from nqrduck_pulseprogrammer.sequence_worker import SequenceWorker
+
+from .conftest import make_sequence
+
+EXTENSIONS = [sequence_io.JSON_EXTENSION, sequence_io.BINARY_EXTENSION]
+
+
+def connect_signals(worker) -> dict:
+    """Records the signals of a worker."""
+    emitted = {"progress": [], "finished": [], "failed": [], "cancelled": []}
+    worker.signals.progress.connect(lambda done, total: emitted["progress"].append((done, total)))
+    worker.signals.finished.connect(emitted["finished"].append)
+    worker.signals.failed.connect(emitted["failed"].append)
+    worker.signals.cancelled.connect(lambda: emitted["cancelled"].append(True))
+    return emitted
+
+
+def wait_for_workers(qapp) -> None:
+    """Waits until the workers of the global QThreadPool are done and delivers their signals."""
+    assert QThreadPool.globalInstance().waitForDone(30_000)
+    qapp.processEvents()
+
+
+def run_worker(qapp, worker) -> dict:
+    """Runs a worker in the global QThreadPool and returns the signals it emitted."""
+    emitted = connect_signals(worker)
+    QThreadPool.globalInstance().start(worker)
+    wait_for_workers(qapp)
+    return emitted
+
+
+@pytest.fixture
+def notifications(module):
+    """The notifications of the module."""
+    received = []
+    module.nqrduck_signal.connect(
+        lambda key, value: received.append(value) if key == "notification" else None
+    )
+    return received
+
+
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_progress(qapp, tmp_path, extension):
+    """Reports the progress of saving and loading once per percent up to all events."""
+    sequence = make_sequence(400)
+    path = tmp_path / f"sequence.{extension}"
+
+    saved = run_worker(qapp, SequenceWorker(sequence_io.save_sequence, sequence, path))
+    loaded = run_worker(qapp, SequenceWorker(sequence_io.load_sequence, path))
+
+    for emitted in (saved, loaded):
+        assert emitted["failed"] == [] and emitted["cancelled"] == []
+        assert emitted["progress"][-1] == (400, 400)
+        # From 0 to 100 percent
+        assert len(emitted["progress"]) == 101
+    assert saved["finished"] == [None]
+    assert loaded["finished"][0].get_event_names() == sequence.get_event_names()
+
+
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_cancelled_save_keeps_file(qapp, tmp_path, extension):
+    """Leaves the existing file untouched and reports the cancellation."""
+    path = tmp_path / f"sequence.{extension}"
+    sequence_io.save_sequence(make_sequence(4), path)
+    content = path.read_bytes()
+    worker = SequenceWorker(sequence_io.save_sequence, make_sequence(400), path)
+    worker.cancel()
+
+    emitted = run_worker(qapp, worker)
+
+    assert emitted["cancelled"] == [True]
+    assert emitted["finished"] == [] and emitted["failed"] == []
+    assert path.read_bytes() == content
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_failed_load(qapp, tmp_path):
+    """Reports the exception of a broken file."""
+    path = tmp_path / f"broken.{sequence_io.JSON_EXTENSION}"
+    path.write_text("{")
+
+    emitted = run_worker(qapp, SequenceWorker(sequence_io.load_sequence, path))
+
+    assert emitted["finished"] == [] and emitted["cancelled"] == []
+    assert len(emitted["failed"]) == 1
+    assert isinstance(emitted["failed"][0], ValueError)
+
+
+def test_save_uses_snapshot(module, model, qapp, tmp_path):
+    """Saves the pulse sequence as it was when saving started, although it is edited while the worker runs."""
+    model.sequence = make_sequence(400)
+    path = tmp_path / f"sequence.{sequence_io.JSON_EXTENSION}"
+    finished = []
+    module.controller.sequence_io_finished.connect(lambda: finished.append(True))
+
+    module.controller.save_pulse_sequence(str(path))
+    model.rename_event("pulse_0", "renamed")
+    model.set_event_duration("readout_1", "7u")
+    wait_for_workers(qapp)
+
+    loaded = sequence_io.load_sequence(path)
+    assert loaded.events[0].name == "pulse_0"
+    assert float(loaded.events[1].duration) == pytest.approx(100e-6)
+    assert model.get_event("renamed") is model.sequence.events[0]
+    assert finished == [True]
+    assert module.controller.sequence_worker is None
+
+
+def test_load_replaces_sequence(module, model, qapp, tmp_path):
+    """Replaces the pulse sequence of the model in the GUI thread once the file is loaded."""
+    path = tmp_path / f"sequence.{sequence_io.BINARY_EXTENSION}"
+    sequence_io.save_sequence(make_sequence(6), path)
+    changes = []
+    model.events_changed.connect(lambda: changes.append(True))
+
+    module.controller.load_pulse_sequence(str(path))
+    wait_for_workers(qapp)
+
+    assert changes == [True]
+    assert model.sequence.get_event_names() == [
+        name for index in range(3) for name in (f"pulse_{2 * index}", f"readout_{2 * index + 1}")
+    ]
+    assert model.get_event("readout_5") is model.sequence.events[5]
+    assert module.controller.sequence_worker is None
+
+
+def test_failed_load_keeps_sequence(module, model, qapp, tmp_path, notifications):
+    """Keeps the pulse sequence of the model and shows an error when the file can not be loaded."""
+    model.sequence = make_sequence(4)
+    sequence = model.sequence
+    path = tmp_path / f"broken.{sequence_io.BINARY_EXTENSION}"
+    path.write_bytes(b"broken")
+
+    module.controller.load_pulse_sequence(str(path))
+    wait_for_workers(qapp)
+
+    assert model.sequence is sequence
+    assert [level for level, _ in notifications] == ["Error"]
+    assert module.controller.sequence_worker is None
+
+
+def test_one_operation_at_a_time(module, model, qapp, tmp_path, notifications):
+    """Refuses a second operation while a pulse sequence is saved or loaded."""
+    model.sequence = make_sequence(4)
+    path = tmp_path / f"sequence.{sequence_io.JSON_EXTENSION}"
+    worker = SequenceWorker(sequence_io.save_sequence, model.sequence, path)
+    module.controller.sequence_worker = worker
+
+    module.controller.load_pulse_sequence(str(path))
+
+    assert module.controller.sequence_worker is worker
+    assert [level for level, _ in notifications] == ["Error"]
+    module.controller.sequence_worker = None
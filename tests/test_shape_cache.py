@@ -0,0 +1,79 @@
+"""Tests of the cache of sampled pulse shapes."""
+
+import numpy as np
+import pytest
+from quackseq.functions import Function, GaussianFunction, SincFunction
+
+from nqrduck_pulseprogrammer.shape_cache import ShapeCache, shape_cache
+
+
+@pytest.fixture
+def evaluations(monkeypatch):
+    """Counts the evaluations of pulse shape functions."""
+    counts = []
+    evaluate = Function.evaluate
+
+    def spy(self, *args, **kwargs):
+        counts.append(type(self).__name__)
+        return evaluate(self, *args, **kwargs)
+
+    monkeypatch.setattr(Function, "evaluate", spy)
+    return counts
+
+
+def test_shapes_are_cached(evaluations):
+    """Samples a pulse shape once per duration and returns read-only samples that match the function."""
+    cache = ShapeCache()
+    function = SincFunction()
+
+    samples = cache.get_pulse_amplitude(function, 3e-6)
+    again = cache.get_pulse_amplitude(SincFunction(), 3e-6)
+    cache.get_pulse_amplitude(function, 6e-6)
+
+    assert again is samples
+    assert not samples.flags.writeable
+    assert np.array_equal(samples, function.get_pulse_amplitude(3e-6))
+    assert cache.cache_info()["hits"] == 1
+    assert cache.cache_info()["misses"] == 2
+
+
+def test_changed_parameter_changes_key():
+    """Samples a pulse shape again after a parameter of its function changed."""
+    cache = ShapeCache()
+    function = GaussianFunction()
+    before = cache.get_pulse_amplitude(function, 3e-6)
+
+    function.parameters[1].value = 2
+    after = cache.get_pulse_amplitude(function, 3e-6)
+
+    assert not np.array_equal(before, after)
+    assert cache.cache_info()["misses"] == 2
+
+
+def test_cache_is_bounded():
+    """Evicts the least recently used shapes when there are too many."""
+    cache = ShapeCache(max_entries=2)
+    function = SincFunction()
+    for duration in [1e-6, 2e-6, 1e-6, 3e-6]:
+        cache.get_pulse_amplitude(function, duration)
+
+    assert cache.cache_info()["size"] == 2
+    assert cache.get_key(function, 1e-6) in cache.cache
+    assert cache.get_key(function, 2e-6) not in cache.cache
+
+
+def test_parameter_dialog_plots_from_cache(view, model, evaluations):
+    """Plots the pulse shapes of the TX dialogs with the samples of the shape cache."""
+    model.add_event("first", 3)
+    model.add_event("second", 3)
+    shape_cache.clear_cache()
+    events = model.sequence.events
+
+    for event in events:
+        pulse_parameter = model.detach_parameter(event.name, "TX")
+        view.create_parameter_dialog(event, "TX", pulse_parameter).deleteLater()
+        model.intern_parameter(event.name, "TX")
+
+    # The time domain and the frequency domain plot of both dialogs share the samples
+    assert len(evaluations) == 1
+    assert shape_cache.cache_info()["hits"] == 3
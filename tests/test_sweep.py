@@ -0,0 +1,153 @@
+"""Tests of the parameter sweeps over pulse sequences."""
+
+import pytest
+from quackseq.pulseparameters import TXPulse
+
+from nqrduck_pulseprogrammer import sequence_io
+from nqrduck_pulseprogrammer.sweep import Sweep, SweepVariable
+
+from .conftest import make_sequence
+
+
+@pytest.fixture
+def sequence():
+    """A pulse sequence with six events."""
+    return make_sequence(6, "t1")
+
+
+def get_option(event, parameter: str, name: str):
+    """Returns an option of a pulse parameter of an event."""
+    return event.parameters[parameter].get_option_by_name(name)
+
+
+def test_variants_are_generated_lazily(sequence, monkeypatch):
+    """Creates a variant only when the next one is requested."""
+    sweep = Sweep(sequence, [SweepVariable.linear("readout_1", 10, 1000, 1000)])
+    created = []
+    create_variant = sweep.create_variant
+    monkeypatch.setattr(
+        sweep, "create_variant", lambda *args: created.append(args[0]) or create_variant(*args)
+    )
+
+    variants = iter(sweep)
+    assert created == []
+    index, values, variant = next(variants)
+    next(variants)
+
+    assert created == [0, 1]
+    assert (index, values) == (0, (10.0,))
+    assert variant.name == "t1_000"
+    assert float(variant.events[1].duration) == pytest.approx(10e-6)
+
+
+def test_unchanged_events_are_shared(sequence):
+    """Shares the events that are not varied with the base pulse sequence and copies only the varied ones."""
+    sweep = Sweep(
+        sequence,
+        [
+            SweepVariable("readout_1", [5, 6]),
+            SweepVariable("pulse_2", [50], "TX", TXPulse.RELATIVE_AMPLITUDE),
+        ],
+    )
+
+    for _, _, variant in sweep:
+        assert variant is not sequence
+        assert variant.events is not sequence.events
+        for index in (0, 3, 4, 5):
+            assert variant.events[index] is sequence.events[index]
+        assert variant.events[1] is not sequence.events[1]
+        assert variant.events[2] is not sequence.events[2]
+        # Pulse parameters that are not varied are still shared
+        assert variant.events[1].parameters["TX"] is sequence.events[1].parameters["TX"]
+        assert variant.events[2].parameters["RX"] is sequence.events[2].parameters["RX"]
+        assert variant.events[1].pulse_sequence is variant
+
+
+def test_base_sequence_is_not_changed(sequence):
+    """Leaves the events, pulse parameters and options of the base pulse sequence unchanged."""
+    before = [sequence_io.event_to_json(event) for event in sequence.events]
+    event = sequence.events[2]
+    parameter = event.parameters["TX"]
+    options = list(parameter.options)
+    phase = get_option(event, "TX", TXPulse.TX_PHASE)
+    variable = SweepVariable.linear("pulse_2", 0, 90, 4, parameter="TX", option=TXPulse.TX_PHASE)
+    sweep = Sweep(sequence, [variable])
+
+    phases = [
+        get_option(variant.events[2], "TX", TXPulse.TX_PHASE).value for _, _, variant in sweep
+    ]
+
+    assert phases == [0, 30, 60, 90]
+    assert [sequence_io.event_to_json(event) for event in sequence.events] == before
+    assert event.parameters["TX"] is parameter
+    assert parameter.options == options
+    assert phase.value == 0
+    assert sequence.events[2] is event
+
+
+def test_parallel_variables_need_same_length(sequence):
+    """Rejects variables of different length that are varied in parallel."""
+    variables = [SweepVariable("pulse_0", [1, 2, 3]), SweepVariable("readout_1", [10, 20])]
+
+    with pytest.raises(ValueError):
+        Sweep(sequence, variables, parallel=True)
+    assert len(Sweep(sequence, variables)) == 6
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_length_matches_variants(sequence, parallel):
+    """Yields as many variants as the length of the sweep with the values of every combination."""
+    variables = [SweepVariable("pulse_0", [1, 2]), SweepVariable("readout_1", [10, 20])]
+    sweep = Sweep(sequence, variables, parallel)
+
+    variants = list(sweep)
+
+    assert len(variants) == len(sweep) == (2 if parallel else 4)
+    assert [index for index, _, _ in variants] == list(range(len(sweep)))
+    expected = [(1, 10), (2, 20)] if parallel else [(1, 10), (1, 20), (2, 10), (2, 20)]
+    assert [values for _, values, _ in variants] == expected
+    assert len(Sweep(sequence, [])) == 0
+
+
+def test_integer_options_are_rounded(sequence):
+    """Rounds the values of integer options and keeps the values of float options."""
+    sweep = Sweep(
+        sequence,
+        [
+            SweepVariable("pulse_0", [2.4, 2.6], "TX", TXPulse.N_PHASE_CYCLES),
+            SweepVariable("pulse_0", [12.5, 12.5], "TX", TXPulse.TX_PHASE),
+        ],
+        parallel=True,
+    )
+
+    variants = [variant.events[0] for _, _, variant in sweep]
+
+    cycles = [get_option(event, "TX", TXPulse.N_PHASE_CYCLES).value for event in variants]
+    assert cycles == [2, 3]
+    assert all(isinstance(value, int) for value in cycles)
+    assert [get_option(event, "TX", TXPulse.TX_PHASE).value for event in variants] == [12.5, 12.5]
+
+
+def test_unknown_event_and_option(sequence):
+    """Rejects variables of missing events and options."""
+    with pytest.raises(ValueError):
+        Sweep(sequence, [SweepVariable("missing", [1])])
+
+    sweep = Sweep(sequence, [SweepVariable("pulse_0", [1], "TX", "missing")])
+    with pytest.raises(ValueError):
+        list(sweep)
+
+
+def test_save_variants(sequence, tmp_path):
+    """Saves every variant to a file named after the variant and reports the progress."""
+    sweep = Sweep(sequence, [SweepVariable("readout_1", [10, 20, 30])])
+    progress = []
+
+    paths = sweep.save_variants(
+        tmp_path / "t1", progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert paths == [str(tmp_path / "t1" / f"t1_{index:03d}.quack") for index in range(3)]
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    loaded = sequence_io.load_sequence(paths[2])
+    assert float(loaded.events[1].duration) == pytest.approx(30e-6)
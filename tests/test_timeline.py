@@ -0,0 +1,120 @@
+"""Tests of the sampled and decimated timeline of the pulse sequence."""
+
+import copy
+
+import numpy as np
+import pytest
+from quackseq.pulseparameters import TXPulse
+
+from nqrduck_pulseprogrammer.timeline import SequenceTimeline, decimate
+
+from .conftest import make_sequence
+
+COLUMNS = 100
+
+
+def make_timeline(size: int) -> SequenceTimeline:
+    """Samples a synthetic pulse sequence whose pulses have different amplitudes."""
+    sequence = make_sequence(size)
+    for index, event in enumerate(sequence.events[::2]):
+        parameter = copy.deepcopy(event.parameters["TX"])
+        parameter.get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value = 10 + index % 91
+        event.parameters["TX"] = parameter
+    return SequenceTimeline(sequence)
+
+
+def get_columns(times: np.ndarray, start: float, stop: float, columns: int) -> np.ndarray:
+    """Returns the column of every time, like decimate assigns them."""
+    edges = np.linspace(start, stop, columns + 1)[:-1]
+    return np.searchsorted(edges, times, side="right") - 1
+
+
+def get_column_ranges(points: np.ndarray, start: float, stop: float, columns: int) -> dict:
+    """Returns the minimum and maximum value of every column that contains points."""
+    ranges = {}
+    for column, value in zip(get_columns(points[0], start, stop, columns), points[1]):
+        low, high = ranges.get(column, (value, value))
+        ranges[column] = (min(low, value), max(high, value))
+    return ranges
+
+
+def get_traces(timeline: SequenceTimeline) -> tuple:
+    """Returns the TX and the RX trace of the buffer of a timeline."""
+    return (
+        timeline.buffer[:, : timeline.tx_points],
+        timeline.buffer[:, timeline.tx_points + 1 :],
+    )
+
+
+def test_decimation_keeps_extrema():
+    """Keeps the minimum and the maximum of the points of every column."""
+    rng = np.random.default_rng(0)
+    points = np.vstack((np.sort(rng.uniform(0, 1, 10_000)), rng.normal(size=10_000)))
+
+    reduced = decimate(points, 0, 1, COLUMNS)
+
+    assert reduced.shape[1] == 2 * COLUMNS
+    assert get_column_ranges(reduced, 0, 1, COLUMNS) == get_column_ranges(points, 0, 1, COLUMNS)
+
+
+def test_timeline_keeps_envelope_and_event_boundaries():
+    """Keeps the TX envelope of every column and the changes of the RX gate and the TX zeros at the event boundaries."""
+    timeline = make_timeline(2000)
+    duration = timeline.duration
+    tx, rx = get_traces(timeline)
+
+    view = timeline.get_view(0, duration, COLUMNS)
+    gap = np.flatnonzero(np.isnan(view[0]))[0]
+    tx_view, rx_view = view[:, :gap], view[:, gap + 1 :]
+
+    assert get_column_ranges(tx_view, 0, duration, COLUMNS) == get_column_ranges(tx, 0, duration, COLUMNS)
+    assert get_column_ranges(rx_view, 0, duration, COLUMNS) == get_column_ranges(rx, 0, duration, COLUMNS)
+    assert tx_view[1].max() == pytest.approx(1.0)
+    # Every pulse starts and ends at zero and every readout switches the RX gate
+    tx_ranges = get_column_ranges(tx_view, 0, duration, COLUMNS)
+    rx_ranges = get_column_ranges(rx_view, 0, duration, COLUMNS)
+    for column in get_columns(timeline.event_times[1:-1], 0, duration, COLUMNS):
+        assert tx_ranges[column][0] == 0
+        assert rx_ranges[column] == (SequenceTimeline.RX_OFF, SequenceTimeline.RX_ON)
+
+
+def test_zoomed_view_is_exact():
+    """Returns the points of a small time range unchanged, so the event boundaries are at their exact times."""
+    timeline = make_timeline(2000)
+    start, stop = timeline.event_times[10], timeline.event_times[14]
+
+    view = timeline.get_view(start, stop, COLUMNS)
+
+    gap = np.flatnonzero(np.isnan(view[0]))[0]
+    tx, rx = get_traces(timeline)
+    for trace, part in ((tx, view[:, :gap]), (rx, view[:, gap + 1 :])):
+        inside = (trace[0] >= start) & (trace[0] <= stop)
+        assert np.isin(trace[0, inside], part[0]).all()
+        # One point before and after the range continues the lines
+        assert part[0, 0] < start and part[0, -1] > stop
+    assert np.isin(timeline.event_times[10:15], view[0, gap + 1 :]).all()
+
+
+@pytest.mark.parametrize("size", [100, 1000, 10_000])
+def test_view_size_is_bounded(size):
+    """Returns at most two points per column and trace for any number of events."""
+    timeline = make_timeline(size)
+
+    view = timeline.get_view(0, timeline.duration, COLUMNS)
+    buffer = timeline._view
+
+    assert view.shape[1] <= 2 * 2 * COLUMNS + 1
+    timeline.get_view(timeline.duration / 3, timeline.duration / 2, COLUMNS)
+    assert timeline._view is buffer
+
+
+def test_widget_draws_bounded_line(view, model, qapp):
+    """Draws at most two points per pixel column and trace of the timeline plot."""
+    model.sequence = make_sequence(5000)
+    model.events_changed.emit()
+    qapp.processEvents()
+
+    timeline = view.timeline
+    columns = int(timeline.canvas.ax.bbox.width)
+    assert timeline.timeline.tx_points > 4 * columns
+    assert len(timeline.line.get_xdata()) <= 2 * 2 * columns + 1
@@ -0,0 +1,107 @@
+"""Tests of the timing index of the pulse sequence."""
+
+import random
+
+import numpy as np
+import pytest
+
+from nqrduck_pulseprogrammer.timing import TimingIndex
+
+from .conftest import make_sequence
+
+
+def check_timing(model) -> None:
+    """Checks that the timing index of the model matches a timing index built from scratch."""
+    expected = TimingIndex(model.sequence)
+    assert model.timing.durations.tolist() == expected.durations.tolist()
+    assert np.allclose(model.timing.starts, expected.starts, rtol=0, atol=1e-15)
+    assert model.timing.duration == pytest.approx(
+        sum(float(event.duration) for event in model.expanded_sequence.events)
+    )
+
+
+def test_get_event_at():
+    """Finds the event that is played at a time, with the start of an event belonging to it."""
+    # Pulses of 3 µs and readouts of 100 µs
+    timing = TimingIndex(make_sequence(4))
+
+    assert timing.duration == pytest.approx(206e-6)
+    assert timing.get_event_at(0) == (0, 0)
+    assert timing.get_event_at(2.9e-6) == (0, 0)
+    assert timing.get_event_at(timing.get_start_time(1)) == (1, 0)
+    assert timing.get_event_at(104e-6) == (2, 0)
+    assert timing.get_event_at(150e-6) == (3, 0)
+    assert timing.get_event_at(205e-6) == (3, 0)
+    assert timing.get_event_at(-1e-6) is None
+    assert timing.get_event_at(timing.duration) is None
+
+
+def test_get_event_at_in_repeat_block(model):
+    """Finds the event and the repetition of a repeat block like in the expanded pulse sequence."""
+    model.sequence = make_sequence(6)
+    model.set_repeat_block("readout_1", "pulse_2", 3)
+    expanded = model.expanded_sequence.events
+    durations = np.array([float(event.duration) for event in expanded])
+    starts = np.concatenate(([0], np.cumsum(durations)[:-1]))
+
+    # Times within every played event, away from the rounding at their borders
+    for played, start, duration in zip(expanded, starts, durations):
+        for fraction in (0.01, 0.5, 0.99):
+            index, repetition = model.timing.get_event_at(start + fraction * duration)
+            name = model.sequence.events[index].name
+            assert played.name == (f"{name}_{repetition}" if repetition else name)
+
+
+def test_incremental_updates(model):
+    """Keeps the timing index equal to a rebuilt one through inserts, removals, moves, duration changes and repeat blocks."""
+    model.sequence = make_sequence(6)
+    rng = random.Random(0)
+    names = iter(range(1_000_000))
+
+    for _ in range(300):
+        events = model.sequence.events
+        event = rng.choice(events).name
+        operation = rng.randrange(7)
+        try:
+            if operation == 0 or len(events) < 4:
+                name = f"new_{next(names)}"
+                model.add_event(name, rng.randint(1, 50))
+                model.move_event(name, -rng.randrange(len(events) + 1))
+            elif operation == 1:
+                model.delete_event(event)
+            elif operation == 2:
+                model.move_event(event, rng.choice([-1, 1]))
+            elif operation == 3:
+                model.set_event_duration(event, f"{rng.randint(1, 500)}u")
+            elif operation == 4:
+                first = rng.randrange(len(events))
+                last = min(first + rng.randrange(3), len(events) - 1)
+                model.set_repeat_block(events[first].name, events[last].name, rng.randint(1, 4))
+            elif operation == 5:
+                model.undo()
+            else:
+                model.redo()
+        except ValueError:
+            # Overlapping repeat blocks are rejected
+            pass
+        check_timing(model)
+
+    assert model.get_repeat_blocks()
+
+
+def test_buffers_grow(model):
+    """Appends more events than the initial capacity of the buffers and removes them again."""
+    count = 3 * TimingIndex.MIN_CAPACITY
+    buffer = model.timing._durations
+
+    for index in range(count):
+        model.add_event(f"event_{index}", index + 1)
+    assert model.timing._durations is not buffer
+    check_timing(model)
+
+    for index in range(0, count, 2):
+        model.delete_event(f"event_{index}")
+    check_timing(model)
+    assert model.timing.durations.tolist() == pytest.approx(
+        [index * 1e-6 for index in range(2, count + 1, 2)]
+    )
@@ -0,0 +1,132 @@
+"""Tests of undo and redo of changes to the pulse sequence."""
+
+import pytest
+
+from nqrduck_pulseprogrammer.undo import UndoStack, estimate_memory, invert_delta
+
+from .conftest import make_sequence
+
+
+def set_amplitude(model, event_name: str, amplitude: float) -> None:
+    """Sets the TX amplitude of an event through the model."""
+    event = model.get_event(event_name)
+    values = [model.get_option_value(option) for option in event.parameters["TX"].options]
+    values[0] = amplitude
+    model.set_parameter_values(event_name, "TX", values)
+
+
+EDITS = {
+    "insert": lambda model: model.add_event("new", 5),
+    "remove": lambda model: model.delete_event("readout_1"),
+    "move": lambda model: model.move_event("pulse_0", 2),
+    "rename": lambda model: model.rename_event("pulse_2", "echo"),
+    "duration": lambda model: model.set_event_duration("pulse_2", "7u"),
+    "parameter": lambda model: set_amplitude(model, "pulse_2", 50),
+    "repeat": lambda model: model.set_repeat_block("pulse_0", "readout_1", 3),
+}
+
+
+@pytest.mark.parametrize("operation", EDITS)
+def test_undo_and_redo(model, operation):
+    """Reverts a change and applies it again."""
+    model.sequence = make_sequence(4)
+    before = model.pulse_sequence_hash
+    names = model.sequence.get_event_names()
+
+    EDITS[operation](model)
+    after = model.pulse_sequence_hash
+    assert after != before
+
+    model.undo()
+    assert model.pulse_sequence_hash == before
+    assert model.sequence.get_event_names() == names
+    assert not model.undo_stack.can_undo()
+
+    model.redo()
+    assert model.pulse_sequence_hash == after
+    assert not model.undo_stack.can_redo()
+
+
+def test_batch_is_single_step(model):
+    """Records the changes of a batch as a single undo step with a single notification."""
+    model.sequence = make_sequence(4)
+    before = model.pulse_sequence_hash
+    signals = []
+    model.events_changed.connect(lambda: signals.append("events_changed"))
+    model.event_duration_changed.connect(lambda index: signals.append("event_duration_changed"))
+
+    with model.batch():
+        model.set_durations({"pulse_0": "7u", "pulse_2": "8u"})
+        model.add_event("new", 5)
+    assert signals == ["events_changed"]
+
+    model.undo()
+    assert model.pulse_sequence_hash == before
+    assert not model.undo_stack.can_undo()
+    assert signals == ["events_changed", "events_changed"]
+
+
+def test_edit_clears_redo(model):
+    """Drops the undone steps when a new change is made."""
+    model.sequence = make_sequence(4)
+    model.set_event_duration("pulse_0", "7u")
+    model.undo()
+
+    model.set_event_duration("pulse_2", "8u")
+
+    assert not model.undo_stack.can_redo()
+    model.redo()
+    assert model.get_event("pulse_0").duration == pytest.approx(3e-6)
+
+
+def test_replacing_sequence_clears_stack(model):
+    """Drops all steps when another pulse sequence is edited."""
+    model.sequence = make_sequence(4)
+    model.set_event_duration("pulse_0", "7u")
+
+    model.sequence = make_sequence(2)
+
+    assert not model.undo_stack.can_undo()
+    assert model.undo_stack.memory == 0
+
+
+def test_delta_size_does_not_depend_on_length(model):
+    """Records deltas whose size only depends on the changed event."""
+    sizes = []
+    for size in (10, 1000):
+        model.sequence = make_sequence(size)
+        model.set_event_duration("pulse_0", "7u")
+        model.delete_event("readout_1")
+        sizes.append(model.undo_stack.memory)
+
+    assert sizes[0] == sizes[1]
+
+
+def test_invert_delta():
+    """Swaps the old and the new value and the direction of a delta."""
+    assert invert_delta(("insert", 2, "event")) == ("remove", 2, "event")
+    assert invert_delta(("move", 1, 4)) == ("move", 4, 1)
+    assert invert_delta(("rename", 1, "a", "b")) == ("rename", 1, "b", "a")
+    assert invert_delta(("parameter", 1, "TX", [1], [2])) == ("parameter", 1, "TX", [2], [1])
+
+
+def test_memory_is_bounded():
+    """Evicts the oldest steps when the memory cap is exceeded but keeps the last step."""
+    step = [("duration", 0, 1.0, 2.0)]
+    size = estimate_memory(step)
+    stack = UndoStack(max_memory=3 * size)
+
+    for index in range(5):
+        stack.push([("duration", index, 1.0, 2.0)])
+
+    assert stack.memory == 3 * size
+    assert [stack.undo()[0][1] for _ in range(3)] == [4, 3, 2]
+    assert not stack.can_undo()
+    # The undone steps still count until they are dropped
+    assert stack.memory == 3 * size
+    stack.push(step)
+    assert stack.memory == size
+
+    stack = UndoStack(max_memory=1)
+    stack.push(step)
+    assert stack.can_undo()
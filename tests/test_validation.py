@@ -0,0 +1,86 @@
+"""Tests of the incremental validation of pulse sequences."""
+
+import pytest
+
+from nqrduck_pulseprogrammer.validation import SequenceValidator
+
+from .conftest import make_sequence
+
+
+def check_validator(model) -> None:
+    """Checks that the validator of the model matches a validator that checked the whole pulse sequence."""
+    validator = model.validator
+    expected = SequenceValidator(model.sequence, validator.max_duration)
+    assert validator.duration == pytest.approx(expected.duration)
+    assert validator.duplicates == expected.duplicates
+    assert validator.count_problems() == expected.count_problems()
+    assert validator.get_problems() == expected.get_problems()
+
+
+def test_running_totals_follow_edits(model):
+    """Keeps the total duration, the duplicate names and the problem count up to date through edits, repeat blocks and undo."""
+    model.sequence = make_sequence(8)
+    model.set_max_duration(1e-3)
+    check_validator(model)
+
+    model.set_repeat_block("pulse_2", "readout_3", 4)
+    check_validator(model)
+    model.set_event_duration("pulse_2", "50u")
+    check_validator(model)
+    model.add_event("new", 5)
+    check_validator(model)
+    model.move_event("readout_5", -2)
+    check_validator(model)
+    model.delete_event("readout_3")
+    check_validator(model)
+    model.set_event_duration("readout_1", "0u")
+    check_validator(model)
+    model.set_repeat_block("pulse_2", "pulse_2", 100)
+    check_validator(model)
+    assert model.validator.sequence_problems
+
+    for _ in range(7):
+        model.undo()
+        check_validator(model)
+    for _ in range(7):
+        model.redo()
+        check_validator(model)
+
+
+def test_duplicate_names_are_counted(model):
+    """Counts every event whose name is used more than once."""
+    sequence = make_sequence(4)
+    for event in sequence.events[1:3]:
+        event.name = sequence.events[0].name
+    model.sequence = sequence
+    assert model.validator.duplicates == 3
+    check_validator(model)
+
+    model.delete_event("pulse_0")
+    check_validator(model)
+    assert model.validator.duplicates == 2
+
+    model.rename_event("readout_3", "other")
+    check_validator(model)
+    model.undo()
+    model.undo()
+    check_validator(model)
+    assert model.validator.duplicates == 3
+
+
+def test_edits_do_not_sum_durations(model, monkeypatch):
+    """Changes an event outside of the repeat blocks without summing the durations of all events."""
+    model.sequence = make_sequence(1000)
+    model.set_max_duration(1.0)
+    model.set_repeat_block("pulse_0", "readout_1", 3)
+    monkeypatch.setattr(
+        SequenceValidator,
+        "update_repeat_duration",
+        lambda self: pytest.fail("the repetitions were summed again"),
+    )
+
+    model.set_event_duration("pulse_500", "7u")
+    model.rename_event("readout_501", "echo")
+    model.add_event("new", 5)
+
+    assert model.validator.duration == pytest.approx(model.timing.duration)
@@ -0,0 +1,101 @@
+"""Tests of the cached icons of the pulse parameters."""
+
+import pytest
+from nqrduck.assets.icons import PulseParameters
+from quackseq.functions import GaussianFunction
+from quackseq.pulseparameters import PulseParameter, RXReadout, TXPulse
+
+from nqrduck_pulseprogrammer.visual_parameter import VisualParameter
+
+
+class ShapedPulse(TXPulse):
+    """TX pulse without its own renderer."""
+
+
+class GatePulse(PulseParameter):
+    """Pulse parameter whose renderer is registered by a test."""
+
+
+@pytest.fixture(autouse=True)
+def icon_cache(qapp, monkeypatch):
+    """Starts every test with an empty icon cache and restores the registered renderers afterwards."""
+    monkeypatch.setattr(VisualParameter, "renderers", dict(VisualParameter.renderers))
+    VisualParameter.clear_cache()
+    yield
+    VisualParameter.clear_cache()
+
+
+def make_tx(amplitude: float, parameter_class=TXPulse) -> TXPulse:
+    """Creates a TX pulse parameter with a relative amplitude."""
+    pulse = parameter_class("TX")
+    pulse.get_option_by_name(TXPulse.RELATIVE_AMPLITUDE).value = amplitude
+    return pulse
+
+
+def test_repeated_state_is_cache_hit():
+    """Loads the icon of a state once and shares it between pulse parameters in the same state."""
+    icon = VisualParameter(make_tx(100)).get_pixmap()
+    again = VisualParameter(make_tx(50)).get_pixmap()
+
+    assert again is icon
+    assert VisualParameter.cache_info() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_new_state_is_cache_miss():
+    """Loads another icon for another state of the options."""
+    rect = VisualParameter(make_tx(100)).get_pixmap()
+    gaussian = make_tx(100)
+    gaussian.get_option_by_name(TXPulse.TX_PULSE_SHAPE).value = GaussianFunction()
+    VisualParameter(gaussian).get_pixmap()
+    VisualParameter(make_tx(0)).get_pixmap()
+    VisualParameter(RXReadout("RX")).get_pixmap()
+
+    assert VisualParameter.cache_info() == {"hits": 0, "misses": 4, "size": 4}
+    assert VisualParameter(make_tx(100)).get_pixmap() is rect
+    assert VisualParameter.cache_info()["hits"] == 1
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    """Keeps at most CACHE_SIZE icons and evicts the one that was not used for the longest time."""
+    monkeypatch.setattr(VisualParameter, "CACHE_SIZE", 2)
+    rect = VisualParameter(make_tx(100)).get_pixmap()
+    VisualParameter(make_tx(0)).get_pixmap()
+    VisualParameter(make_tx(100)).get_pixmap()
+    VisualParameter(RXReadout("RX")).get_pixmap()
+
+    assert VisualParameter.cache_info()["size"] == 2
+    assert VisualParameter(make_tx(100)).get_pixmap() is rect
+    VisualParameter(make_tx(0)).get_pixmap()
+    assert VisualParameter.cache_info()["misses"] == 4
+
+
+def test_clear_cache():
+    """Removes the icons and resets the statistics."""
+    VisualParameter(make_tx(100)).get_pixmap()
+    VisualParameter(make_tx(100)).get_pixmap()
+
+    VisualParameter.clear_cache()
+
+    assert VisualParameter.cache_info() == {"hits": 0, "misses": 0, "size": 0}
+
+
+def test_subclass_uses_renderer_of_base_class():
+    """Resolves the renderer of a subclass without its own renderer through its base classes and shares their icons."""
+    icon = VisualParameter(make_tx(100)).get_pixmap()
+
+    assert VisualParameter(make_tx(100, ShapedPulse)).get_pixmap() is icon
+    assert VisualParameter.cache_info()["hits"] == 1
+
+
+def test_registered_renderer():
+    """Uses the renderer that was registered for a pulse parameter class and returns no icon for unregistered classes."""
+    assert VisualParameter(GatePulse("Gate")).get_pixmap() is None
+
+    @VisualParameter.register(GatePulse)
+    def render_gate(pulse_parameter):
+        return None, PulseParameters.RXOn
+
+    icon = VisualParameter(GatePulse("Gate")).get_pixmap()
+    assert icon is not None
+    assert VisualParameter(GatePulse("Gate")).get_size() == icon.availableSizes()[0]
+    assert VisualParameter.cache_info() == {"hits": 1, "misses": 1, "size": 1}